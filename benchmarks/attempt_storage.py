@@ -0,0 +1,54 @@
+"""Bytes per quiz attempt before and after the question catalog migration.
+
+Builds a database in the pre-catalog layout (question and correct answer text in every
+quiz_attempts row), measures it, then applies the catalog migration and measures again.
+
+Run from the repository root:
+    python -m benchmarks.attempt_storage [attempts]
+"""
+import os, random, sqlite3, sys, tempfile
+from utils.migrations import migrate
+
+# schema versions just before / at the question catalog migration
+INLINE_VERSION, CATALOG_VERSION = 5, 6
+
+QUESTIONS = [
+    ("Science", "Biology", "In Mendel's experiments, what was the ratio of dominant to recessive traits in the F2 generation?", "3:1"),
+    ("Science", "Biology", "A woman with blood type AB and a man with blood type O have a child. What are the possible blood types of the child?", "A or B"),
+    ("Science", "Biology", "What is the chance of a carrier father and carrier mother having an affected child with a recessive condition?", "25%"),
+    ("Science", "Chemistry", "Which of the following best represents a redox reaction?", "2Fe + 3Cl₂ → 2FeCl₃"),
+    ("Science", "Chemistry", "Which type of chemical reaction is represented by: 2H₂O₂ → 2H₂O + O₂?", "Decomposition"),
+    ("Science", "Chemistry", "Which gas is usually released during a metal-acid reaction?", "Hydrogen"),
+]
+
+def transaction(conn, fn):
+    conn.execute("BEGIN IMMEDIATE")
+    fn(conn)
+    conn.execute("COMMIT")
+
+def bytes_used(conn) -> int:
+    conn.execute("VACUUM")
+    page_size = conn.execute("PRAGMA page_size").fetchone()[0]
+    return conn.execute("PRAGMA page_count").fetchone()[0] * page_size
+
+if __name__ == "__main__":
+    attempts = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    conn = sqlite3.connect(os.path.join(tempfile.mkdtemp(), "bench.db"), isolation_level=None)
+    transaction(conn, lambda c: migrate(c, target=INLINE_VERSION))
+    baseline = bytes_used(conn)
+
+    rng = random.Random(0)
+    rows = []
+    for n in range(attempts):
+        subject, topic, question, correct = rng.choice(QUESTIONS)
+        rows.append((1 + n % 500, subject, topic, question, rng.choice([correct, "Other"]), correct,
+                     rng.random() < 0.6, rng.randint(1, 3)))
+    transaction(conn, lambda c: c.executemany(
+        "INSERT INTO quiz_attempts (user_id,subject,topic,question,user_answer,correct_answer,is_correct,difficulty_level) "
+        "VALUES (?,?,?,?,?,?,?,?)", rows))
+    before = bytes_used(conn) - baseline
+
+    transaction(conn, lambda c: migrate(c, target=CATALOG_VERSION))
+    after = bytes_used(conn) - baseline
+    print(f"inline text:      {before/attempts:7.1f} bytes/attempt")
+    print(f"question catalog: {after/attempts:7.1f} bytes/attempt  ({100*(1-after/before):.0f}% smaller)")
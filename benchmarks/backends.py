@@ -0,0 +1,91 @@
+"""Training and serving cost of each skill model backend, against its accuracy.
+
+Trains every backend in utils.backends on the competency CSVs into a temporary registry,
+then reports for each:
+  train     - wall time of SkillPredictor.process_datasets_and_train (feature cache warm)
+  1 row     - model predict() latency on one scaled row, as the quiz page scores a learner
+  batch     - model predict() latency on 2000 scaled rows, as the batch scorer does
+  load      - time to load the artifact in a fresh interpreter
+  peak RSS  - peak resident set of that interpreter after loading and one prediction
+  size      - artifact model files on disk (without features.npz and meta.json)
+  accuracy  - on utils/competency_v2_test.csv
+and names the cheapest backend (lowest single-row latency, then peak RSS) whose accuracy
+meets the bar; set it as APP_CONFIG["training"]["backend"] to serve it.
+
+Run from the repository root:
+    python -m benchmarks.backends [--min-accuracy 0.80] [backend ...]    # default: all
+"""
+import os, subprocess, sys, tempfile, time
+import pandas as pd
+from utils import model_registry
+from utils.backends import BACKENDS
+
+BATCH_ROWS = 2000
+
+def per_call_ms(fn, X, repeat):
+    fn(X)  # warm up
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn(X)
+    return (time.perf_counter() - start) / repeat * 1000
+
+# Runs in a fresh interpreter; VmHWM is the peak resident set of that process alone
+PROBE = """
+import sys, time
+import pandas as pd
+start = time.perf_counter()
+from utils import model_registry
+predictor = model_registry.load_artifact(sys.argv[1])
+elapsed = time.perf_counter() - start
+predictor.predict(pd.read_csv(sys.argv[2], nrows=20))
+hwm_kb = next(int(line.split()[1]) for line in open("/proc/self/status") if line.startswith("VmHWM"))
+print(elapsed, hwm_kb / 1024)
+"""
+
+def load_cost(path):
+    out = subprocess.run([sys.executable, "-c", PROBE, path, model_registry.DEFAULT_TEST], capture_output=True,
+                         text=True, check=True, env=dict(os.environ, TF_CPP_MIN_LOG_LEVEL="3"))
+    seconds, rss_mb = out.stdout.split()
+    return float(seconds), float(rss_mb)
+
+def model_bytes(path):
+    return sum(os.path.getsize(os.path.join(path, name)) for name in os.listdir(path)
+               if name not in ("features.npz", "meta.json"))
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    min_accuracy = 0.0
+    if "--min-accuracy" in args:
+        i = args.index("--min-accuracy")
+        min_accuracy = float(args[i + 1])
+        del args[i:i + 2]
+    names = args or list(BACKENDS)
+    registry = os.path.join(tempfile.mkdtemp(), "registry")
+    X = None
+
+    rows = []
+    for name in names:
+        start = time.perf_counter()
+        path = model_registry.train_and_save(registry_dir=registry, publish=False, backend=name)
+        train_seconds = time.perf_counter() - start
+        predictor = model_registry.load_artifact(path)
+        if X is None:  # every backend is trained on the same cached pipeline
+            X = predictor.pipeline.transform(pd.read_csv(model_registry.DEFAULT_TEST, nrows=BATCH_ROWS))
+        load_seconds, rss_mb = load_cost(path)
+        rows.append({"backend": name, "train_s": train_seconds,
+                     "one_ms": per_call_ms(predictor.skill_predictor.predict, X[:1], 200),
+                     "batch_ms": per_call_ms(predictor.skill_predictor.predict, X, 20),
+                     "load_s": load_seconds, "rss_mb": rss_mb, "size_kb": model_bytes(path) / 1024,
+                     "accuracy": predictor.test_accuracy})
+
+    print(f"{'':>7} {'train':>8} {'1 row':>10} {f'{BATCH_ROWS} rows':>10} {'load':>7} {'peak RSS':>9} {'size':>9} {'accuracy':>9}")
+    for r in rows:
+        print(f"{r['backend']:>7} {r['train_s']:7.1f}s {r['one_ms']:8.3f}ms {r['batch_ms']:8.3f}ms {r['load_s']:6.2f}s"
+              f" {r['rss_mb']:7.0f}MB {r['size_kb']:7.1f}KB {r['accuracy']:9.4f}")
+
+    eligible = [r for r in rows if r["accuracy"] >= min_accuracy]
+    if eligible:
+        best = min(eligible, key=lambda r: (r["one_ms"], r["rss_mb"]))
+        print(f"cheapest backend with accuracy >= {min_accuracy:.4f}: {best['backend']}")
+    else:
+        print(f"no backend reaches accuracy {min_accuracy:.4f}")
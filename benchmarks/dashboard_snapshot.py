@@ -0,0 +1,41 @@
+"""Per-render cost of the dashboard reads: separate helper calls vs get_dashboard_snapshot.
+
+Reported cold (read cache disabled, so every render queries SQLite) and warm (the
+ResultCache serves repeat renders, as between answers in the app).
+
+Run from the repository root:
+    python -m benchmarks.dashboard_snapshot [attempts] [renders]
+"""
+import os, sys, tempfile, time
+from utils.database import DatabaseManager
+
+def separate_calls(db, uid):
+    # what the navbar and dashboard.show used to do on every rerun
+    db.get_user(uid)
+    db.get_user_stats(uid)
+    db.get_user_streak_data(uid)
+    db.get_user_progress_data(uid, limit=3)
+    db.get_subject_stats(uid)
+
+def time_per_render(fn, renders):
+    start = time.perf_counter()
+    for _ in range(renders):
+        fn()
+    return (time.perf_counter() - start) / renders * 1e6
+
+if __name__ == "__main__":
+    attempts = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    renders = int(sys.argv[2]) if len(sys.argv) > 2 else 2000
+    db = DatabaseManager(os.path.join(tempfile.mkdtemp(), "bench.db"), write_behind=False)
+    uid = db.create_user("learner", "Visual")
+    for n in range(attempts):
+        db.record_quiz_answer(uid, ("Science", "Math")[n % 2], "Biology", f"Question {n % 15}",
+                              "A", "B", n % 3 == 0, 1 + n % 3)
+
+    cache = db.pool.cache
+    for label, read_cache in (("cold", None), ("warm", cache)):
+        db.pool.cache = read_cache
+        before = time_per_render(lambda: separate_calls(db, uid), renders)
+        after = time_per_render(lambda: db.get_dashboard_snapshot(uid), renders)
+        print(f"{label} separate calls: {before:8.1f} us/render")
+        print(f"{label} snapshot:       {after:8.1f} us/render  ({before/after:.1f}x)")
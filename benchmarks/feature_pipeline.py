@@ -0,0 +1,72 @@
+"""Feature preparation cost: the old per-row thermometer loop + StandardScaler vs FeaturePipeline.
+
+Builds a synthetic competency frame, checks both paths produce the same scaled matrix,
+then times fit+transform and the peak extra memory each path allocates (tracemalloc sees
+NumPy buffers). Finally transforms from several threads sharing one fitted pipeline.
+
+Run from the repository root:
+    python -m benchmarks.feature_pipeline [rows]     # default 10_000_000
+"""
+import sys, time, tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+import pandas as pd
+from sklearn.preprocessing import StandardScaler
+from utils.features import FeaturePipeline, NUMERIC_FEATURES
+
+NUM_LEVELS = 5
+TOLERANCE = 1e-4
+
+def synthetic(rows, seed=0):
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        "time_spent_sec": rng.gamma(2.0, 20.0, rows),
+        "question_difficulty": rng.integers(1, NUM_LEVELS + 1, rows),
+        "mcq_correct": rng.integers(0, 2, rows),
+        "past_correct_pct": rng.random(rows).round(3),
+    })
+
+def legacy(df):
+    # what SkillPredictor did before FeaturePipeline
+    qdiff = df["question_difficulty"].values.astype(int) - 1
+    thermometer = np.zeros((len(qdiff), NUM_LEVELS), dtype=np.float32)
+    for i, v in enumerate(qdiff):
+        thermometer[i, :v+1] = 1.0
+    X = np.concatenate([df[NUMERIC_FEATURES].values.astype(np.float32), thermometer], axis=1)
+    return StandardScaler().fit_transform(X)
+
+def pipeline(df):
+    return FeaturePipeline(NUM_LEVELS).fit(df).transform(df)
+
+def measure(fn, df):
+    tracemalloc.start()
+    start = time.perf_counter()
+    X = fn(df)
+    seconds = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return X, seconds, peak / 2**20
+
+if __name__ == "__main__":
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 10_000_000
+    df = synthetic(rows)
+    print(f"{rows:,} rows, {len(NUMERIC_FEATURES) + NUM_LEVELS} features")
+
+    X_new, new_s, new_mb = measure(pipeline, df)
+    X_old, old_s, old_mb = measure(legacy, df)
+    diff = np.abs(X_old - X_new).max()
+    print(f"parity: max |old - new| = {diff:.2e}")
+    assert diff < TOLERANCE, f"FeaturePipeline differs from the legacy features by {diff}"
+    del X_old
+
+    print(f"{'':>10} {'fit+transform':>14} {'rows/s':>12} {'peak alloc':>11}")
+    for name, seconds, mb in (("legacy", old_s, old_mb), ("pipeline", new_s, new_mb)):
+        print(f"{name:>10} {seconds:13.2f}s {rows / seconds:12,.0f} {mb:9.0f}MB")
+
+    # one fitted pipeline, transformed concurrently on slices of the frame
+    fitted = FeaturePipeline(NUM_LEVELS).fit(df)
+    parts = np.array_split(np.arange(rows), 8)
+    with ThreadPoolExecutor(8) as pool:
+        results = list(pool.map(lambda idx: fitted.transform(df.iloc[idx]), parts))
+    assert np.array_equal(np.concatenate(results), X_new), "concurrent transforms disagree"
+    print("8 threads sharing one pipeline: identical output")
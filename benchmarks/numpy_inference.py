@@ -0,0 +1,62 @@
+"""Parity and cost of the NumPy inference engine against Keras model.predict.
+
+Checks that both engines produce the same probabilities (within tolerance) for the test
+CSV, then compares prediction latency, import time and resident memory after loading.
+
+Run from the repository root (trains into a temporary registry if none is given):
+    python -m benchmarks.numpy_inference [registry_dir]
+"""
+import os, subprocess, sys, tempfile, time
+import numpy as np
+import pandas as pd
+from utils import model_registry
+
+TOLERANCE = 1e-4
+
+def per_call_ms(fn, X, repeat):
+    fn(X)  # warm up
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn(X)
+    return (time.perf_counter() - start) / repeat * 1000
+
+# Runs in a fresh interpreter; VmHWM is the peak resident set of that process alone
+PROBE = """
+import sys, time
+start = time.perf_counter()
+from utils import model_registry
+predictor = model_registry.load_artifact(sys.argv[1], sys.argv[2])
+elapsed = time.perf_counter() - start
+hwm_kb = next(int(line.split()[1]) for line in open("/proc/self/status") if line.startswith("VmHWM"))
+print(elapsed, hwm_kb / 1024, "tensorflow" in sys.modules)
+"""
+
+def load_cost(path, engine):
+    out = subprocess.run([sys.executable, "-c", PROBE, path, engine], capture_output=True, text=True, check=True,
+                         env=dict(os.environ, TF_CPP_MIN_LOG_LEVEL="3"))
+    seconds, rss_mb, tf_loaded = out.stdout.split()
+    return float(seconds), float(rss_mb), tf_loaded == "True"
+
+if __name__ == "__main__":
+    registry = sys.argv[1] if len(sys.argv) > 1 else None
+    if registry is None:
+        registry = os.path.join(tempfile.mkdtemp(), "registry")
+        model_registry.train_and_save(registry_dir=registry)
+    path = os.path.join(registry, model_registry.latest_version(registry))
+
+    keras_predictor = model_registry.load_artifact(path, "keras")
+    numpy_predictor = model_registry.load_artifact(path, "numpy")
+    df = pd.read_csv(model_registry.DEFAULT_TEST)
+    X = numpy_predictor.pipeline.transform(df)
+
+    diff = np.abs(keras_predictor.skill_predictor.predict(X) - numpy_predictor.skill_predictor.predict(X)).max()
+    same = (keras_predictor.predict(df) == numpy_predictor.predict(df)).mean()
+    print(f"parity: max |p_keras - p_numpy| = {diff:.2e}, identical classes {same:.2%}")
+    assert diff < TOLERANCE, f"NumPy engine differs from Keras by {diff}"
+
+    print(f"{'':>8} {'1 row':>10} {'2000 rows':>10} {'load':>8} {'peak RSS':>9}  tensorflow")
+    for engine, predictor in (("keras", keras_predictor), ("numpy", numpy_predictor)):
+        one = per_call_ms(predictor.skill_predictor.predict, X[:1], 50)
+        batch = per_call_ms(predictor.skill_predictor.predict, X, 20)
+        seconds, rss, tf_loaded = load_cost(path, engine)
+        print(f"{engine:>8} {one:8.3f}ms {batch:8.3f}ms {seconds:7.2f}s {rss:7.0f}MB  {'imported' if tf_loaded else 'not imported'}")
@@ -0,0 +1,50 @@
+"""Cost of a skill prediction on the quiz page with and without the prediction cache.
+
+Splits the test CSV into learners of 20 rows each (the feature store's window), predicts
+every learner once through the prediction service (misses), then REVISITS more times
+(hits, as reruns of the results page), and prints per-lookup latency and the cache's
+counters. The miss latency includes the service's batching window.
+
+Run from the repository root (trains into a temporary registry if none is given):
+    python -m benchmarks.prediction_cache [registry_dir]
+"""
+import os, sys, tempfile, time
+import numpy as np
+import pandas as pd
+from utils import model_registry
+from utils.prediction_cache import PredictionCache
+from utils.prediction_service import PredictionService
+from utils.skill_predictor import get_prediction_summary
+
+LEARNERS = 500
+WINDOW = 20
+REVISITS = 3
+
+if __name__ == "__main__":
+    registry = sys.argv[1] if len(sys.argv) > 1 else None
+    if registry is None:
+        registry = os.path.join(tempfile.mkdtemp(), "registry")
+        model_registry.train_and_save(registry_dir=registry)
+    predictor = model_registry.load_artifact(os.path.join(registry, model_registry.latest_version(registry)))
+    service = PredictionService(lambda: predictor)
+    cache = PredictionCache(max_entries=LEARNERS)
+
+    df = pd.read_csv(model_registry.DEFAULT_TEST, nrows=LEARNERS * WINDOW)
+    learners = [df.iloc[i:i + WINDOW].reset_index(drop=True) for i in range(0, len(df), WINDOW)]
+
+    def lookup(uid, features):
+        def predict():
+            predictions = service.predict(features)
+            return predictions, get_prediction_summary(predictions, predictor.test_accuracy * 100)
+        return cache.get_or_compute(uid, features, predictor.version, predict)
+
+    for label, rounds in (("miss", 1), ("hit", REVISITS)):
+        timings = []
+        for _ in range(rounds):
+            for uid, features in enumerate(learners):
+                start = time.perf_counter()
+                lookup(uid, features)
+                timings.append(time.perf_counter() - start)
+        print(f"{label:>5}: p50 {np.median(timings) * 1000:.3f}ms  p99 {np.percentile(timings, 99) * 1000:.3f}ms")
+    service.close()
+    print(cache.stats())
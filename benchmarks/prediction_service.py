@@ -0,0 +1,72 @@
+"""Load test for the micro-batching PredictionService.
+
+1, 10 and 100 concurrent callers each ask for predictions on a small frame (one learner's
+worth of rows) in a loop for a fixed time, first calling SkillPredictor.predict directly
+and then through PredictionService. Reports request throughput, latency percentiles and
+how the service grouped the requests.
+
+Run from the repository root (trains into a temporary registry if none is given):
+    python -m benchmarks.prediction_service [registry_dir] [keras|numpy]
+"""
+import os, sys, tempfile, threading, time
+import numpy as np
+import pandas as pd
+from utils import model_registry
+from utils.prediction_service import PredictionService
+
+CALLERS = (1, 10, 100)
+ROWS_PER_REQUEST = 10
+SECONDS = 3.0
+
+def load(predict, callers, frames):
+    latencies = [[] for _ in range(callers)]
+    start_line = threading.Barrier(callers + 1)
+    def caller(i):
+        start_line.wait()
+        end = time.monotonic() + SECONDS
+        n = i
+        while time.monotonic() < end:
+            t = time.perf_counter()
+            predict(frames[n % len(frames)])
+            latencies[i].append(time.perf_counter() - t)
+            n += callers
+    threads = [threading.Thread(target=caller, args=(i,)) for i in range(callers)]
+    for t in threads:
+        t.start()
+    start_line.wait()
+    started = time.perf_counter()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - started
+    flat = np.concatenate([np.array(l) for l in latencies]) * 1000
+    return len(flat) / elapsed, np.percentile(flat, 50), np.percentile(flat, 95)
+
+if __name__ == "__main__":
+    registry = sys.argv[1] if len(sys.argv) > 1 else None
+    engine = sys.argv[2] if len(sys.argv) > 2 else "keras"
+    if registry is None:
+        registry = os.path.join(tempfile.mkdtemp(), "registry")
+        model_registry.train_and_save(registry_dir=registry)
+    predictor = model_registry.load_artifact(os.path.join(registry, model_registry.latest_version(registry)), engine)
+    df = pd.read_csv(model_registry.DEFAULT_TEST)
+    frames = [df.iloc[i:i + ROWS_PER_REQUEST] for i in range(0, len(df), ROWS_PER_REQUEST)]
+
+    # results must match unbatched prediction exactly
+    service = PredictionService(lambda: predictor)
+    futures = [service.submit(f) for f in frames]
+    batched = np.concatenate([f.result() for f in futures])
+    assert np.array_equal(batched, predictor.predict(df)), "batched predictions differ from predict()"
+    service.close()
+
+    print(f"engine={engine}, {ROWS_PER_REQUEST} rows per request, {SECONDS:.0f}s per run")
+    print(f"{'callers':>7} {'mode':>8} {'req/s':>9} {'p50':>9} {'p95':>9}  batching")
+    for callers in CALLERS:
+        rps, p50, p95 = load(predictor.predict, callers, frames)
+        print(f"{callers:>7} {'direct':>8} {rps:9.0f} {p50:7.2f}ms {p95:7.2f}ms")
+        service = PredictionService(lambda: predictor)
+        rps, p50, p95 = load(service.predict, callers, frames)
+        stats = service.stats()
+        service.close()
+        print(f"{callers:>7} {'service':>8} {rps:9.0f} {p50:7.2f}ms {p95:7.2f}ms  "
+              f"{stats['mean_batch_requests']:.1f} req/batch (max {stats['largest_batch']}), "
+              f"max queue depth {stats['max_queue_depth']}")
@@ -0,0 +1,80 @@
+"""Accuracy and memory of the quantized skill model weights against float32.
+
+For the LATEST artifact, loads every serving engine and reports on the test CSV:
+  accuracy  - and its drop against the float32 NumPy engine
+  agree     - share of rows predicted the same level as float32
+  max |dp|  - largest probability difference from float32
+  weights   - bytes of the loaded weight arrays
+  per model - resident memory each further loaded copy adds, in a fresh interpreter that
+              loads MODELS copies after warming up (imports and allocator) with one
+  1 row     - predict() latency on one scaled row
+
+Run from the repository root (trains into a temporary registry if none is given):
+    python -m benchmarks.quantization [registry_dir]
+"""
+import os, subprocess, sys, tempfile, time
+import numpy as np
+import pandas as pd
+from utils import model_registry
+from utils.numpy_inference import NumpyNetwork
+
+ENGINES = ("keras", "numpy", "numpy-float16", "numpy-int8")
+MODELS = 50
+
+def per_call_ms(fn, X, repeat):
+    fn(X)  # warm up
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn(X)
+    return (time.perf_counter() - start) / repeat * 1000
+
+# Runs in a fresh interpreter; the first load pulls in the imports, later loads only add the model
+PROBE = """
+import sys
+from utils import model_registry
+def rss_kb():
+    return next(int(line.split()[1]) for line in open("/proc/self/status") if line.startswith("VmRSS"))
+loaded = [model_registry.load_artifact(sys.argv[1], sys.argv[2])]
+before = rss_kb()
+loaded += [model_registry.load_artifact(sys.argv[1], sys.argv[2]) for _ in range(int(sys.argv[3]))]
+print((rss_kb() - before) / int(sys.argv[3]), rss_kb() / 1024)
+"""
+
+def memory_per_model(path, engine):
+    out = subprocess.run([sys.executable, "-c", PROBE, path, engine, str(MODELS)], capture_output=True, text=True,
+                         check=True, env=dict(os.environ, TF_CPP_MIN_LOG_LEVEL="3"))
+    per_model_kb, rss_mb = out.stdout.split()
+    return float(per_model_kb), float(rss_mb)
+
+def weight_bytes(network):
+    if not isinstance(network, NumpyNetwork):
+        return None  # Keras: weights live in TensorFlow variables, plus optimizer slots
+    return sum(w.nbytes + b.nbytes + (0 if s is None else s.nbytes)
+               for (w, b, _), s in zip(network.layers, network.scales))
+
+if __name__ == "__main__":
+    registry = sys.argv[1] if len(sys.argv) > 1 else None
+    if registry is None:
+        registry = os.path.join(tempfile.mkdtemp(), "registry")
+        model_registry.train_and_save(registry_dir=registry, backend="mlp")
+    path = os.path.join(registry, model_registry.latest_version(registry))
+
+    df = pd.read_csv(model_registry.DEFAULT_TEST)
+    predictors = {engine: model_registry.load_artifact(path, engine) for engine in ENGINES}
+    X = predictors["numpy"].pipeline.transform(df)
+    y = df["skill_level"].to_numpy() - 1
+    reference = predictors["numpy"].skill_predictor.predict(X)
+    base_accuracy = float((reference.argmax(axis=1) == y).mean())
+
+    print(f"{'':>14} {'accuracy':>9} {'drop':>8} {'agree':>8} {'max |dp|':>9} {'weights':>9} {'per model':>10}"
+          f" {'RSS':>7} {'1 row':>9}")
+    for engine, predictor in predictors.items():
+        proba = predictor.skill_predictor.predict(X)
+        accuracy = float((proba.argmax(axis=1) == y).mean())
+        agree = float((proba.argmax(axis=1) == reference.argmax(axis=1)).mean())
+        size = weight_bytes(predictor.skill_predictor)
+        per_model_kb, rss_mb = memory_per_model(path, engine)
+        one = per_call_ms(predictor.skill_predictor.predict, X[:1], 200)
+        print(f"{engine:>14} {accuracy:9.4f} {base_accuracy - accuracy:+8.4f} {agree:8.2%}"
+              f" {np.abs(proba - reference).max():9.2e} {'-' if size is None else f'{size / 1024:.1f}KB':>9}"
+              f" {per_model_kb:8.0f}KB {rss_mb:5.0f}MB {one:7.3f}ms")
@@ -0,0 +1,40 @@
+"""Throughput of DatabaseManager.record_quiz_answer in direct vs write-behind mode.
+
+Run from the repository root:
+    python -m benchmarks.record_answers [sessions] [answers_per_session]
+"""
+import os, sys, tempfile, threading, time
+from utils.database import DatabaseManager
+
+def run(write_behind: bool, sessions: int, answers: int) -> float:
+    db_dir = tempfile.mkdtemp()
+    db = DatabaseManager(os.path.join(db_dir, "bench.db"), write_behind=write_behind)
+    uids = [db.create_user(f"learner{i}", "Visual") for i in range(sessions)]
+
+    def session(uid):
+        for n in range(answers):
+            db.record_quiz_answer(uid, "Science", "Biology", f"Question {n % 15}",
+                                  "A", "B", n % 3 == 0, 1 + n % 3)
+
+    threads = [threading.Thread(target=session, args=(uid,)) for uid in uids]
+    start = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    db.flush()
+    elapsed = time.perf_counter() - start
+
+    assert db.get_user_stats(uids[0])["total_questions"] == answers
+    if db.writer is not None:
+        db.writer.close()
+    db.pool.close_all()
+    return sessions * answers / elapsed
+
+if __name__ == "__main__":
+    sessions = int(sys.argv[1]) if len(sys.argv) > 1 else 30
+    answers = int(sys.argv[2]) if len(sys.argv) > 2 else 200
+    for mode in (False, True):
+        rate = run(mode, sessions, answers)
+        print(f"{'write-behind' if mode else 'direct':>12}: {rate:10.0f} answers/s "
+              f"({sessions} sessions x {answers} answers)")
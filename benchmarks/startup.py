@@ -0,0 +1,78 @@
+"""Import budget and cold-start time for the login screen.
+
+Fails (exit status 1) if importing streamlit_app or rendering the login screen pulls in
+TensorFlow, plotly, pandas or scikit-learn on top of what Streamlit itself imports, and
+reports the cold-start-to-first-render time of a fresh interpreter. The import budget of
+streamlit_app alone is also checked by tests/test_startup.py.
+
+Run from the repository root:
+    python -m benchmarks.startup [runs]
+"""
+import os, subprocess, sys, tempfile
+
+REPO = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+FORBIDDEN = ("tensorflow", "plotly", "pandas", "sklearn")
+
+# Renders the login screen once with Streamlit's headless test runner and lists the
+# forbidden modules the app added beyond Streamlit's own imports
+FIRST_RENDER = """
+import sys, time
+start = time.perf_counter()
+from streamlit.testing.v1 import AppTest
+before = set(sys.modules)
+at = AppTest.from_file(sys.argv[1], default_timeout=60).run()
+assert not at.exception, at.exception
+elapsed = time.perf_counter() - start
+added = [m for m in set(sys.modules) - before if m.split(".")[0] in sys.argv[2].split(",")]
+print(elapsed, ",".join(sorted(added)))
+"""
+
+def sandbox() -> str:
+    # the app opens data/learning_platform.db and components/logo.png relative to the cwd,
+    # so run it against an empty database instead of the real one
+    cwd = tempfile.mkdtemp()
+    os.makedirs(os.path.join(cwd, "data"))
+    os.symlink(os.path.join(REPO, "components"), os.path.join(cwd, "components"))
+    return cwd
+
+def run(code, *args, flags=()):
+    env = dict(os.environ, PYTHONPATH=REPO, TF_CPP_MIN_LOG_LEVEL="3")
+    return subprocess.run([sys.executable, *flags, "-c", code, *args], cwd=sandbox(), env=env,
+                          capture_output=True, text=True, check=True)
+
+def importtime(module: str):
+    """Modules imported by `import module` and its cumulative import time in seconds."""
+    modules, total = set(), 0.0
+    for line in run(f"import {module}", flags=("-X", "importtime")).stderr.splitlines():
+        if line.startswith("import time:") and "|" in line:
+            _, cumulative, name = line[len("import time:"):].split("|")
+            name = name.strip()
+            modules.add(name)
+            if name == module:
+                total = int(cumulative) / 1e6
+    return modules, total
+
+if __name__ == "__main__":
+    runs = int(sys.argv[1]) if len(sys.argv) > 1 else 3
+    failures = []
+
+    streamlit_modules, streamlit_seconds = importtime("streamlit")
+    app_modules, app_seconds = importtime("streamlit_app")
+    added = app_modules - streamlit_modules
+    heavy = sorted(m for m in added if m.split(".")[0] in FORBIDDEN)
+    print(f"import streamlit:     {streamlit_seconds:.2f}s")
+    print(f"import streamlit_app: {app_seconds:.2f}s, {len(added)} modules beyond streamlit")
+    if heavy:
+        failures.append(f"streamlit_app imports {heavy}")
+
+    times = []
+    for _ in range(runs):
+        seconds, loaded = run(FIRST_RENDER, os.path.join(REPO, "streamlit_app.py"), ",".join(FORBIDDEN)).stdout.splitlines()[0].split(" ")
+        times.append(float(seconds))
+        if loaded:
+            failures.append(f"login render imports {loaded}")
+    print(f"cold start to first render: best {min(times):.2f}s, mean {sum(times)/len(times):.2f}s over {runs} runs")
+
+    for failure in failures:
+        print("FAIL:", failure)
+    sys.exit(1 if failures else 0)
@@ -0,0 +1,83 @@
+"""Peak memory of one skill model training epoch, eager vs streamed, as rows grow.
+
+Writes synthetic competency CSVs of increasing size, then in a fresh interpreter per run
+measures the peak resident set (VmHWM) of:
+  eager  - pd.read_csv with inferred dtypes, FeaturePipeline.fit and transform of the
+           whole file, then FFNeuralNetwork.train on the in-memory matrix (what
+           SkillPredictor did before utils.training_data)
+  stream - scan_labels, fit_chunks, then FFNeuralNetwork.train_stream on the tf.data
+           datasets of a 90/10 TrainingStream split, as SkillPredictor trains now
+Both train for a single epoch. The eager peak grows with the row count; the streamed
+peak should stay flat. Needs TensorFlow.
+
+Run from the repository root:
+    python -m benchmarks.training_data [rows ...]     # default 250_000 1_000_000 4_000_000
+"""
+import os, subprocess, sys, tempfile
+import numpy as np
+import pandas as pd
+
+NUM_LEVELS = 5
+
+def write_synthetic(path, rows, seed=0, chunk=1_000_000):
+    rng = np.random.default_rng(seed)
+    for i, start in enumerate(range(0, rows, chunk)):
+        n = min(chunk, rows - start)
+        pd.DataFrame({
+            "user_id": rng.integers(1, 1000, n),
+            "question_id": rng.integers(1, 20000, n),
+            "time_spent_sec": rng.gamma(2.0, 20.0, n).round(2),
+            "question_difficulty": rng.integers(1, NUM_LEVELS + 1, n),
+            "mcq_correct": rng.integers(0, 2, n),
+            "past_correct_pct": rng.random(n).round(3),
+            "skill_level": rng.integers(1, NUM_LEVELS + 1, n),
+        }).to_csv(path, mode="w" if i == 0 else "a", header=i == 0, index=False)
+
+# Runs in a fresh interpreter; VmHWM is the peak resident set of that process alone
+PROBE = """
+import math, sys, time
+import numpy as np, pandas as pd
+from utils.features import FeaturePipeline
+from utils.neural_network import FFNeuralNetwork
+from utils.training_data import TrainingStream, read_chunks, scan_labels
+path, mode = sys.argv[1], sys.argv[2]
+start = time.perf_counter()
+if mode == "eager":
+    df = pd.read_csv(path)
+    top = int(df["skill_level"].max())
+    pipeline = FeaturePipeline(top).fit(df)
+    X, y = pipeline.transform(df), df["skill_level"].values.astype(int) - 1
+    FFNeuralNetwork(pipeline.n_features, top).train(X, y, epochs=1)
+else:
+    rows, top = scan_labels(path)
+    pipeline = FeaturePipeline(top).fit_chunks(read_chunks(path))
+    split = math.ceil(rows * 0.9)
+    train = TrainingStream(path, pipeline, 0, split, shuffle=True)
+    validation = TrainingStream(path, pipeline, split, rows)
+    FFNeuralNetwork(pipeline.n_features, top).train_stream(train.dataset(), validation.dataset(), epochs=1)
+elapsed = time.perf_counter() - start
+hwm_kb = next(int(line.split()[1]) for line in open("/proc/self/status") if line.startswith("VmHWM"))
+print(elapsed, hwm_kb / 1024)
+"""
+
+def peak(path, mode):
+    out = subprocess.run([sys.executable, "-c", PROBE, path, mode], capture_output=True, text=True, check=True,
+                         env=dict(os.environ, TF_CPP_MIN_LOG_LEVEL="3"))
+    seconds, rss_mb = out.stdout.split()[-2:]
+    return float(seconds), float(rss_mb)
+
+if __name__ == "__main__":
+    modes = ["eager", "stream"]
+    sizes = [int(a) for a in sys.argv[1:]] or [250_000, 1_000_000, 4_000_000]
+    tmp = tempfile.mkdtemp()
+
+    print(f"{'rows':>12} {'csv':>8}" + "".join(f" {m + ' peak':>13} {'time':>7}" for m in modes))
+    for rows in sizes:
+        path = os.path.join(tmp, f"competency_{rows}.csv")
+        write_synthetic(path, rows)
+        line = f"{rows:12,} {os.path.getsize(path) / 2**20:6.0f}MB"
+        for mode in modes:
+            seconds, rss_mb = peak(path, mode)
+            line += f" {rss_mb:11.0f}MB {seconds:6.1f}s"
+        print(line)
+        os.remove(path)
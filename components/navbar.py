@@ -6,7 +6,7 @@ db = DatabaseManager()
 def nav_menu():
     st.image("components/logo.png", use_container_width=True)
 
-    user = db.get_user(st.session_state.user_id)
+    user = db.get_dashboard_snapshot(st.session_state.user_id).user
     st.write(f"👋 Welcome, **{user['name']}**")
     st.write(f"Learning Style: {user['learning_style']}")
     page = st.selectbox("Choose section:", ["📊 Dashboard", "📚 Learn", "🧩 Quiz", "📤 Upload", "📈 Progress", "⚙️ Settings"])
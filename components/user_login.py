@@ -4,6 +4,8 @@ from utils.database import DatabaseManager
 
 db = DatabaseManager()
 
+LOGIN_PAGE_SIZE = 50
+
 def show_user_login():
     # st.image("components/logo.png", width=100)
 
@@ -18,18 +20,34 @@ def show_user_login():
         st.markdown("## 👋 Welcome to AdaptAdept!")
         st.markdown("Please log in or create a new student account to begin.")
 
-    users = db.get_all_users()
-    user_names = [u["name"] for u in users]
-
     option = st.radio("Choose option:", ["Select existing account", "Create new account"])
 
     if option == "Select existing account":
-        if user_names:
-            sel = st.selectbox("Select your name:", user_names, key="login_select")
+        prefix = st.text_input("Search your name:", key="login_search").strip()
+        # Keyset pagination: a stack of the last row of each previous page
+        if st.session_state.get("login_search_prev") != prefix:
+            st.session_state.login_search_prev = prefix
+            st.session_state.login_cursors = [None]
+        cursors = st.session_state.login_cursors
+        users = db.search_users(prefix, after=cursors[-1], limit=LOGIN_PAGE_SIZE)
+
+        if users:
+            # Select by id so learners who share a name stay distinguishable
+            names = dict(users)
+            user_id = st.selectbox("Select your name:", list(names), key="login_select",
+                                   format_func=lambda uid: f"{names[uid]} (#{uid})")
+            col_prev, col_next = st.columns(2)
+            if len(cursors) > 1 and col_prev.button("Previous names"):
+                cursors.pop()
+                st.rerun()
+            if len(users) == LOGIN_PAGE_SIZE and col_next.button("More names"):
+                cursors.append(users[-1])
+                st.rerun()
             if st.button("Login"):
-                user_id = next(u["id"] for u in users if u["name"] == sel)
                 st.session_state.user_id = user_id
                 st.rerun()
+        elif prefix:
+            st.info("No students match that name.")
         else:
             st.info("No users found. Please create a new student.")
     
@@ -6,5 +6,44 @@ APP_CONFIG = {
         # "Mathematics": ["Arithmetic","Algebra","Geometry"],
         "Science": ["Biology","Chemistry"]
     },
-    "learning_styles": ["Visual","Auditory","Kinesthetic","Mixed"]
+    "learning_styles": ["Visual","Auditory","Kinesthetic","Mixed"],
+    "database": {
+        # Queue quiz answers and commit them in batches from a background thread
+        "write_behind": False,
+        "write_max_batch": 256,
+        "write_max_latency_ms": 20,
+        "write_max_queue": 10000,
+        # Retries (with exponential backoff) of a batch that fails to commit
+        "write_max_retries": 3,
+        # Process-wide LRU cache for per-user reads, invalidated by per-user data versions
+        "read_cache": True,
+        "cache_max_entries": 4096,
+        "cache_max_bytes": 16 * 1024 * 1024
+    },
+    "prediction": {
+        # Skill predictions from concurrent sessions are grouped into one forward pass for
+        # these serving engines; the NumPy engines are called directly (see
+        # benchmarks/prediction_service.py)
+        "batch_engines": ["keras"],
+        "max_batch_rows": 4096,
+        "max_wait_ms": 5,
+        "max_queue": 1000,
+        # Memoized predictions per (model version, learner feature rows); see utils/prediction_cache.py
+        "cache_max_entries": 4096,
+        "cache_ttl_seconds": 900,
+        # Serving engine for the skill model: "numpy" (float32 weights), "numpy-float16" or
+        # "numpy-int8" (see benchmarks/quantization.py), or "keras"
+        "engine": "numpy"
+    },
+    "training": {
+        # Worker processes for utils.training_jobs; each holds a full TensorFlow runtime
+        "max_workers": 1,
+        # After a failed job, retraining the same data waits this long, doubling with each
+        # consecutive failure up to the maximum (seconds)
+        "retry_backoff_s": 300,
+        "max_retry_backoff_s": 6 * 3600,
+        # Kind of skill model to train: "mlp", "logreg" or "hgb" (see utils/backends.py and
+        # benchmarks/backends.py for how they compare)
+        "backend": "mlp"
+    }
 }
@@ -17,17 +17,17 @@ adaptive_engine = AdaptiveEngine()
 
 def show():
     st.header("📊 Your Learning Dashboard")
-    stats = db.get_user_stats(st.session_state.user_id)
+    # One consistent read for every number on this page
+    snapshot = db.get_dashboard_snapshot(st.session_state.user_id)
     c1, c2, c3, c4 = st.columns(4)
-    c1.metric("Total Questions", stats["total_questions"])
-    c2.metric("Correct", stats["correct_answers"])
-    c3.metric("Accuracy", f"{stats['correct_answers']/max(stats['total_questions'],1)*100:.1f}%")
-    c4.metric("Current Level", stats["current_level"])
+    c1.metric("Total Questions", snapshot.total_questions)
+    c2.metric("Correct", snapshot.correct_answers)
+    c3.metric("Accuracy", f"{snapshot.accuracy:.1f}%")
+    c4.metric("Current Level", snapshot.current_level)
 
     # Daily streak counter
-    streak_data = db.get_user_streak_data(st.session_state.user_id)
-    streak_count = streak_data["streak_count"]
-    last_login_date = streak_data["last_login_date"]
+    streak_count = snapshot.streak_count
+    last_login_date = snapshot.last_login_date
     today = datetime.now().date()
 
     if last_login_date != today:
@@ -42,16 +42,16 @@ def show():
     c1, c2 = st.columns(2)
     with c1:
         st.subheader("Progress Over Time")
-        data = db.get_user_progress_data(st.session_state.user_id)
+        data = list(snapshot.progress)
         if data:
             # df = pd.DataFrame(data)
             # fig = px.line(df, x="date", y="accuracy", title="Accuracy by Day")
             # st.plotly_chart(fig, use_container_width=True)
             df = pd.DataFrame(data)
 
-            # Clean and trim data
+            # Clean data (already limited to the last 3 days by the query)
             df["date"] = pd.to_datetime(df["date"]).dt.date
-            df = df.sort_values("date").tail(3)
+            df = df.sort_values("date")
 
             # Ensure percentage scale
             if df["accuracy"].max() <= 1:
@@ -90,7 +90,7 @@ def show():
 
     with c2:
         st.subheader("Subject Performance")
-        sub = db.get_subject_stats(st.session_state.user_id)
+        sub = list(snapshot.subjects)
         if sub:
             df = pd.DataFrame(sub)
 
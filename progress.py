@@ -14,8 +14,7 @@ adaptive_engine = AdaptiveEngine()
 
 def show():
     st.header("📈 Detailed Progress Analytics")
-    stats = db.get_user_stats(st.session_state.user_id)
-    acc = stats['correct_answers']/max(stats['total_questions'],1)*100
+    acc = db.get_dashboard_snapshot(st.session_state.user_id).accuracy
     fig = go.Figure(go.Indicator(mode="gauge+number", value=acc,
                                  gauge={'axis':{'range':[0,100]}}))
     st.plotly_chart(fig, use_container_width=True)
@@ -3,6 +3,7 @@ import streamlit as st
 from utils.database import DatabaseManager
 from utils.adaptive_logic import AdaptiveEngine
 import random
+import time
 from config.settings import APP_CONFIG
 
 db = DatabaseManager()
@@ -274,7 +275,8 @@ def show():
     # Get next question
     if qs["q"] is None:
         bank = fallback_bank.get(subj, {}).get(topic, {})
-        level_questions = bank.get(min(qs["level"], 3), [])
+        qs["q_level"] = min(qs["level"], 3)
+        level_questions = bank.get(qs["q_level"], [])
         if qs["n"] < len(level_questions):
             qs["q"] = level_questions[qs["n"]]
         elif level_questions:
@@ -282,6 +284,8 @@ def show():
         else:
             st.error("No questions available for this topic.")
             return
+        # time spent on the question is a feature of the skill model
+        qs["shown_at"] = time.monotonic()
 
     # Show question
     q = qs["q"]
@@ -308,27 +312,49 @@ def show():
             st.session_state.user_id,
             subj, topic,
             q["question"], ans, q["correct_answer"], correct,
-            qs["level"]
+            qs["level"],
+            options=q["options"], explanation=q.get("explanation"),
+            question_level=qs.get("q_level"),
+            time_spent_sec=round(time.monotonic() - qs["shown_at"], 2) if "shown_at" in qs else None
         )
         qs["level"] = adaptive_engine.adjust_difficulty(qs["level"], correct, qs["n"], qs["correct"])
         qs["q"] = None
         st.rerun()
 
-from utils.skill_predictor import SkillPredictor, get_prediction_summary
-import pandas as pd
-
 def show_skill_prediction():
+    # Imported here so opening the quiz page doesn't load pandas, scikit-learn or the model
+    from utils.skill_predictor import get_prediction_summary
+    from utils.model_registry import get_serving_predictor
+    from utils.prediction_service import predict_levels
+    from utils.prediction_cache import get_prediction_cache
+    import pandas as pd
+
     st.subheader("🧠 Predicted Skill Level")
 
     try:
-        with st.spinner("🔄 Training model and predicting your skill level..."):
-            predictor = SkillPredictor()
-            predictor.process_datasets_and_train()
+        # Loaded once per process from the model registry; training happens elsewhere
+        predictor = get_serving_predictor()
+        if predictor is None:
+            st.info("⏳ The skill model is still being trained. Finish another quiz in a few minutes to see your prediction.")
+            return
 
-            test_df = pd.read_csv("utils/competency_v2_test.csv")
-            predictions = predictor.predict(test_df)
+        with st.spinner("🔄 Predicting your skill level..."):
+            # the learner's recent attempts, kept up to date by record_quiz_answer
+            features = pd.DataFrame(db.get_learner_features(st.session_state.user_id)["rows"])
+            if features.empty:
+                st.info("Answer a few questions to get a skill prediction.")
+                return
 
-            summary = get_prediction_summary(predictions)
+            def predict():
+                # batched with other sessions' predictions when the serving engine benefits from it
+                predictions = predict_levels(predictor, features, timeout=30)
+                # quote the served model's measured test accuracy rather than a fixed figure
+                accuracy = predictor.test_accuracy
+                return predictions, get_prediction_summary(predictions, None if accuracy is None else accuracy * 100)
+
+            # reruns and revisits reuse the result until the learner answers again or a new model is served
+            predictions, summary = get_prediction_cache(db.pool).get_or_compute(
+                st.session_state.user_id, features, predictor.version, predict)
         
         st.success("✅ Prediction complete!")
         st.markdown(summary)
@@ -336,5 +362,3 @@ def show_skill_prediction():
     except Exception as e:
         st.error("⚠️ Failed to generate skill prediction.")
         st.exception(e)
-
-
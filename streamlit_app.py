@@ -1,9 +1,19 @@
-
+import importlib
 import streamlit as st
-import dashboard, learn, quiz, upload, progress, settings
 from components.user_login import show_user_login
 from components.navbar import nav_menu
 
+# Page modules are imported on first visit, so the login screen never pays for
+# pandas/plotly (dashboard, progress) or the skill model (quiz)
+PAGES = {
+    "📊 Dashboard": "dashboard",
+    "📚 Learn": "learn",
+    "🧩 Quiz": "quiz",
+    "📤 Upload": "upload",
+    "📈 Progress": "progress",
+    "⚙️ Settings": "settings",
+}
+
 def main():
     st.set_page_config(page_title="AdaptAdept", page_icon="🎓", layout="wide")
 
@@ -22,24 +32,8 @@ def main():
     if st.session_state.user_id is None:
         # page_welcome()
         st.markdown("## 👋 Welcome to AdaptLearn! Please log in to get started.")
-    else:
-        if page == "📊 Dashboard":
-            # page_dashboard()
-            dashboard.show()
-        elif page == "📚 Learn":
-            # page_learn()
-            learn.show()
-        elif page == "🧩 Quiz":
-            # page_quiz()
-            quiz.show()
-        elif page == "📤 Upload":
-            upload.show()
-        elif page == "📈 Progress":
-            # page_progress()
-            progress.show()
-        elif page == "⚙️ Settings":
-            # page_settings()
-            settings.show()
+    elif page in PAGES:
+        importlib.import_module(PAGES[page]).show()
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,39 @@
+"""The per-user aggregate tables stay in step with quiz_attempts."""
+
+from utils.database import DatabaseManager
+
+def _tables(db):
+    with db.pool.read() as conn:
+        return {table: sorted(tuple(r) for r in conn.execute(f"SELECT * FROM {table}"))
+                for table in ("user_stats", "user_subject_stats", "daily_user_accuracy")}
+
+def _answer_some(db):
+    ada, bob = db.create_user("Ada", "Visual"), db.create_user("Bob", "Visual")
+    for i in range(5):
+        db.record_quiz_answer(ada, "Science", "Biology", f"B{i}", "A", "A", i % 2 == 0, 1 + i)
+        db.record_quiz_answer(ada, "Math", "Algebra", f"M{i}", "A", "B", False, 2)
+        db.record_quiz_answer(bob, "Science", "Chemistry", f"C{i}", "A", "A", True, 3)
+    return ada, bob
+
+def test_rebuild_agrees_with_incremental_aggregates(tmp_path):
+    db = DatabaseManager(str(tmp_path / "agg.db"), write_behind=False)
+    ada, _ = _answer_some(db)
+    incremental = _tables(db)
+    report = db.rebuild_aggregates()
+    assert _tables(db) == incremental
+    assert (report["drifted_users"], report["drifted_user_subjects"], report["drifted_user_days"],
+            report["drifted_learners"]) == ([], [], [], [])
+    assert report["users"] == 2 and report["user_subjects"] == 3
+    assert db.get_user_stats(ada) == {"total_questions": 10, "correct_answers": 3, "current_level": 5}
+
+def test_rebuild_repairs_drift(tmp_path):
+    db = DatabaseManager(str(tmp_path / "agg.db"), write_behind=False)
+    ada, _ = _answer_some(db)
+    incremental = _tables(db)
+    with db.pool.write() as conn:
+        conn.execute("UPDATE user_stats SET total_questions = 99 WHERE user_id=?", (ada,))
+        conn.execute("DELETE FROM user_subject_stats WHERE user_id=? AND subject='Math'", (ada,))
+    report = db.rebuild_aggregates()
+    assert report["drifted_users"] == [ada]
+    assert report["drifted_user_subjects"] == [(ada, "Math")]
+    assert _tables(db) == incremental
@@ -0,0 +1,41 @@
+"""A write-behind batch that fails to commit is retried, and never silently dropped."""
+
+import pytest
+from utils.database import AnswerWriteError, AnswerWriter, ConnectionManager
+
+def _writer(tmp_path, apply, **kwargs):
+    pool = ConnectionManager(str(tmp_path / "writer.db"))
+    return AnswerWriter(pool, apply, max_latency_ms=1, retry_delay_ms=1, **kwargs)
+
+def test_transient_failure_is_retried(tmp_path):
+    written, calls = [], []
+    def apply(conn, rows):
+        calls.append(len(rows))
+        if len(calls) < 3:
+            raise RuntimeError("database is locked")
+        written.extend(rows)
+    writer = _writer(tmp_path, apply, max_retries=3)
+    writer.submit(1, "a")
+    writer.submit(1, "b")
+    writer.flush()
+    assert sorted(written) == ["a", "b"] and not writer.failed
+    writer.close()
+
+def test_persistent_failure_is_reported_and_kept(tmp_path):
+    written = []
+    def apply(conn, rows):
+        if "bad" in rows:
+            raise ValueError("bad row")
+        written.extend(rows)
+    writer = _writer(tmp_path, apply, max_retries=1)
+    for row in ("a", "bad", "b"):
+        writer.submit(1, row)
+    with pytest.raises(AnswerWriteError) as excinfo:
+        writer.flush()
+    assert excinfo.value.rows == ["bad"]
+    assert sorted(written) == ["a", "b"]  # the rest of the batch still committed
+
+    assert writer.retry_failed() == 1
+    with pytest.raises(AnswerWriteError):
+        writer.flush()
+    writer.close()
@@ -0,0 +1,25 @@
+"""A cached dashboard snapshot cannot be changed by the page that reads it."""
+
+import dataclasses
+import pytest
+from utils.database import DatabaseManager
+
+def test_snapshot_is_immutable_and_shared(tmp_path):
+    db = DatabaseManager(str(tmp_path / "snap.db"), write_behind=False)
+    uid = db.create_user("Ada", "Visual")
+    db.record_quiz_answer(uid, "Science", "Biology", "What is a cell?", "A", "A", True, 1)
+    snapshot = db.get_dashboard_snapshot(uid)
+    assert db.get_dashboard_snapshot(uid) is snapshot  # a cache hit shares the object
+
+    with pytest.raises(TypeError):
+        snapshot.user["name"] = "Eve"
+    with pytest.raises(AttributeError):
+        snapshot.progress[0].accuracy = 0.0
+    with pytest.raises(AttributeError):
+        snapshot.subjects[0].subject = "Art"
+    with pytest.raises(dataclasses.FrozenInstanceError):
+        snapshot.total_questions = 0
+
+    assert snapshot.user["name"] == "Ada"
+    assert [s.subject for s in snapshot.subjects] == ["Science"]
+    assert snapshot.progress[0].accuracy == 100.0
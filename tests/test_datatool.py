@@ -0,0 +1,95 @@
+"""Exports are labelled like the competency CSVs; imports put their indexes back even when
+killed, and invalidate cached reads."""
+
+import os, subprocess, sys, textwrap
+import pandas as pd
+from utils import model_registry
+from utils.database import DatabaseManager
+from utils.datatool import COMPETENCY_COLUMNS, export_table, import_table
+from utils.skill_predictor import SkillPredictor
+
+# learner accuracy -> the level the adaptive engine has them at (higher for stronger
+# learners, the opposite direction from skill_level)
+LEARNERS = {0.97: 5, 0.93: 5, 0.85: 4, 0.8: 4, 0.7: 3, 0.6: 3, 0.4: 2, 0.3: 2, 0.2: 1, 0.1: 1}
+ANSWERS = 60
+
+def _database(path):
+    db = DatabaseManager(path, write_behind=False)
+    for accuracy, level in LEARNERS.items():
+        uid = db.create_user(f"learner {accuracy}", "Visual")
+        for i in range(ANSWERS):
+            correct = int((i + 1) * accuracy) > int(i * accuracy)
+            db.record_quiz_answer(uid, "Science", "Biology", f"Q{i}", "A", "A" if correct else "B", correct,
+                                  level, question_level=1 + i % 5, time_spent_sec=30.0 + i % 7)
+    return db
+
+def test_competency_export_round_trips_into_training(tmp_path):
+    db = _database(str(tmp_path / "export.db"))
+    path = str(tmp_path / "competency.csv")
+    assert export_table(db, "competency", path) == len(LEARNERS) * ANSWERS
+    exported = pd.read_csv(path)
+    assert list(exported.columns) == COMPETENCY_COLUMNS
+
+    # each level sits in the same past_correct_pct band as in the CSVs (the top and bottom
+    # bands are open-ended)
+    csv = pd.read_csv(model_registry.DEFAULT_TRAIN)
+    bands = csv.groupby("skill_level")["past_correct_pct"].agg(["min", "max"])
+    settled = exported.groupby("user_id").tail(ANSWERS // 2)  # past the first answers' noise
+    for level, rows in settled.groupby("skill_level"):
+        if level < 5:
+            assert bands.loc[level, "min"] - 0.01 <= rows["past_correct_pct"].min()
+        if level > 1:
+            assert rows["past_correct_pct"].max() <= bands.loc[level, "max"] + 0.01
+    by_learner = settled.groupby("user_id")["skill_level"].agg(lambda s: s.mode()[0])
+    assert list(by_learner) == [1, 1, 2, 2, 3, 3, 4, 4, 5, 5]
+
+    predictor = SkillPredictor(path, model_registry.DEFAULT_TEST, cache_dir=None, backend="logreg")
+    predictor.process_datasets_and_train()
+    # a model trained on the export scores the CSV test set on the same scale: inverted
+    # labels would put the strongest learners at level 5
+    test = pd.read_csv(model_registry.DEFAULT_TEST)
+    assert predictor.test_accuracy > 0.75
+    assert (predictor.predict(test) - test["skill_level"]).abs().max() <= 1
+
+def _indexes(db, table):
+    with db.pool.read() as conn:
+        return {r[0] for r in conn.execute("SELECT name FROM sqlite_master WHERE type='index' AND tbl_name=? "
+                                           "AND sql IS NOT NULL", (table,))}
+
+def test_killed_import_leaves_indexes_to_restore(tmp_path):
+    db_path, data = str(tmp_path / "import.db"), str(tmp_path / "users.csv")
+    db = DatabaseManager(db_path, write_behind=False)
+    db.create_user("Ada", "Visual")
+    export_table(db, "users", data)
+    expected = _indexes(db, "users")
+    assert expected
+
+    # the load dies between dropping the indexes and its finally block
+    script = textwrap.dedent("""
+        import os, sys
+        from utils import datatool
+        def die(*args, **kwargs):
+            os._exit(1)
+            yield
+        datatool._read_chunks = die
+        datatool.import_table(datatool.DatabaseManager(sys.argv[1], write_behind=False), "users", sys.argv[2])
+    """)
+    result = subprocess.run([sys.executable, "-c", script, db_path, data], cwd=os.getcwd())
+    assert result.returncode == 1
+    assert _indexes(db, "users") == set()
+
+    db.pool.schema_checked = False  # as in a freshly started process
+    DatabaseManager(db_path, write_behind=False)
+    assert _indexes(db, "users") == expected
+    with db.pool.read() as conn:
+        assert conn.execute("SELECT COUNT(*) FROM dropped_indexes").fetchone()[0] == 0
+
+def test_import_invalidates_cached_reads(tmp_path):
+    db = DatabaseManager(str(tmp_path / "import.db"), write_behind=False)
+    uid = db.create_user("Ada", "Visual")
+    assert db.get_user(uid)["name"] == "Ada"
+    data = tmp_path / "users.jsonl"
+    data.write_text(f'{{"id": {uid}, "name": "Ada Lovelace", "learning_style": "Visual"}}\n')
+    assert import_table(db, "users", str(data)) == 1
+    assert db.get_user(uid)["name"] == "Ada Lovelace"
+    assert "idx_users_name" in _indexes(db, "users")
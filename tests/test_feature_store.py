@@ -0,0 +1,35 @@
+"""The learner feature store's ring buffer holds exactly the last RECENT_WINDOW attempts."""
+
+from utils.database import DatabaseManager
+
+def _answer(db, uid, n, start=0):
+    for i in range(start, start + n):
+        db.record_quiz_answer(uid, "Science", "Biology", f"Q{i}", "A", "A", i % 3 != 0, 1,
+                              question_level=1 + i % 5, time_spent_sec=float(i))
+
+def test_ring_buffer_keeps_the_last_attempts_in_order(tmp_path):
+    db = DatabaseManager(str(tmp_path / "store.db"), write_behind=False)
+    uid = db.create_user("Ada", "Visual")
+    window = db.RECENT_WINDOW
+
+    _answer(db, uid, 5)
+    assert [r["time_spent_sec"] for r in db.get_learner_features(uid)["rows"]] == [0.0, 1.0, 2.0, 3.0, 4.0]
+
+    total = 2 * window + 7
+    _answer(db, uid, total - 5, start=5)
+    features = db.get_learner_features(uid)
+    rows = features["rows"]
+    assert len(rows) == window
+    kept = range(total - window, total)
+    assert [r["time_spent_sec"] for r in rows] == [float(i) for i in kept]
+    assert [r["question_difficulty"] for r in rows] == [1 + i % 5 for i in kept]
+    assert [r["mcq_correct"] for r in rows] == [int(i % 3 != 0) for i in kept]
+    # accuracy over every attempt before each kept one, not just the window
+    assert [round(r["past_correct_pct"], 6) for r in rows] == [
+        round(sum(j % 3 != 0 for j in range(i)) / i, 6) for i in kept]
+    assert features["total_questions"] == total
+    with db.pool.read() as conn:
+        assert conn.execute("SELECT COUNT(*) FROM learner_recent_attempts WHERE user_id=?", (uid,)).fetchone()[0] == window
+
+    # the incrementally maintained buffer is what a rebuild from quiz_attempts produces
+    assert db.rebuild_aggregates()["drifted_learners"] == []
@@ -0,0 +1,43 @@
+"""FeaturePipeline reproduces the features SkillPredictor built before it."""
+
+import numpy as np
+import pandas as pd
+import pytest
+from utils import model_registry
+from utils.features import NUMERIC_FEATURES, FeaturePipeline
+from utils.skill_predictor import thermometer_encode
+
+StandardScaler = pytest.importorskip("sklearn.preprocessing").StandardScaler
+
+def _legacy_thermometer(values, num_levels):
+    # SkillPredictor's per-row loop before FeaturePipeline
+    thermometer = np.zeros((len(values), num_levels), dtype=np.float32)
+    for i, v in enumerate(values):
+        thermometer[i, :v + 1] = 1.0
+    return thermometer
+
+def _legacy_features(train, test, num_levels):
+    def encode(df):
+        qdiff = df["question_difficulty"].values.astype(int) - 1
+        return np.concatenate([df[NUMERIC_FEATURES].values.astype(np.float32),
+                               _legacy_thermometer(qdiff, num_levels)], axis=1)
+    scaler = StandardScaler()
+    return scaler.fit_transform(encode(train)), scaler.transform(encode(test))
+
+def test_pipeline_matches_legacy_encoder_and_scaler():
+    train, test = pd.read_csv(model_registry.DEFAULT_TRAIN), pd.read_csv(model_registry.DEFAULT_TEST)
+    legacy_train, legacy_test = _legacy_features(train, test, 5)
+    pipeline = FeaturePipeline(5).fit(train)
+    np.testing.assert_allclose(pipeline.transform(train), legacy_train, atol=1e-5)
+    np.testing.assert_allclose(pipeline.transform(test), legacy_test, atol=1e-5)
+
+def test_chunked_fit_matches_whole_fit():
+    train = pd.read_csv(model_registry.DEFAULT_TRAIN)
+    whole = FeaturePipeline(5).fit(train)
+    chunked = FeaturePipeline(5).fit_chunks(train.iloc[i:i + 777] for i in range(0, len(train), 777))
+    np.testing.assert_allclose(chunked.mean, whole.mean, rtol=1e-6)
+    np.testing.assert_allclose(chunked.scale, whole.scale, rtol=1e-6)
+
+def test_thermometer_encode_matches_legacy_loop():
+    values = np.array([0, 4, 2, 1, 3, 0])
+    np.testing.assert_array_equal(thermometer_encode(values, 5), _legacy_thermometer(values, 5))
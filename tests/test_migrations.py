@@ -0,0 +1,36 @@
+"""Migration 6 moves legacy attempts' question text into the catalog."""
+
+import sqlite3
+from utils.migrations import LATEST_VERSION, current_version, migrate
+from utils.questions import question_content_id
+
+def test_question_catalog_dedups_legacy_attempts(tmp_path):
+    conn = sqlite3.connect(str(tmp_path / "legacy.db"), isolation_level=None)
+    conn.execute("BEGIN IMMEDIATE")
+    assert migrate(conn, target=5) == [1, 2, 3, 4, 5]
+    conn.executemany("""INSERT INTO quiz_attempts (user_id, subject, topic, question, user_answer, correct_answer,
+            is_correct, difficulty_level) VALUES (?,?,?,?,?,?,?,?)""", [
+        (1, "Science", "Biology", "What is a cell?", "A", "A", 1, 1),
+        (2, "Science", "Biology", "What is a cell?", "B", "A", 0, 2),
+        (1, "Science", "Biology", "What is a gene?", "C", "C", 1, 2),
+        (1, "Science", "Physics", "What is a cell?", "A", "A", 1, 1),  # same text, other topic
+        (1, "Science", "Biology", None, "A", None, 0, 1),
+    ])
+    conn.execute("COMMIT")
+
+    conn.execute("BEGIN IMMEDIATE")
+    assert migrate(conn) == list(range(6, LATEST_VERSION + 1))
+    conn.execute("COMMIT")
+    assert current_version(conn) == LATEST_VERSION
+
+    assert conn.execute("SELECT COUNT(*) FROM questions").fetchone()[0] == 3
+    rows = conn.execute("SELECT id, question_id, question, correct_answer FROM quiz_attempts ORDER BY id").fetchall()
+    cell = question_content_id("Science", "Biology", None, "What is a cell?", None, "A", None)
+    assert rows[0][1] == rows[1][1] == cell
+    assert rows[2][1] not in (None, cell) and rows[3][1] not in (None, cell, rows[2][1])
+    assert rows[4][1] is None
+    assert all(question is None and correct is None for _, _, question, correct in rows)
+    # the view still shows each attempt with its question text
+    details = conn.execute("SELECT question, correct_answer FROM quiz_attempt_details ORDER BY id").fetchall()
+    assert details == [("What is a cell?", "A"), ("What is a cell?", "A"), ("What is a gene?", "C"),
+                       ("What is a cell?", "A"), (None, None)]
@@ -0,0 +1,48 @@
+"""Artifacts saved in the same second from the same data do not collide."""
+
+import os, threading
+from datetime import datetime
+import numpy as np
+import pandas as pd
+from utils import model_registry
+from utils.features import FeaturePipeline
+from utils.numpy_inference import NumpyNetwork
+from utils.skill_predictor import SkillPredictor
+
+class _FixedClock(datetime):
+    @classmethod
+    def now(cls, tz=None):
+        return cls(2024, 1, 1, 12, 0, 0)
+
+def _predictor():
+    predictor = SkillPredictor(backend="logreg")
+    predictor.num_classes = 5
+    predictor.pipeline = FeaturePipeline(5, np.zeros(8), np.ones(8))
+    predictor.skill_predictor = NumpyNetwork([(np.zeros((8, 5)), np.zeros(5), "softmax")])
+    predictor.test_accuracy = 0.5
+    return predictor
+
+def test_same_second_saves_get_their_own_artifacts(tmp_path, monkeypatch):
+    monkeypatch.setattr(model_registry, "datetime", _FixedClock)
+    registry = str(tmp_path / "registry")
+    paths, errors = [], []
+
+    def save():
+        try:
+            paths.append(model_registry.save_artifact(_predictor(), registry, publish=False))
+        except Exception as e:
+            errors.append(e)
+    threads = [threading.Thread(target=save) for _ in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert errors == []
+    assert len(set(paths)) == 4
+    assert sorted(os.listdir(registry)) == sorted(os.path.basename(p) for p in paths)  # no .partial leftovers
+    for path in paths:
+        assert model_registry.read_meta(path)["version"] == os.path.basename(path)
+        row = pd.DataFrame({"time_spent_sec": [30.0], "mcq_correct": [1], "past_correct_pct": [0.5],
+                            "question_difficulty": [3]})
+        assert len(model_registry.load_artifact(path).predict(row)) == 1
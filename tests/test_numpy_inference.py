@@ -0,0 +1,60 @@
+"""NumpyNetwork.from_keras reproduces the Keras model's probabilities, and its float16 and
+int8 copies stay within a stated tolerance of float32."""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+tf = pytest.importorskip("tensorflow")
+from utils import model_registry
+from utils.features import FeaturePipeline
+from utils.neural_network import FFNeuralNetwork
+from utils.numpy_inference import NumpyNetwork
+
+# (least share of test rows predicted the same level as float32, largest accuracy drop,
+#  largest probability difference) per quantized precision
+TOLERANCE = {"float16": (0.995, 0.005, 0.01), "int8": (0.98, 0.01, 0.25)}
+
+def test_export_matches_keras_predict():
+    layers = tf.keras.layers
+    model = tf.keras.Sequential([
+        tf.keras.Input(shape=(8,)),
+        layers.Dense(16, activation="relu"),
+        layers.BatchNormalization(),
+        layers.Dropout(0.2),
+        layers.Dense(8, activation="relu"),
+        layers.Dense(5, activation="softmax"),
+    ])
+    rng = np.random.default_rng(0)
+    # non-trivial moving statistics, so the folded BatchNorm is exercised
+    bn = model.layers[1]
+    bn.set_weights([rng.uniform(0.5, 2.0, 16), rng.normal(size=16), rng.normal(size=16), rng.uniform(0.5, 2.0, 16)])
+    X = rng.normal(size=(64, 8)).astype(np.float32)
+
+    expected = model.predict(X, verbose=0)
+    assert np.allclose(NumpyNetwork.from_keras(model).predict(X), expected, atol=1e-5)
+
+@pytest.fixture(scope="module")
+def trained():
+    train = pd.read_csv(model_registry.DEFAULT_TRAIN)
+    pipeline = FeaturePipeline(5).fit(train)
+    tf.keras.utils.set_random_seed(0)
+    network = FFNeuralNetwork(pipeline.n_features, 5)
+    network.model.fit(pipeline.transform(train), train["skill_level"].to_numpy() - 1, epochs=10, verbose=0)
+    return pipeline, NumpyNetwork.from_keras(network.model)
+
+@pytest.mark.parametrize("precision", sorted(TOLERANCE))
+def test_quantized_weights_stay_close_to_float32(trained, precision, tmp_path):
+    pipeline, full = trained
+    test = pd.read_csv(model_registry.DEFAULT_TEST)
+    # through save/load, as served from the artifact's weights.<precision>.npz
+    full.quantize(precision).save(tmp_path / "weights.npz")
+    quantized = NumpyNetwork.load(tmp_path / "weights.npz")
+    assert quantized.precision == precision
+
+    X, y = pipeline.transform(test), test["skill_level"].to_numpy() - 1
+    reference, proba = full.predict(X), quantized.predict(X)
+    min_agreement, max_drop, max_diff = TOLERANCE[precision]
+    assert (proba.argmax(axis=1) == reference.argmax(axis=1)).mean() >= min_agreement
+    assert (reference.argmax(axis=1) == y).mean() - (proba.argmax(axis=1) == y).mean() <= max_drop
+    assert np.abs(proba - reference).max() <= max_diff
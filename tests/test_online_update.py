@@ -0,0 +1,24 @@
+"""New attempts are labelled on the competency CSVs' skill scale."""
+
+import pandas as pd
+from utils import model_registry
+from utils.database import DatabaseManager
+from utils.features import skill_level
+from utils.online_update import new_attempts
+
+def test_skill_level_matches_the_competency_csv():
+    df = pd.read_csv(model_registry.DEFAULT_TRAIN)
+    agree = (skill_level(df["past_correct_pct"]) == df["skill_level"].to_numpy()).mean()
+    assert agree > 0.99  # only rows exactly on the 0.5 boundary differ
+    assert list(skill_level([0.95, 0.8, 0.6, 0.3, 0.1])) == [1, 2, 3, 4, 5]
+
+def test_new_attempts_label_strong_learners_level_1(tmp_path):
+    db = DatabaseManager(str(tmp_path / "online.db"), write_behind=False)
+    strong, weak = db.create_user("Ada", "Visual"), db.create_user("Bob", "Visual")
+    for i in range(12):
+        db.record_quiz_answer(strong, "Science", "Biology", f"Q{i}", "A", "A", True, 5)
+        db.record_quiz_answer(weak, "Science", "Biology", f"Q{i}", "B", "A", False, 1)
+    df, last_id = new_attempts(db, 0)
+    assert last_id == 24
+    labels = df.groupby(df.index % 2)["skill_level"].last()
+    assert list(labels) == [1, 5]  # later attempts: strong learner level 1, weak learner level 5
@@ -0,0 +1,71 @@
+"""PredictionCache expires, evicts and invalidates entries, and counts each."""
+
+import pandas as pd
+from utils import prediction_cache
+from utils.database import DatabaseManager
+from utils.prediction_cache import PredictionCache
+
+class _Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+def _frame(seconds):
+    return pd.DataFrame({"time_spent_sec": [seconds], "mcq_correct": [1], "past_correct_pct": [0.5],
+                         "question_difficulty": [3]})
+
+def _lookup(cache, uid, df, version="v1"):
+    calls = []
+    value = cache.get_or_compute(uid, df, version, lambda: calls.append(uid) or f"{version}:{uid}")
+    return value, bool(calls)  # computed?
+
+def test_entries_expire_after_the_ttl():
+    clock = _Clock()
+    cache = PredictionCache(ttl_seconds=60, clock=clock)
+    assert _lookup(cache, 1, _frame(10)) == ("v1:1", True)
+    clock.now = 59.9
+    assert _lookup(cache, 1, _frame(10)) == ("v1:1", False)
+    clock.now = 60.0
+    assert _lookup(cache, 1, _frame(10)) == ("v1:1", True)
+    assert cache.stats() == {"hits": 1, "misses": 2, "hit_rate": 0.3333, "evictions": 0, "expirations": 1,
+                             "invalidations": 0, "entries": 1}
+
+def test_least_recently_used_entry_is_evicted():
+    cache = PredictionCache(max_entries=2)
+    _lookup(cache, 1, _frame(1))
+    _lookup(cache, 2, _frame(2))
+    assert _lookup(cache, 1, _frame(1))[1] is False  # 1 is now the most recently used
+    _lookup(cache, 3, _frame(3))  # evicts 2
+    assert _lookup(cache, 1, _frame(1))[1] is False
+    assert _lookup(cache, 3, _frame(3))[1] is False
+    assert _lookup(cache, 2, _frame(2))[1] is True
+    stats = cache.stats()
+    assert (stats["evictions"], stats["entries"]) == (2, 2)
+
+def test_changed_rows_or_model_version_miss():
+    cache = PredictionCache()
+    _lookup(cache, 1, _frame(10))
+    _lookup(cache, 2, _frame(20))
+    assert _lookup(cache, 1, _frame(11))[1] is True
+    # a newly served model drops every entry of the previous one
+    assert _lookup(cache, 1, _frame(10), version="v2") == ("v2:1", True)
+    stats = cache.stats()
+    assert (stats["invalidations"], stats["entries"]) == (3, 1)
+    assert _lookup(cache, 2, _frame(20), version="v2")[1] is True
+
+def test_recording_an_answer_invalidates_only_that_learner(tmp_path, monkeypatch):
+    monkeypatch.setattr(prediction_cache, "_cache", None)
+    db = DatabaseManager(str(tmp_path / "cache.db"), write_behind=False)
+    ada, bob = db.create_user("Ada", "Visual"), db.create_user("Bob", "Visual")
+    cache = prediction_cache.get_prediction_cache(db.pool)
+    assert prediction_cache.get_prediction_cache(db.pool) is cache
+    assert db.pool.version_listeners.count(cache.invalidate_users) == 1
+
+    _lookup(cache, ada, _frame(10))
+    _lookup(cache, bob, _frame(20))
+    db.record_quiz_answer(ada, "Science", "Biology", "What is a cell?", "A", "A", True, 1)
+    assert _lookup(cache, ada, _frame(10))[1] is True
+    assert _lookup(cache, bob, _frame(20))[1] is False
+    assert cache.stats()["invalidations"] == 1
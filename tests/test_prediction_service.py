@@ -0,0 +1,53 @@
+"""The batching service never delays a lone request and never predicts on unfilled rows."""
+
+import time
+from concurrent.futures import Future
+import numpy as np
+import pandas as pd
+import pytest
+from utils.features import FeaturePipeline
+from utils.prediction_service import PredictionService
+
+class _Network:
+    def __init__(self):
+        self.inputs = []
+
+    def predict(self, X):
+        self.inputs.append(np.array(X))
+        proba = np.zeros((len(X), 5), dtype=np.float32)
+        proba[:, 2] = 1.0
+        return proba
+
+class _Predictor:
+    def __init__(self):
+        self.pipeline = FeaturePipeline(5, np.zeros(8), np.ones(8))
+        self.skill_predictor = _Network()
+
+def _frame(rows, difficulty=3):
+    return pd.DataFrame({"time_spent_sec": [30.0] * rows, "mcq_correct": [1] * rows,
+                         "past_correct_pct": [0.5] * rows, "question_difficulty": [difficulty] * rows})
+
+def test_lone_request_does_not_wait_for_the_window():
+    service = PredictionService(_Predictor, max_wait_ms=2000)
+    try:
+        start = time.monotonic()
+        assert list(service.predict(_frame(3), timeout=5)) == [3, 3, 3]
+        assert time.monotonic() - start < 1.0
+    finally:
+        service.close()
+
+def test_failed_frame_rows_are_left_out_of_the_forward_pass():
+    predictor = _Predictor()
+    service = PredictionService(lambda: predictor)
+    service.close()  # drive _serve by hand
+    good, bad, last = _frame(2), _frame(4).drop(columns="mcq_correct"), _frame(3)
+    batch = [(df, Future()) for df in (good, bad, last)]
+    service._serve(batch, 9)
+
+    assert list(batch[0][1].result()) == [3, 3]
+    with pytest.raises(KeyError):
+        batch[1][1].result()
+    assert list(batch[2][1].result()) == [3, 3, 3]
+    (X,) = predictor.skill_predictor.inputs
+    assert X.shape == (5, 8)
+    np.testing.assert_array_equal(X, predictor.pipeline.transform(pd.concat([good, last])))
@@ -0,0 +1,53 @@
+"""Edges of the daily accuracy rollup behind get_user_progress_data."""
+
+import datetime
+import pytest
+from utils.database import DatabaseManager
+from utils.questions import AnswerRow, catalog_entry
+
+# (UTC timestamp, answered correctly); 2024-01-01 is a Monday
+ANSWERS = [
+    ("2024-01-01 00:00:00", True), ("2024-01-01 23:59:59", False),
+    ("2024-01-07 12:00:00", True),                                   # Sunday, same week
+    ("2024-01-08 00:00:01", False),                                  # Monday, next week
+    ("2024-01-31 23:59:59", True),
+    ("2024-02-01 00:00:00", True), ("2024-02-01 08:00:00", False), ("2024-02-01 09:00:00", False),
+]
+
+@pytest.fixture
+def db(tmp_path):
+    db = DatabaseManager(str(tmp_path / "rollup.db"), write_behind=False)
+    db.uid = db.create_user("Ada", "Visual")
+    rows = [AnswerRow(db.uid, "Science", "Biology", "A", correct, 1, ts, catalog_entry("Science", "Biology", 1, f"Q{i}"))
+            for i, (ts, correct) in enumerate(ANSWERS)]
+    with db.pool.write() as conn:
+        db._apply_answers(conn, rows)
+    return db
+
+def test_daily_buckets(db):
+    assert db.get_user_progress_data(db.uid) == [
+        {"date": "2024-01-01", "accuracy": 50.0}, {"date": "2024-01-07", "accuracy": 100.0},
+        {"date": "2024-01-08", "accuracy": 0.0}, {"date": "2024-01-31", "accuracy": 100.0},
+        {"date": "2024-02-01", "accuracy": 33.3}]
+
+def test_weeks_start_monday_and_months_on_the_first(db):
+    assert db.get_user_progress_data(db.uid, bucket="week") == [
+        {"date": "2024-01-01", "accuracy": 66.7}, {"date": "2024-01-08", "accuracy": 0.0},
+        {"date": "2024-01-29", "accuracy": 50.0}]
+    assert db.get_user_progress_data(db.uid, bucket="month") == [
+        {"date": "2024-01-01", "accuracy": 60.0}, {"date": "2024-02-01", "accuracy": 33.3}]
+
+def test_since_and_until_are_inclusive(db):
+    days = [r["date"] for r in db.get_user_progress_data(db.uid, since="2024-01-07", until=datetime.date(2024, 1, 31))]
+    assert days == ["2024-01-07", "2024-01-08", "2024-01-31"]
+    assert db.get_user_progress_data(db.uid, since="2024-02-02") == []
+    # a bucket is cut by the range, not widened to its whole week
+    assert db.get_user_progress_data(db.uid, since="2024-01-07", until="2024-01-07", bucket="week") == [
+        {"date": "2024-01-01", "accuracy": 100.0}]
+
+def test_limit_keeps_the_most_recent_buckets_oldest_first(db):
+    assert [r["date"] for r in db.get_user_progress_data(db.uid, limit=2)] == ["2024-01-31", "2024-02-01"]
+
+def test_unknown_bucket(db):
+    with pytest.raises(ValueError):
+        db.get_user_progress_data(db.uid, bucket="year")
@@ -0,0 +1,31 @@
+"""Every per-user read must be served from an index, never a full table scan."""
+
+from utils.database import DatabaseManager
+
+def test_read_helpers_use_indexes(tmp_path):
+    db = DatabaseManager(str(tmp_path / "plans.db"), write_behind=False)
+    uid = db.create_user("Ada", "Visual")
+    db.record_quiz_answer(uid, "Science", "Biology", "What is a cell?", "A", "A", True, 1)
+    db.record_quiz_answer(uid, "Science", "Chemistry", "What is an atom?", "B", "A", False, 2)
+    with db.pool.write() as conn:
+        conn.execute("INSERT INTO skill_predictions (user_id, model_version, predicted_level, mean_level, "
+                     "total_questions) VALUES (?, 'v1', 3, 3.0, 2)", (uid,))
+    assert db.check_query_plans(uid) == []
+
+def test_latest_skill_predictions_come_from_the_scored_at_index(tmp_path):
+    db = DatabaseManager(str(tmp_path / "plans.db"), write_behind=False)
+    uid = db.create_user("Ada", "Visual")
+    with db.pool.write() as conn:
+        conn.execute("DROP INDEX idx_skill_predictions_scored_at")
+    assert [scan["sql"] for scan in db.check_query_plans(uid)] == [
+        "SELECT model_version FROM skill_predictions ORDER BY scored_at DESC LIMIT 1"]
+
+def test_check_flags_a_missing_index(tmp_path):
+    db = DatabaseManager(str(tmp_path / "plans.db"), write_behind=False)
+    uid = db.create_user("Ada", "Visual")
+    with db.pool.write() as conn:
+        indexes = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type='index'")}
+        # only the topic index is left on quiz_attempts (migration 10 dropped the others)
+        assert {"idx_attempts_user_time", "idx_attempts_user_level"}.isdisjoint(indexes)
+        conn.execute("DROP INDEX idx_attempts_user_subject_topic")
+    assert [scan["sql"] for scan in db.check_query_plans(uid)]
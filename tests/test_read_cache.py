@@ -0,0 +1,35 @@
+"""Writes bump the learner's data version, so cached reads never serve stale rows."""
+
+from utils.database import DatabaseManager
+
+def test_write_invalidates_cached_reads(tmp_path):
+    db = DatabaseManager(str(tmp_path / "cache.db"), write_behind=False)
+    ada, bob = db.create_user("Ada", "Visual"), db.create_user("Bob", "Visual")
+    assert db.get_user_stats(ada)["total_questions"] == 0
+    assert db.get_user_stats(bob)["total_questions"] == 0
+    hits = db.cache_stats()["hits"]
+    assert db.get_user_stats(ada)["total_questions"] == 0
+    assert db.cache_stats()["hits"] == hits + 1
+
+    version = db.pool.data_version(ada)
+    db.record_quiz_answer(ada, "Science", "Biology", "What is a cell?", "A", "A", True, 1)
+    assert db.pool.data_version(ada) == version + 1
+    assert db.get_user_stats(ada)["total_questions"] == 1
+    # other learners' entries are untouched
+    hits = db.cache_stats()["hits"]
+    assert db.get_user_stats(bob)["total_questions"] == 0
+    assert db.cache_stats()["hits"] == hits + 1
+
+def test_cached_values_are_copies(tmp_path):
+    db = DatabaseManager(str(tmp_path / "cache.db"), write_behind=False)
+    uid = db.create_user("Ada", "Visual")
+    db.get_user(uid)["name"] = "Eve"
+    assert db.get_user(uid)["name"] == "Ada"
+
+def test_write_behind_answers_invalidate_after_commit(tmp_path):
+    db = DatabaseManager(str(tmp_path / "cache.db"), write_behind=True)
+    uid = db.create_user("Ada", "Visual")
+    assert db.get_user_stats(uid)["total_questions"] == 0
+    db.record_quiz_answer(uid, "Science", "Biology", "What is a cell?", "A", "A", True, 1)
+    # read-your-writes: the read waits for the queued answer, then misses the old entry
+    assert db.get_user_stats(uid)["total_questions"] == 1
@@ -0,0 +1,30 @@
+"""Sessions keep being served the old model while a new artifact loads."""
+
+import threading
+from utils import model_registry
+
+def test_swap_loads_outside_the_serving_lock(tmp_path, monkeypatch):
+    loading, release = threading.Event(), threading.Event()
+    def load_artifact(path, engine="numpy"):
+        if path.endswith("v2"):
+            loading.set()
+            release.wait(5)
+        return path.rsplit("/", 1)[-1]
+    monkeypatch.setattr(model_registry, "load_artifact", load_artifact)
+    monkeypatch.setattr(model_registry, "read_meta", lambda path: {})
+    monkeypatch.setattr(model_registry, "is_stale", lambda meta: False)
+    monkeypatch.setattr(model_registry, "_serving", {"version": None, "predictor": None, "checked_at": 0.0})
+    registry = str(tmp_path)
+
+    model_registry.publish_version("v1", registry)
+    assert model_registry.get_serving_predictor(registry) == "v1"
+
+    model_registry.publish_version("v2", registry)
+    loader = threading.Thread(target=model_registry.get_serving_predictor, args=(registry,))
+    loader.start()
+    assert loading.wait(5)
+    # while v2 is loading, other sessions get v1 without waiting on the load
+    assert model_registry.get_serving_predictor(registry) == "v1"
+    release.set()
+    loader.join()
+    assert model_registry.get_serving_predictor(registry) == "v2"
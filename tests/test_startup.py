@@ -0,0 +1,22 @@
+"""Import budget of the login screen: importing the app loads no heavy or page modules."""
+
+import json, os, subprocess, sys
+
+REPO = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+FORBIDDEN = ("tensorflow", "pandas", "plotly", "sklearn")
+PAGE_MODULES = ("dashboard", "learn", "quiz", "upload", "progress", "settings")
+
+def test_app_import_stays_light(tmp_path):
+    # the app opens data/learning_platform.db and components/ relative to the cwd
+    (tmp_path / "data").mkdir()
+    os.symlink(os.path.join(REPO, "components"), tmp_path / "components")
+    # Streamlit itself imports plotly, so only count what the app adds on top of it
+    code = ("import json, sys, streamlit; before = set(sys.modules); import streamlit_app; "
+            "print(json.dumps([sorted(sys.modules), sorted(set(sys.modules) - before)]))")
+    out = subprocess.run([sys.executable, "-c", code], cwd=tmp_path, capture_output=True, text=True, check=True,
+                         env=dict(os.environ, PYTHONPATH=REPO))
+    loaded, added = map(set, json.loads(out.stdout.splitlines()[-1]))
+    assert "streamlit_app" in added
+    assert sorted(m for m in loaded if m.split(".")[0] in ("tensorflow", "pandas")) == []
+    assert sorted(m for m in added if m.split(".")[0] in FORBIDDEN) == []
+    assert sorted(loaded.intersection(PAGE_MODULES)) == []
@@ -0,0 +1,48 @@
+"""A training job that keeps failing is not resubmitted on every quiz."""
+
+from concurrent.futures import Future
+from utils import model_registry
+from utils.database import DatabaseManager
+from utils.training_jobs import TrainingJobRunner
+
+class _NoWorker:
+    # stands in for the process pool: jobs stay queued until the test finishes them
+    def submit(self, *args):
+        return Future()
+
+    def shutdown(self, **kwargs):
+        pass
+
+def _fail(db, job_id, seconds_ago):
+    with db.pool.write() as conn:
+        conn.execute("""UPDATE training_jobs SET state='failed', error='ValueError: bad data',
+            finished_at=datetime('now', ?) WHERE id=?""", (f"-{seconds_ago} seconds", job_id))
+
+def test_failed_job_is_retried_after_backoff(tmp_path):
+    db = DatabaseManager(str(tmp_path / "jobs.db"), write_behind=False)
+    runner = TrainingJobRunner(db, str(tmp_path / "registry"), retry_backoff_s=60, max_retry_backoff_s=600)
+    runner.shutdown()
+    runner._executor = _NoWorker()
+    train, test = model_registry.DEFAULT_TRAIN, model_registry.DEFAULT_TEST
+
+    first = runner.submit(train, test)
+    assert runner.submit(train, test) == first  # still queued
+    _fail(db, first, 10)
+    assert runner.submit(train, test) == first  # inside the 60s backoff
+    _fail(db, first, 61)
+    second = runner.submit(train, test)
+    assert second != first
+
+    _fail(db, second, 61)  # two failures in a row: the backoff doubles to 120s
+    assert runner.submit(train, test) == second
+    assert runner.submit(train, test, force=True) != second
+
+def test_interrupted_jobs_do_not_back_off(tmp_path):
+    db = DatabaseManager(str(tmp_path / "jobs.db"), write_behind=False)
+    runner = TrainingJobRunner(db, str(tmp_path / "registry"))
+    runner.shutdown()
+    runner._executor = _NoWorker()
+    first = runner.submit()
+    with db.pool.write() as conn:
+        conn.execute("UPDATE training_jobs SET state='failed', error='interrupted', finished_at=CURRENT_TIMESTAMP")
+    assert runner.submit() != first
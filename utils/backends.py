@@ -0,0 +1,170 @@
+"""Model backends for SkillPredictor.
+
+A backend says how to train one kind of classifier on the scaled feature matrix, which
+files it leaves in a model registry artifact, and how to load them for serving. Every
+trained or loaded model exposes predict(X) -> (n, num_classes) class probabilities, so
+SkillPredictor, the prediction service and the batch scorer do not care which one is used.
+
+    mlp     the Keras FFNeuralNetwork, served by the NumPy engine (utils.numpy_inference)
+    logreg  multinomial logistic regression, exported as a one-layer NumpyNetwork
+    hgb     scikit-learn's histogram gradient boosting, served with scikit-learn
+
+The backend is chosen by APP_CONFIG["training"]["backend"]; benchmarks/backends.py compares
+them. Backends served by NumpyNetwork also export float16 and int8 copies of the weights,
+loaded with engine="numpy-float16" or "numpy-int8" (benchmarks/quantization.py reports what
+they cost in accuracy and save in memory). The scikit-learn backends fit in memory on at
+most max_rows rows sampled from the training stream.
+"""
+
+import json, os
+from typing import Any, Dict, Optional
+import numpy as np
+from utils.numpy_inference import NumpyNetwork
+
+# Serving engines for NumpyNetwork weights, and the precision each one loads
+NUMPY_ENGINES = {"numpy": "float32", "numpy-float16": "float16", "numpy-int8": "int8"}
+
+def _weights_file(directory: str, precision: str) -> str:
+    return os.path.join(directory, "weights.npz" if precision == "float32" else f"weights.{precision}.npz")
+
+def _save_numpy(network: NumpyNetwork, directory: str):
+    for precision in NUMPY_ENGINES.values():
+        network.quantize(precision).save(_weights_file(directory, precision))
+
+def _load_numpy(directory: str, engine: str) -> NumpyNetwork:
+    precision = NUMPY_ENGINES[engine]
+    if os.path.exists(_weights_file(directory, precision)):
+        return NumpyNetwork.load(_weights_file(directory, precision))
+    # artifacts from before the quantized exports
+    return NumpyNetwork.load(_weights_file(directory, "float32")).quantize(precision)
+
+def _sample(stream, max_rows: int, seed: int = 0):
+    # uniform sample of at most max_rows rows, drawn chunk by chunk
+    keep = min(1.0, max_rows / max(len(stream), 1))
+    rng = np.random.default_rng(seed)
+    Xs, ys = [], []
+    for X, y in stream:
+        if keep < 1.0:
+            mask = rng.random(len(X)) < keep
+            X, y = X[mask], y[mask]
+        Xs.append(np.asarray(X))
+        ys.append(np.asarray(y))
+    return np.concatenate(Xs), np.concatenate(ys)
+
+class SkillBackend:
+    """Trains, saves and loads one kind of skill model (see module docstring)."""
+    name = ""
+
+    def train(self, input_dim: int, num_classes: int, train, validation, callbacks=None,
+              hyperparams: Optional[Dict[str, Any]] = None):
+        """Fits a model on the train/validation streams (utils.training_data) and returns it.
+        hyperparams are the network settings, used by the mlp backend only."""
+        raise NotImplementedError
+
+    def save(self, model, directory: str):
+        raise NotImplementedError
+
+    def load(self, directory: str, engine: str = "numpy"):
+        raise NotImplementedError
+
+class MLPBackend(SkillBackend):
+    name = "mlp"
+
+    def train(self, input_dim, num_classes, train, validation, callbacks=None, hyperparams=None):
+        from utils.neural_network import FFNeuralNetwork
+        network = FFNeuralNetwork(input_dim=input_dim, num_classes=num_classes, **(hyperparams or {}))
+        network.train_stream(train.dataset(), validation.dataset(), epochs=50, callbacks=callbacks)
+        return network
+
+    def save(self, model, directory):
+        model.save(os.path.join(directory, "model.keras"))
+        _save_numpy(NumpyNetwork.from_keras(model.model), directory)
+
+    def load(self, directory, engine="numpy"):
+        """The NUMPY_ENGINES serve the exported weights with NumpyNetwork and never import
+        TensorFlow; engine="keras" loads the full Keras model (needed to keep training it)."""
+        if engine in NUMPY_ENGINES and not os.path.exists(os.path.join(directory, "weights.npz")):
+            engine = "keras"  # artifacts from before the NumPy export
+        if engine in NUMPY_ENGINES:
+            return _load_numpy(directory, engine)
+        if engine == "keras":
+            from utils.neural_network import FFNeuralNetwork
+            with open(os.path.join(directory, "meta.json")) as f:
+                hyperparams = json.load(f).get("hyperparams", {})
+            return FFNeuralNetwork.load(os.path.join(directory, "model.keras"), patience=hyperparams.get("patience", 5))
+        raise ValueError(f"unknown inference engine {engine!r}")
+
+class LogisticBackend(SkillBackend):
+    """Multinomial logistic regression; its predict_proba is softmax(X @ W + b), so it is
+    served as a single-layer NumpyNetwork."""
+    name = "logreg"
+
+    def __init__(self, max_rows: int = 2_000_000, C: float = 1.0):
+        self.max_rows = max_rows
+        self.C = C
+
+    def train(self, input_dim, num_classes, train, validation, callbacks=None, hyperparams=None):
+        from sklearn.linear_model import LogisticRegression
+        X, y = _sample(train, self.max_rows)
+        model = LogisticRegression(C=self.C, max_iter=1000).fit(X, y)
+        weights = np.zeros((input_dim, num_classes))
+        bias = np.full(num_classes, -1e30)  # levels absent from the training data get probability 0
+        coef, intercept = model.coef_, model.intercept_
+        if len(model.classes_) == 2:
+            # binary problems keep one coefficient row z; softmax([-z/2, z/2]) == sigmoid(z)
+            coef, intercept = np.vstack([-coef / 2, coef / 2]), np.array([-intercept[0] / 2, intercept[0] / 2])
+        weights[:, model.classes_] = coef.T
+        bias[model.classes_] = intercept
+        return NumpyNetwork([(weights, bias, "softmax")])
+
+    def save(self, model, directory):
+        _save_numpy(model, directory)
+
+    def load(self, directory, engine="numpy"):
+        return _load_numpy(directory, engine if engine in NUMPY_ENGINES else "numpy")
+
+class _ProbaClassifier:
+    # a scikit-learn classifier's predict_proba, widened to every level 0..num_classes-1
+    def __init__(self, model, num_classes: int):
+        self.model = model
+        self.num_classes = num_classes
+
+    def predict(self, X):
+        proba = self.model.predict_proba(X)
+        out = np.zeros((len(proba), self.num_classes), dtype=np.float32)
+        out[:, self.model.classes_] = proba
+        return out
+
+class GradientBoostingBackend(SkillBackend):
+    name = "hgb"
+
+    def __init__(self, max_rows: int = 2_000_000, max_iter: int = 200, learning_rate: float = 0.1):
+        self.max_rows = max_rows
+        self.max_iter = max_iter
+        self.learning_rate = learning_rate
+
+    def train(self, input_dim, num_classes, train, validation, callbacks=None, hyperparams=None):
+        from sklearn.ensemble import HistGradientBoostingClassifier
+        X, y = _sample(train, self.max_rows)
+        # early stopping holds out 10% of the sample, like the MLP's validation split
+        model = HistGradientBoostingClassifier(max_iter=self.max_iter, learning_rate=self.learning_rate,
+                                               early_stopping=True, validation_fraction=0.1, random_state=0)
+        return _ProbaClassifier(model.fit(X, y), num_classes)
+
+    def save(self, model, directory):
+        import joblib
+        joblib.dump({"model": model.model, "num_classes": model.num_classes},
+                    os.path.join(directory, "model.joblib"))
+
+    def load(self, directory, engine="numpy"):
+        import joblib
+        saved = joblib.load(os.path.join(directory, "model.joblib"))
+        return _ProbaClassifier(saved["model"], saved["num_classes"])
+
+BACKENDS: Dict[str, SkillBackend] = {b.name: b for b in (MLPBackend(), LogisticBackend(), GradientBoostingBackend())}
+
+def get_backend(name: str) -> SkillBackend:
+    try:
+        return BACKENDS[name]
+    except KeyError:
+        raise ValueError(f"unknown skill model backend {name!r}; expected one of {sorted(BACKENDS)}") from None
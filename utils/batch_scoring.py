@@ -0,0 +1,119 @@
+"""Offline skill scoring of every learner.
+
+Scores each learner from their feature-store rows (learner_recent_attempts, as the quiz page
+does) with the LATEST skill model and writes the level to skill_predictions with the model
+version and time, for dashboards that need every learner's level at once
+(DatabaseManager.get_skill_predictions). Learners are read in keyset-paginated chunks; each
+chunk goes to a process-pool worker that loaded the artifact once and scores the whole
+chunk in one forward pass. Results are committed chunk by chunk, and a run skips learners
+already scored by the same model version whose answer count has not changed, so an
+interrupted run resumes where it stopped and a nightly run only rescores learners who have
+answered since.
+
+    python -m utils.batch_scoring [--workers 4] [--chunk-users 2000] [--threads 1] [--rescore]
+"""
+
+import argparse, json, multiprocessing, os, time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Tuple
+import numpy as np
+import pandas as pd
+from utils import model_registry
+from utils.database import DatabaseManager
+from utils.process_pool import thread_limits
+
+# Learners with answers who have no current score from this model version, after a user id
+PENDING_SQL = """SELECT f.user_id, f.total_questions FROM learner_features f
+    LEFT JOIN skill_predictions p ON p.model_version = ? AND p.user_id = f.user_id
+    WHERE f.user_id > ? AND f.total_questions > 0
+      AND (p.user_id IS NULL OR p.total_questions != f.total_questions OR p.scored_at < ?)
+    ORDER BY f.user_id LIMIT ?"""
+
+# Same rows and time fallback as DatabaseManager.get_learner_features, for many learners
+FEATURES_SQL = """SELECT r.user_id, r.question_difficulty, r.mcq_correct, r.past_correct_pct,
+        COALESCE(r.time_spent_sec, ROUND(f.time_spent_total / NULLIF(f.timed_questions, 0), 2)) time_spent_sec
+    FROM learner_recent_attempts r JOIN learner_features f ON f.user_id = r.user_id
+    WHERE r.user_id IN (SELECT value FROM json_each(?))
+    ORDER BY r.user_id, r.seq"""
+
+_worker: Dict[str, Any] = {}
+
+def _init_worker(db_path: str, artifact_path: str):
+    _worker["db"] = DatabaseManager(db_path, write_behind=False)
+    _worker["predictor"] = model_registry.load_artifact(artifact_path, engine="numpy")
+
+def _score_chunk(users: List[Tuple[int, int]]) -> Tuple[List[Tuple[int, int, float, int]], int]:
+    """Worker: (user_id, predicted_level, mean_level, total_questions) per learner, and the
+    number of feature rows scored."""
+    with _worker["db"].pool.read() as conn:
+        df = pd.read_sql_query(FEATURES_SQL, conn, params=(json.dumps([uid for uid, _ in users]),))
+    if df.empty:
+        return [], 0
+    levels = _worker["predictor"].predict(df)
+    # a learner's level is the mean over their recent rows, rounded as get_prediction_summary does
+    means = pd.Series(levels).groupby(df["user_id"].to_numpy()).mean()
+    return [(uid, int(np.round(means[uid])), float(means[uid]), total) for uid, total in users if uid in means.index], len(df)
+
+def score_all(db_path: str = "data/learning_platform.db", registry_dir: str = model_registry.DEFAULT_REGISTRY,
+              workers: Optional[int] = None, chunk_users: int = 2000, threads: int = 1,
+              rescore: bool = False, log=print) -> Dict[str, Any]:
+    """Scores every learner still pending for the LATEST model; returns counts and throughput."""
+    version = model_registry.latest_version(registry_dir)
+    if version is None:
+        raise RuntimeError("no published skill model to score with")
+    db = DatabaseManager(db_path, write_behind=False)
+    # with rescore, anything scored before this run counts as pending
+    cutoff = datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M:%S") if rescore else ""
+    workers = workers or os.cpu_count() or 1
+    learners = rows = 0
+    start = time.perf_counter()
+
+    with thread_limits(threads), ProcessPoolExecutor(workers, mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker, initargs=(db_path, os.path.join(registry_dir, version))) as pool:
+        in_flight, after, exhausted = deque(), 0, False
+        while True:
+            # keep every worker busy with a chunk queued behind it, without reading ahead further
+            while not exhausted and len(in_flight) < 2 * workers:
+                with db.pool.read() as conn:
+                    users = [tuple(r) for r in conn.execute(PENDING_SQL, (version, after, cutoff, chunk_users))]
+                if not users:
+                    exhausted = True
+                    break
+                after = users[-1][0]
+                in_flight.append(pool.submit(_score_chunk, users))
+            if not in_flight:
+                break
+            scores, n_rows = in_flight.popleft().result()
+            with db.pool.write() as conn:
+                conn.executemany("""INSERT OR REPLACE INTO skill_predictions
+                    (user_id, model_version, predicted_level, mean_level, total_questions, scored_at)
+                    VALUES (?, ?, ?, ?, ?, CURRENT_TIMESTAMP)""",
+                    [(uid, version, level, mean, total) for uid, level, mean, total in scores])
+            learners += len(scores)
+            rows += n_rows
+            elapsed = time.perf_counter() - start
+            log(f"{learners:,} learners scored ({learners / elapsed:,.0f}/s, {rows / elapsed:,.0f} rows/s)")
+
+    seconds = time.perf_counter() - start
+    return {"model_version": version, "learners": learners, "rows": rows, "seconds": round(seconds, 2),
+            "learners_per_sec": round(learners / seconds, 1) if seconds else None,
+            "rows_per_sec": round(rows / seconds, 1) if seconds else None}
+
+def main(argv: Optional[list] = None):
+    parser = argparse.ArgumentParser(prog="python -m utils.batch_scoring", description=__doc__.split("\n\n")[0])
+    parser.add_argument("--db", default="data/learning_platform.db")
+    parser.add_argument("--registry", default=model_registry.DEFAULT_REGISTRY)
+    parser.add_argument("--workers", type=int, help="default: CPU count")
+    parser.add_argument("--chunk-users", type=int, default=2000, help="learners per forward pass")
+    parser.add_argument("--threads", type=int, default=1, help="BLAS threads per worker")
+    parser.add_argument("--rescore", action="store_true", help="score every learner again, even if unchanged")
+    args = parser.parse_args(argv)
+
+    result = score_all(args.db, args.registry, args.workers, args.chunk_users, args.threads, args.rescore)
+    for key, value in result.items():
+        print(f"{key}: {value}")
+
+if __name__ == "__main__":
+    main()
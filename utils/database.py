@@ -1,151 +1,808 @@
-import sqlite3, os
-from datetime import datetime, timedelta, date
-from typing import Dict, Any, List
+import sqlite3, os, sys, threading, weakref, queue, time, atexit, logging, functools, copy
+from collections import OrderedDict
+from contextlib import contextmanager
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone, date
+from types import MappingProxyType
+from typing import Dict, Any, List, Iterator, Tuple, Optional, Callable, Set, Union, Mapping, NamedTuple
+from config.settings import APP_CONFIG
+from utils.migrations import migrate, current_version, restore_dropped_indexes, LATEST_VERSION
+from utils.questions import AnswerRow, catalog_entry
+
+# Applied to every new connection. WAL lets readers keep going while one session writes,
+# and synchronous=NORMAL is durable under WAL apart from the last commits on power loss.
+CONNECTION_PRAGMAS = (
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA cache_size=-16000",      # 16 MB page cache per connection
+    "PRAGMA mmap_size=268435456",    # 256 MB memory-mapped reads
+    "PRAGMA temp_store=MEMORY",
+)
+
+class ConnectionManager:
+    """Keeps one reusable sqlite3 connection per thread for a database file.
+
+    Streamlit runs every rerun on a fresh script thread, so connections owned by threads
+    that have exited are reclaimed into a small idle list and handed to the next thread
+    instead of being reopened. Use read()/write() rather than the raw connection.
+    """
+    def __init__(self, db_path:str, busy_timeout_ms:int=5000, max_idle:int=8):
+        self.db_path = db_path
+        self.busy_timeout_ms = busy_timeout_ms
+        self.max_idle = max_idle
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._owned: Dict[int, Tuple[weakref.ref, sqlite3.Connection]] = {}
+        self._idle: List[sqlite3.Connection] = []
+        self.schema_checked = False
+        self.writer = None
+        self.cache: Optional[ResultCache] = None
+        self._versions: Dict[int, int] = {}
+        # called with the set of user ids after each bump_versions (e.g. the prediction cache)
+        self.version_listeners: List[Callable[[Set[int]], None]] = []
+
+    def _connect(self) -> sqlite3.Connection:
+        # isolation_level=None: transactions are opened explicitly by read()/write()
+        conn = sqlite3.connect(self.db_path, timeout=self.busy_timeout_ms/1000,
+                               isolation_level=None, check_same_thread=False)
+        conn.row_factory = sqlite3.Row
+        conn.execute(f"PRAGMA busy_timeout={int(self.busy_timeout_ms)}")
+        for pragma in CONNECTION_PRAGMAS:
+            conn.execute(pragma)
+        return conn
+
+    def _reclaim(self):
+        # caller holds self._lock
+        for ident, (ref, conn) in list(self._owned.items()):
+            thread = ref()
+            if thread is None or not thread.is_alive():
+                del self._owned[ident]
+                if len(self._idle) < self.max_idle:
+                    self._idle.append(conn)
+                else:
+                    conn.close()
+
+    def connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            return conn
+        with self._lock:
+            self._reclaim()
+            conn = self._idle.pop() if self._idle else None
+        if conn is None:
+            conn = self._connect()
+        thread = threading.current_thread()
+        with self._lock:
+            self._owned[thread.ident] = (weakref.ref(thread), conn)
+        self._local.conn = conn
+        self._local.depth = 0
+        return conn
+
+    @contextmanager
+    def _transaction(self, begin:str) -> Iterator[sqlite3.Connection]:
+        conn = self.connection()
+        if self._local.depth:
+            # nested helper call: join the outer transaction
+            self._local.depth += 1
+            try:
+                yield conn
+            finally:
+                self._local.depth -= 1
+            return
+        conn.execute(begin)
+        self._local.depth = 1
+        try:
+            yield conn
+        except BaseException:
+            conn.rollback()
+            raise
+        else:
+            conn.commit()
+        finally:
+            self._local.depth = 0
+
+    def in_transaction(self) -> bool:
+        return bool(getattr(self._local, "depth", 0))
+
+    def data_version(self, uid:int) -> int:
+        return self._versions.get(uid, 0)
+
+    def bump_versions(self, uids):
+        """Marks every cached read for these users stale; call after the write has committed."""
+        uids = set(uids)
+        with self._lock:
+            for uid in uids:
+                self._versions[uid] = self._versions.get(uid, 0) + 1
+        for listener in list(self.version_listeners):
+            listener(uids)
+
+    def read(self):
+        """Deferred transaction: a consistent snapshot that never blocks the writer."""
+        return self._transaction("BEGIN")
+
+    def write(self):
+        """Immediate transaction: takes the write lock up front so it waits on busy_timeout
+        instead of failing with "database is locked" when upgrading mid-transaction."""
+        return self._transaction("BEGIN IMMEDIATE")
+
+    def close_all(self):
+        with self._lock:
+            conns = [c for _, c in self._owned.values()] + self._idle
+            self._owned.clear()
+            self._idle.clear()
+        self._local = threading.local()
+        for conn in conns:
+            conn.close()
+
+logger = logging.getLogger(__name__)
+
+# SQL bucket keys over daily_user_accuracy.day for get_user_progress_data
+PROGRESS_BUCKETS = {
+    "day": "day",
+    "week": "DATE(day, 'weekday 0', '-6 days')",
+    "month": "strftime('%Y-%m-01', day)",
+}
+
+_managers: Dict[str, ConnectionManager] = {}
+_managers_lock = threading.Lock()
+
+def get_connection_manager(db_path:str) -> ConnectionManager:
+    """Returns the process-wide ConnectionManager for db_path (shared by every DatabaseManager)."""
+    key = os.path.abspath(db_path)
+    with _managers_lock:
+        if key not in _managers:
+            _managers[key] = ConnectionManager(db_path)
+        return _managers[key]
+
+class AnswerWriteError(RuntimeError):
+    """Queued quiz answers could not be committed. They are kept in `rows` and by the
+    writer, which queues them again on AnswerWriter.retry_failed()."""
+    def __init__(self, rows:List[AnswerRow], error:Optional[BaseException]):
+        super().__init__(f"{len(rows)} queued quiz answers could not be written: {error!r}")
+        self.rows = rows
+
+class AnswerWriter:
+    """Write-behind queue for quiz answers.
+
+    Answers are queued in a bounded in-process queue and a single background thread
+    commits them in batches (group commit): a batch closes when it reaches max_batch rows
+    or when its oldest answer has waited max_latency_ms. When the queue is full, submit()
+    blocks, which pushes back on the submitting sessions instead of growing without bound.
+
+    A failed batch is retried max_retries times with exponential backoff (e.g. while
+    another process holds the write lock). If it still fails, its answers are committed
+    one by one so a single bad row cannot sink the rest; the answers that fail even alone
+    are kept in `failed`, and flush() raises AnswerWriteError until retry_failed() is called.
+    """
+    def __init__(self, pool:ConnectionManager, apply:Callable[[sqlite3.Connection, List[AnswerRow]], None],
+                 max_batch:int=256, max_latency_ms:int=20, max_queue:int=10000,
+                 max_retries:int=3, retry_delay_ms:int=50):
+        self.pool = pool
+        self.apply = apply
+        self.max_batch = max_batch
+        self.max_latency = max_latency_ms/1000
+        self.max_retries = max_retries
+        self.retry_delay = retry_delay_ms/1000
+        self.last_error: Optional[BaseException] = None
+        self.failed: List[Tuple[int, AnswerRow]] = []
+        self._queue: "queue.Queue[Tuple[int, AnswerRow]]" = queue.Queue(maxsize=max_queue)
+        self._pending: Dict[int, int] = {}
+        self._cond = threading.Condition()
+        self._thread = threading.Thread(target=self._run, name="answer-writer", daemon=True)
+        self._thread.start()
+
+    def submit(self, uid:int, row:AnswerRow):
+        with self._cond:
+            self._pending[uid] = self._pending.get(uid, 0) + 1
+        self._queue.put((uid, row))
+
+    def wait_for(self, uid:int):
+        with self._cond:
+            self._cond.wait_for(lambda: not self._pending.get(uid))
+
+    def flush(self):
+        """Blocks until every queued answer has been written; raises AnswerWriteError while
+        answers of failed batches are outstanding."""
+        with self._cond:
+            self._cond.wait_for(lambda: not self._pending)
+            if self.failed:
+                raise AnswerWriteError([row for _, row in self.failed], self.last_error)
+
+    def retry_failed(self) -> int:
+        """Queues the answers kept from failed batches again; returns how many."""
+        with self._cond:
+            failed, self.failed = self.failed, []
+        for uid, row in failed:
+            self.submit(uid, row)
+        return len(failed)
+
+    def close(self):
+        """Flushes everything still queued and stops the writer thread."""
+        if self._thread.is_alive():
+            self._queue.put(None)
+            self._thread.join()
+        if self.failed:
+            logger.error("%d quiz answers were never written: %r", len(self.failed), self.last_error)
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            if item is None:
+                return
+            batch = [item]
+            deadline = time.monotonic() + self.max_latency
+            stop = False
+            while len(batch) < self.max_batch:
+                remaining = deadline - time.monotonic()
+                try:
+                    item = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if item is None:
+                    stop = True
+                    break
+                batch.append(item)
+            self._write(batch)
+            if stop:
+                return
+
+    def _commit(self, rows:List[AnswerRow], retries:int) -> Optional[Exception]:
+        for attempt in range(retries + 1):
+            try:
+                with self.pool.write() as conn:
+                    self.apply(conn, rows)
+                return None
+            except Exception as e:
+                error = e
+                if attempt < retries:
+                    time.sleep(self.retry_delay * 2**attempt)
+        return error
+
+    def _write(self, batch:List[Tuple[int, AnswerRow]]):
+        failed = []
+        error = self._commit([row for _, row in batch], self.max_retries)
+        if error is not None:
+            # isolate the answers that fail on their own, and keep them rather than drop them
+            failed = batch if len(batch) == 1 else [item for item in batch if self._commit([item[1]], 0) is not None]
+            if failed:
+                self.last_error = error
+                logger.error("Failed to write %d of %d queued quiz answers: %r", len(failed), len(batch), error)
+        self.pool.bump_versions(uid for uid, _ in batch)
+        with self._cond:
+            self.failed.extend(failed)
+            for uid, _ in batch:
+                self._pending[uid] -= 1
+                if not self._pending[uid]:
+                    del self._pending[uid]
+            self._cond.notify_all()
+
+def get_answer_writer(pool:ConnectionManager, apply, **kwargs) -> AnswerWriter:
+    """Returns the process-wide AnswerWriter for pool, starting it (and its exit flush) on first use."""
+    with _managers_lock:
+        if pool.writer is None:
+            pool.writer = AnswerWriter(pool, apply, **kwargs)
+            atexit.register(pool.writer.close)
+        return pool.writer
+
+def _approx_size(value) -> int:
+    size = sys.getsizeof(value)
+    if isinstance(value, (dict, MappingProxyType)):
+        size += sum(_approx_size(k) + _approx_size(v) for k, v in value.items())
+    elif isinstance(value, (list, tuple)):
+        size += sum(_approx_size(v) for v in value)
+    elif hasattr(value, "__dataclass_fields__"):
+        size += sum(_approx_size(getattr(value, f)) for f in value.__dataclass_fields__)
+    return size
+
+class ResultCache:
+    """Thread-safe LRU cache for DatabaseManager reads, bounded by entry count and bytes.
+
+    Keys include the user's data version, so a write never has to find and delete entries:
+    it bumps the version and the stale entries age out of the LRU.
+    """
+    def __init__(self, max_entries:int=4096, max_bytes:int=16*1024*1024):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._bytes = 0
+        self._entries: "OrderedDict[tuple, Tuple[Any, int]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key:tuple) -> Tuple[bool, Any]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return False, None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return True, copy.deepcopy(entry[0])
+
+    def put(self, key:tuple, value:Any):
+        size = _approx_size(value)
+        if size > self.max_bytes:
+            return
+        value = copy.deepcopy(value)
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._bytes -= old[1]
+            self._entries[key] = (value, size)
+            self._bytes += size
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                _, (_, evicted) = self._entries.popitem(last=False)
+                self._bytes -= evicted
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self) -> Dict[str,int]:
+        with self._lock:
+            return {"hits":self.hits,"misses":self.misses,"evictions":self.evictions,
+                    "entries":len(self._entries),"bytes":self._bytes}
+
+def cached_read(method):
+    """Caches a per-user DatabaseManager read under (method, args, data_version(uid)).
+
+    Calls made inside an open transaction (e.g. from get_dashboard_snapshot) read through,
+    so a snapshot is never stitched together from entries of different versions.
+    """
+    @functools.wraps(method)
+    def wrapper(self, uid, *args, **kwargs):
+        cache = self.pool.cache
+        if cache is None or self.pool.in_transaction():
+            return method(self, uid, *args, **kwargs)
+        self._sync(uid)
+        key = (method.__name__, uid, args, tuple(sorted(kwargs.items())), self.pool.data_version(uid))
+        hit, value = cache.get(key)
+        if hit:
+            return value
+        value = method(self, uid, *args, **kwargs)
+        cache.put(key, value)
+        return value
+    return wrapper
+
+class ProgressPoint(NamedTuple):
+    date: str
+    accuracy: float
+
+class SubjectStats(NamedTuple):
+    subject: str
+    total_questions: int
+    correct_answers: int
+    accuracy: float
+
+@dataclass(frozen=True)
+class DashboardSnapshot:
+    """Read-only view of one learner's dashboard data (see DatabaseManager.get_dashboard_snapshot).
+
+    Immutable all the way down (the user row is a read-only mapping, the other rows are
+    NamedTuples), so one cached snapshot can be handed to every session that reads it.
+    """
+    user: Mapping[str,Any]
+    total_questions: int
+    correct_answers: int
+    current_level: int
+    streak_count: int
+    last_login_date: date
+    progress: Tuple[ProgressPoint, ...]
+    subjects: Tuple[SubjectStats, ...]
+
+    @property
+    def accuracy(self) -> float:
+        return self.correct_answers/max(self.total_questions,1)*100
+
+    def __deepcopy__(self, memo):
+        # nothing in it can change, so ResultCache can share it instead of copying
+        return self
 
 class DatabaseManager:
-    def __init__(self, db_path: str="data/learning_platform.db"):
+    # Attempts kept per learner in learner_recent_attempts (the ring buffer's size)
+    RECENT_WINDOW = 20
+
+    def __init__(self, db_path: str="data/learning_platform.db", write_behind: Optional[bool]=None):
         self.db_path = db_path
         os.makedirs(os.path.dirname(db_path), exist_ok=True)
+        self.pool = get_connection_manager(db_path)
         self._init_db()
+        db_config = APP_CONFIG.get("database", {})
+        if write_behind is None:
+            write_behind = db_config.get("write_behind", False)
+        self.writer = None
+        if write_behind:
+            self.writer = get_answer_writer(self.pool, self._apply_answers,
+                                            max_batch=db_config.get("write_max_batch", 256),
+                                            max_latency_ms=db_config.get("write_max_latency_ms", 20),
+                                            max_queue=db_config.get("write_max_queue", 10000),
+                                            max_retries=db_config.get("write_max_retries", 3))
+        if db_config.get("read_cache", True) and self.pool.cache is None:
+            self.pool.cache = ResultCache(max_entries=db_config.get("cache_max_entries", 4096),
+                                          max_bytes=db_config.get("cache_max_bytes", 16*1024*1024))
     
     def _init_db(self):
-        with sqlite3.connect(self.db_path) as conn:
-            c = conn.cursor()
-            c.execute("""CREATE TABLE IF NOT EXISTS users (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                name TEXT,
-                learning_style TEXT,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            )""")
-            c.execute("""CREATE TABLE IF NOT EXISTS quiz_attempts (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                user_id INTEGER,
-                subject TEXT,
-                topic TEXT,
-                question TEXT,
-                user_answer TEXT,
-                correct_answer TEXT,
-                is_correct BOOLEAN,
-                difficulty_level INTEGER,
-                timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            )""")
-            c.execute("""CREATE TABLE IF NOT EXISTS user_progress (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                user_id INTEGER,
-                subject TEXT,
-                topic TEXT,
-                current_level INTEGER,
-                total_questions INTEGER,
-                correct_answers INTEGER,
-                last_updated TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                UNIQUE(user_id,subject,topic)
-            )""")
-            # Add streak_count and last_login_date columns if they don't exist
-            # c.execute("ALTER TABLE users ADD COLUMN streak_count INTEGER DEFAULT 0")
-            # c.execute("ALTER TABLE users ADD COLUMN last_login_date DATE")
-            c.execute("PRAGMA table_info(users)")
-            columns = [row[1] for row in c.fetchall()]
-
-            if "streak_count" not in columns:
-                c.execute("ALTER TABLE users ADD COLUMN streak_count INTEGER DEFAULT 1")
-
-            if "last_login_date" not in columns:
-                c.execute("ALTER TABLE users ADD COLUMN last_login_date DATE")
-            conn.commit()
+        # Constructed at import in every page module, so only the first instance per
+        # process looks at schema_version; migrations themselves run once per database.
+        if self.pool.schema_checked:
+            return
+        with self.pool.read() as conn:
+            up_to_date = current_version(conn) >= LATEST_VERSION
+        if not up_to_date:
+            with self.pool.write() as conn:
+                migrate(conn)
+        with self.pool.read() as conn:
+            leftover = conn.execute("SELECT COUNT(*) FROM dropped_indexes").fetchone()[0]
+        if leftover:
+            # a bulk import was killed before it could put its indexes back
+            with self.pool.write() as conn:
+                restored = restore_dropped_indexes(conn)
+            logger.warning("Recreated indexes dropped by an interrupted import: %s", ", ".join(restored) or "none missing")
+        self.pool.schema_checked = True
+
+    def check_query_plans(self, uid:int) -> List[Dict[str,Any]]:
+        """Runs the read helpers for uid under EXPLAIN QUERY PLAN and returns every
+        statement whose plan contains a full table scan (empty list when all use an index)."""
+        statements = []
+        conn = self.pool.connection()
+        conn.set_trace_callback(statements.append)
+        # inside a transaction the read cache is bypassed, so every helper hits SQLite
+        try:
+            with self.pool.read():
+                self.get_user(uid)
+                self.get_user_stats(uid)
+                self.get_user_topic_level(uid, "", "")
+                self.get_subject_stats(uid)
+                self.get_topic_stats(uid, "", "")
+                self.get_user_progress_data(uid)
+                self.get_user_streak_data(uid)
+                self.get_learner_features(uid)
+                self.get_skill_predictions()
+        finally:
+            conn.set_trace_callback(None)
+        scans = []
+        for sql in statements:
+            if not sql.lstrip().upper().startswith(("SELECT", "WITH")):
+                continue
+            plan = [row[3] for row in conn.execute("EXPLAIN QUERY PLAN " + sql)]
+            if any(step.startswith("SCAN ") and " USING " not in step for step in plan):
+                scans.append({"sql": sql, "plan": plan})
+        return scans
 
     # user helpers
     def create_user(self, name: str, style: str) -> int:
-        with sqlite3.connect(self.db_path) as conn:
+        with self.pool.write() as conn:
             cur = conn.cursor()
             cur.execute(
                 "INSERT INTO users (name, learning_style, streak_count, last_login_date) VALUES (?, ?, ?, ?)",
                 (name, style, 1, datetime.now().date().strftime("%Y-%m-%d"))
             )
-            return cur.lastrowid
+            uid = cur.lastrowid
+        self.pool.bump_versions([uid])
+        return uid
     
+    @cached_read
     def get_user(self, uid:int)->Dict[str,Any]:
-        with sqlite3.connect(self.db_path) as conn:
-            conn.row_factory=sqlite3.Row
+        with self.pool.read() as conn:
             cur=conn.cursor()
             cur.execute("SELECT * FROM users WHERE id=?",(uid,))
             row=cur.fetchone()
             return dict(row) if row else {}
     
     def get_all_users(self)->List[Dict[str,Any]]:
-        with sqlite3.connect(self.db_path) as conn:
-            conn.row_factory=sqlite3.Row
+        with self.pool.read() as conn:
             cur=conn.cursor()
             cur.execute("SELECT * FROM users ORDER BY created_at DESC")
             return [dict(r) for r in cur.fetchall()]
     
+    def search_users(self, prefix:str="", after:Optional[Tuple[int,str]]=None,
+                     limit:int=50)->List[Tuple[int,str]]:
+        """One page of (id, name) for users whose name starts with prefix (case-insensitive),
+        ordered by name then id. Pass the last row of a page as `after` to get the next page."""
+        where, params = [], []
+        if prefix:
+            # a range on the NOCASE index instead of LIKE, which cannot use it
+            where.append("name COLLATE NOCASE >= ? AND name COLLATE NOCASE < ?")
+            params += [prefix, prefix + "\U0010ffff"]
+        if after is not None:
+            where.append("(name COLLATE NOCASE, id) > (?, ?)")
+            params += [after[1], after[0]]
+        sql = "SELECT id, name FROM users"
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        sql += " ORDER BY name COLLATE NOCASE, id LIMIT ?"
+        with self.pool.read() as conn:
+            cur=conn.cursor()
+            cur.execute(sql, (*params, limit))
+            return [(r[0], r[1]) for r in cur.fetchall()]
+
     def update_user_settings(self, uid:int, data:Dict[str,Any]):
-        with sqlite3.connect(self.db_path) as conn:
+        with self.pool.write() as conn:
             cur=conn.cursor()
             sets=", ".join(f"{k}=?" for k in data)
             cur.execute(f"UPDATE users SET {sets} WHERE id=?",(*data.values(),uid))
-            conn.commit()
+        self.pool.bump_versions([uid])
     # quiz record
     def record_quiz_answer(self, uid:int, subj:str, topic:str, question:str,
-                           user_ans:str, correct:str, is_corr:bool, lvl:int):
-        with sqlite3.connect(self.db_path) as conn:
+                           user_ans:str, correct:str, is_corr:bool, lvl:int,
+                           options:Optional[List[str]]=None, explanation:Optional[str]=None,
+                           question_level:Optional[int]=None, time_spent_sec:Optional[float]=None):
+        """Records one answer. options/explanation/question_level describe the question for
+        the catalog; question_level is the bank level it came from (defaults to lvl).
+        time_spent_sec is how long the question was on screen, when known."""
+        # CURRENT_TIMESTAMP is UTC; stamp here so queued answers keep their submit time
+        ts = datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M:%S")
+        entry = catalog_entry(subj, topic, lvl if question_level is None else question_level,
+                              question, options, correct, explanation)
+        row = AnswerRow(uid, subj, topic, user_ans, is_corr, lvl, ts, entry, time_spent_sec)
+        if self.writer is not None:
+            self.writer.submit(uid, row)
+            return
+        with self.pool.write() as conn:
+            self._apply_answers(conn, [row])
+        self.pool.bump_versions([uid])
+
+    def _apply_answers(self, conn:sqlite3.Connection, rows:List[AnswerRow]):
+        """Writes a batch of answer rows inside the caller's write transaction."""
+        cur=conn.cursor()
+        cur.executemany("INSERT OR IGNORE INTO questions (id,subject,topic,level,question,options,correct_answer,explanation) VALUES (?,?,?,?,?,?,?,?)",
+                        {r.question.id: r.question for r in rows}.values())
+        cur.executemany("INSERT INTO quiz_attempts (user_id,subject,topic,question_id,user_answer,is_correct,difficulty_level,time_spent_sec,timestamp) VALUES (?,?,?,?,?,?,?,?,?)",
+                        [(r.uid,r.subject,r.topic,r.question.id,r.user_answer,r.is_correct,r.level,r.time_spent_sec,r.timestamp) for r in rows])
+        # progress table
+        cur.executemany("""INSERT INTO user_progress
+            (user_id,subject,topic,current_level,total_questions,correct_answers)
+            VALUES (?,?,?,?,1,?)
+            ON CONFLICT(user_id,subject,topic) DO UPDATE SET
+                total_questions=total_questions+1,
+                correct_answers=correct_answers+?,
+                current_level=excluded.current_level,
+                last_updated=CURRENT_TIMESTAMP""",
+            [(r.uid,r.subject,r.topic,r.level,1 if r.is_correct else 0,1 if r.is_correct else 0) for r in rows])
+        # dashboard aggregates, kept in step with quiz_attempts
+        cur.executemany("""INSERT INTO user_stats (user_id,total_questions,correct_answers,max_level)
+            VALUES (?,1,?,?)
+            ON CONFLICT(user_id) DO UPDATE SET
+                total_questions=total_questions+1,
+                correct_answers=correct_answers+excluded.correct_answers,
+                max_level=MAX(COALESCE(max_level,excluded.max_level),COALESCE(excluded.max_level,max_level))""",
+            [(r.uid,1 if r.is_correct else 0,r.level) for r in rows])
+        cur.executemany("""INSERT INTO user_subject_stats (user_id,subject,total_questions,correct_answers)
+            VALUES (?,?,1,?)
+            ON CONFLICT(user_id,subject) DO UPDATE SET
+                total_questions=total_questions+1,
+                correct_answers=correct_answers+excluded.correct_answers""",
+            [(r.uid,r.subject,1 if r.is_correct else 0) for r in rows])
+        cur.executemany("""INSERT INTO daily_user_accuracy (user_id,day,total_questions,correct_answers)
+            VALUES (?,?,1,?)
+            ON CONFLICT(user_id,day) DO UPDATE SET
+                total_questions=total_questions+1,
+                correct_answers=correct_answers+excluded.correct_answers""",
+            [(r.uid,r.timestamp[:10],1 if r.is_correct else 0) for r in rows])
+        # feature store: continue each learner's running totals through the batch in order,
+        # since every answer's past_correct_pct is the accuracy before that answer
+        uids=list({r.uid for r in rows})
+        cur.execute(f"SELECT user_id, total_questions, correct_answers, timed_questions, time_spent_total FROM learner_features WHERE user_id IN ({','.join('?'*len(uids))})",uids)
+        totals={uid:[0,0,0,0.0] for uid in uids}
+        totals.update({r[0]:list(r[1:]) for r in cur.fetchall()})
+        recent=[]
+        for r in rows:
+            t=totals[r.uid]
+            recent.append((r.uid,t[0]%self.RECENT_WINDOW,t[0],r.question.level if r.question.level is not None else r.level,
+                           1 if r.is_correct else 0,r.time_spent_sec,t[1]/t[0] if t[0] else 0.0))
+            t[0]+=1
+            t[1]+=1 if r.is_correct else 0
+            if r.time_spent_sec is not None:
+                t[2]+=1
+                t[3]+=r.time_spent_sec
+        cur.executemany("""INSERT OR REPLACE INTO learner_recent_attempts
+            (user_id,slot,seq,question_difficulty,mcq_correct,time_spent_sec,past_correct_pct) VALUES (?,?,?,?,?,?,?)""",recent)
+        cur.executemany("INSERT OR REPLACE INTO learner_features (user_id,total_questions,correct_answers,timed_questions,time_spent_total) VALUES (?,?,?,?,?)",
+                        [(uid,*t) for uid,t in totals.items()])
+
+    def flush(self):
+        """Blocks until every queued answer has been committed (no-op in direct mode).
+        Raises AnswerWriteError if some could not be; writer.retry_failed() queues them again."""
+        if self.writer is not None:
+            self.writer.flush()
+
+    def rebuild_aggregates(self) -> Dict[str,Any]:
+        """Recomputes user_stats, user_subject_stats, daily_user_accuracy and the learner feature
+        store from quiz_attempts.
+
+        Returns the number of rows rebuilt and the (user_id, ...) keys whose stored
+        aggregates had drifted from quiz_attempts before the rebuild.
+        """
+        self.flush()
+        with self.pool.write() as conn:
             cur=conn.cursor()
-            cur.execute("INSERT INTO quiz_attempts (user_id,subject,topic,question,user_answer,correct_answer,is_correct,difficulty_level) VALUES (?,?,?,?,?,?,?,?)",
-                        (uid,subj,topic,question,user_ans,correct,is_corr,lvl))
-            # progress table
-            cur.execute("""INSERT INTO user_progress
-                (user_id,subject,topic,current_level,total_questions,correct_answers)
-                VALUES (?,?,?,?,1,?)
-                ON CONFLICT(user_id,subject,topic) DO UPDATE SET
-                    total_questions=total_questions+1,
-                    correct_answers=correct_answers+?,
-                    current_level=excluded.current_level,
-                    last_updated=CURRENT_TIMESTAMP""",
-                (uid,subj,topic,lvl,1 if is_corr else 0,1 if is_corr else 0))
-            conn.commit()
+            cur.execute("""CREATE TEMP TABLE fresh_user_stats AS
+                SELECT user_id, COUNT(*) total_questions, SUM(CASE WHEN is_correct THEN 1 ELSE 0 END) correct_answers,
+                       MAX(difficulty_level) max_level
+                FROM quiz_attempts GROUP BY user_id""")
+            cur.execute("""CREATE TEMP TABLE fresh_user_subject_stats AS
+                SELECT user_id, subject, COUNT(*) total_questions, SUM(CASE WHEN is_correct THEN 1 ELSE 0 END) correct_answers
+                FROM quiz_attempts GROUP BY user_id, subject""")
+            cur.execute("""CREATE TEMP TABLE fresh_daily_user_accuracy AS
+                SELECT user_id, DATE(timestamp) day, COUNT(*) total_questions, SUM(CASE WHEN is_correct THEN 1 ELSE 0 END) correct_answers
+                FROM quiz_attempts WHERE user_id IS NOT NULL AND timestamp IS NOT NULL GROUP BY user_id, DATE(timestamp)""")
+            cur.execute("""CREATE TEMP TABLE fresh_learner_features AS
+                SELECT user_id, COUNT(*) total_questions, SUM(CASE WHEN is_correct THEN 1 ELSE 0 END) correct_answers,
+                       COUNT(time_spent_sec) timed_questions, COALESCE(SUM(time_spent_sec),0.0) time_spent_total
+                FROM quiz_attempts WHERE user_id IS NOT NULL GROUP BY user_id""")
+            cur.execute("""CREATE TEMP TABLE fresh_learner_recent_attempts AS
+                SELECT user_id, seq % ?1 slot, seq, question_difficulty, mcq_correct, time_spent_sec,
+                       CASE WHEN seq > 0 THEN 1.0*prior_correct/seq ELSE 0.0 END past_correct_pct
+                FROM (SELECT a.user_id, COALESCE(q.level,a.difficulty_level) question_difficulty,
+                             CASE WHEN a.is_correct THEN 1 ELSE 0 END mcq_correct, a.time_spent_sec,
+                             ROW_NUMBER() OVER w - 1 seq, COUNT(*) OVER (PARTITION BY a.user_id) n,
+                             COALESCE(SUM(CASE WHEN a.is_correct THEN 1 ELSE 0 END)
+                                      OVER (w ROWS BETWEEN UNBOUNDED PRECEDING AND 1 PRECEDING),0) prior_correct
+                      FROM quiz_attempts a LEFT JOIN questions q ON q.id=a.question_id
+                      WHERE a.user_id IS NOT NULL
+                      WINDOW w AS (PARTITION BY a.user_id ORDER BY a.timestamp, a.id))
+                WHERE seq >= n - ?1""",(self.RECENT_WINDOW,))
+            cur.execute("""SELECT user_id FROM (SELECT * FROM fresh_user_stats EXCEPT SELECT * FROM user_stats)
+                UNION SELECT user_id FROM (SELECT * FROM user_stats EXCEPT SELECT * FROM fresh_user_stats)""")
+            drifted_users=sorted({r[0] for r in cur.fetchall()})
+            cur.execute("""SELECT user_id, subject FROM (SELECT * FROM fresh_user_subject_stats EXCEPT SELECT * FROM user_subject_stats)
+                UNION SELECT user_id, subject FROM (SELECT * FROM user_subject_stats EXCEPT SELECT * FROM fresh_user_subject_stats)""")
+            drifted_subjects=sorted({(r[0],r[1]) for r in cur.fetchall()})
+            cur.execute("""SELECT user_id, day FROM (SELECT * FROM fresh_daily_user_accuracy EXCEPT SELECT * FROM daily_user_accuracy)
+                UNION SELECT user_id, day FROM (SELECT * FROM daily_user_accuracy EXCEPT SELECT * FROM fresh_daily_user_accuracy)""")
+            drifted_days=sorted({(r[0],r[1]) for r in cur.fetchall()})
+            # time totals are float sums accumulated in a different order, so compare them rounded
+            cur.execute("""WITH f AS (SELECT user_id, total_questions, correct_answers, timed_questions, ROUND(time_spent_total,3) FROM fresh_learner_features),
+                     s AS (SELECT user_id, total_questions, correct_answers, timed_questions, ROUND(time_spent_total,3) FROM learner_features)
+                SELECT user_id FROM (SELECT * FROM f EXCEPT SELECT * FROM s)
+                UNION SELECT user_id FROM (SELECT * FROM s EXCEPT SELECT * FROM f)
+                UNION SELECT user_id FROM (SELECT * FROM fresh_learner_recent_attempts EXCEPT SELECT * FROM learner_recent_attempts)
+                UNION SELECT user_id FROM (SELECT * FROM learner_recent_attempts EXCEPT SELECT * FROM fresh_learner_recent_attempts)""")
+            drifted_learners=sorted({r[0] for r in cur.fetchall()})
+            cur.execute("DELETE FROM user_stats")
+            cur.execute("INSERT INTO user_stats SELECT * FROM fresh_user_stats")
+            cur.execute("DELETE FROM user_subject_stats")
+            cur.execute("INSERT INTO user_subject_stats SELECT * FROM fresh_user_subject_stats")
+            cur.execute("DELETE FROM daily_user_accuracy")
+            cur.execute("INSERT INTO daily_user_accuracy SELECT * FROM fresh_daily_user_accuracy")
+            cur.execute("DELETE FROM learner_features")
+            cur.execute("INSERT INTO learner_features SELECT * FROM fresh_learner_features")
+            cur.execute("DELETE FROM learner_recent_attempts")
+            cur.execute("INSERT INTO learner_recent_attempts SELECT * FROM fresh_learner_recent_attempts")
+            users=cur.execute("SELECT COUNT(*) FROM user_stats").fetchone()[0]
+            subjects=cur.execute("SELECT COUNT(*) FROM user_subject_stats").fetchone()[0]
+            # temp tables are transactional, so a failed rebuild leaves nothing behind
+            cur.execute("DROP TABLE temp.fresh_user_stats")
+            cur.execute("DROP TABLE temp.fresh_user_subject_stats")
+            cur.execute("DROP TABLE temp.fresh_daily_user_accuracy")
+            cur.execute("DROP TABLE temp.fresh_learner_features")
+            cur.execute("DROP TABLE temp.fresh_learner_recent_attempts")
+        if self.pool.cache is not None:
+            self.pool.cache.clear()
+        return {"users":users,"user_subjects":subjects,
+                "drifted_users":drifted_users,"drifted_user_subjects":drifted_subjects,
+                "drifted_user_days":drifted_days,"drifted_learners":drifted_learners}
+
+    def cache_stats(self) -> Dict[str,int]:
+        """Hit/miss/eviction counters of the shared read cache (empty when disabled)."""
+        return self.pool.cache.stats() if self.pool.cache is not None else {}
+
+    def _sync(self, uid:int):
+        # read-your-writes: wait for this user's queued answers before reading them back
+        if self.writer is not None:
+            self.writer.wait_for(uid)
     # stats
+    @cached_read
     def get_user_stats(self, uid:int)->Dict[str,Any]:
-        with sqlite3.connect(self.db_path) as conn:
+        self._sync(uid)
+        with self.pool.read() as conn:
             cur=conn.cursor()
-            cur.execute("SELECT COUNT(*), SUM(CASE WHEN is_correct THEN 1 ELSE 0 END) FROM quiz_attempts WHERE user_id=?", (uid,))
-            total,correct=cur.fetchone()
-            cur.execute("SELECT MAX(difficulty_level) FROM quiz_attempts WHERE user_id=?", (uid,))
-            level=cur.fetchone()[0] or 1
-            return {"total_questions":total or 0,"correct_answers":correct or 0,"current_level":level}
+            cur.execute("SELECT total_questions, correct_answers, max_level FROM user_stats WHERE user_id=?", (uid,))
+            row=cur.fetchone()
+            if not row:
+                return {"total_questions":0,"correct_answers":0,"current_level":1}
+            return {"total_questions":row[0],"correct_answers":row[1],"current_level":row[2] or 1}
     
+    @cached_read
     def get_user_topic_level(self,uid:int,subj:str,topic:str)->int:
-        with sqlite3.connect(self.db_path) as conn:
+        self._sync(uid)
+        with self.pool.read() as conn:
             cur=conn.cursor()
             cur.execute("SELECT current_level FROM user_progress WHERE user_id=? AND subject=? AND topic=?", (uid,subj,topic))
             row=cur.fetchone()
             return row[0] if row else 1
     
+    @cached_read
     def get_subject_stats(self,uid:int)->List[Dict[str,Any]]:
-        with sqlite3.connect(self.db_path) as conn:
-            conn.row_factory=sqlite3.Row
+        self._sync(uid)
+        with self.pool.read() as conn:
             cur=conn.cursor()
-            cur.execute("SELECT subject, COUNT(*) total_questions, SUM(CASE WHEN is_correct THEN 1 ELSE 0 END) correct_answers, ROUND(AVG(CASE WHEN is_correct THEN 100 ELSE 0 END),1) accuracy FROM quiz_attempts WHERE user_id=? GROUP BY subject",(uid,))
+            cur.execute("SELECT subject, total_questions, correct_answers, ROUND(100.0*correct_answers/total_questions,1) accuracy FROM user_subject_stats WHERE user_id=? AND total_questions>0",(uid,))
             return [dict(r) for r in cur.fetchall()]
     
+    @cached_read
     def get_topic_stats(self,uid:int,subj:str,topic:str)->Dict[str,Any]:
-        with sqlite3.connect(self.db_path) as conn:
+        self._sync(uid)
+        with self.pool.read() as conn:
             cur=conn.cursor()
             cur.execute("SELECT COUNT(*), SUM(CASE WHEN is_correct THEN 1 ELSE 0 END) FROM quiz_attempts WHERE user_id=? AND subject=? AND topic=?", (uid,subj,topic))
             total,correct = cur.fetchone()
             return {"total_questions": total or 0, "correct": correct or 0}
     
-    def get_user_progress_data(self,uid:int)->List[Dict[str,Any]]:
-        with sqlite3.connect(self.db_path) as conn:
-            conn.row_factory=sqlite3.Row
+    @cached_read
+    def get_learner_features(self,uid:int)->Dict[str,Any]:
+        """Skill-predictor inputs for a learner, served from the feature store.
+
+        `rows` holds the learner's last RECENT_WINDOW attempts, oldest first, in the
+        competency CSV layout; a missing time_spent_sec falls back to the learner's average.
+        """
+        self._sync(uid)
+        with self.pool.read() as conn:
             cur=conn.cursor()
-            cur.execute("SELECT DATE(timestamp) date, ROUND(AVG(CASE WHEN is_correct THEN 100 ELSE 0 END),1) accuracy FROM quiz_attempts WHERE user_id=? GROUP BY DATE(timestamp)",(uid,))
-            return [dict(r) for r in cur.fetchall()]
+            cur.execute("SELECT total_questions, correct_answers, timed_questions, time_spent_total FROM learner_features WHERE user_id=?",(uid,))
+            totals=cur.fetchone()
+            total,correct,timed,time_total = totals if totals else (0,0,0,0.0)
+            avg_time = round(time_total/timed,2) if timed else None
+            cur.execute("""SELECT question_difficulty, mcq_correct, COALESCE(time_spent_sec,?) time_spent_sec, past_correct_pct
+                FROM learner_recent_attempts WHERE user_id=? ORDER BY seq""",(avg_time,uid))
+            return {"total_questions":total,"correct_answers":correct,
+                    "past_correct_pct":round(correct/total,3) if total else 0.0,
+                    "avg_time_spent_sec":avg_time,"rows":[dict(r) for r in cur.fetchall()]}
+
+    def get_skill_predictions(self, model_version:Optional[str]=None)->List[Dict[str,Any]]:
+        """Every learner's level from the batch scorer (utils.batch_scoring) for model_version,
+        default the most recently scored version; empty until it has run."""
+        with self.pool.read() as conn:
+            cur=conn.cursor()
+            if model_version is None:
+                cur.execute("SELECT model_version FROM skill_predictions ORDER BY scored_at DESC LIMIT 1")
+                row=cur.fetchone()
+                if not row:
+                    return []
+                model_version=row[0]
+            cur.execute("""SELECT p.user_id, u.name, p.predicted_level, p.mean_level, p.total_questions, p.scored_at,
+                    p.total_questions != COALESCE(f.total_questions, 0) outdated
+                FROM skill_predictions p LEFT JOIN users u ON u.id = p.user_id
+                LEFT JOIN learner_features f ON f.user_id = p.user_id
+                WHERE p.model_version=? ORDER BY p.user_id""",(model_version,))
+            return [dict(r, model_version=model_version) for r in cur.fetchall()]
+
+    @cached_read
+    def get_user_progress_data(self, uid:int, since:Optional[Union[date,str]]=None,
+                               until:Optional[Union[date,str]]=None, bucket:str="day",
+                               limit:Optional[int]=None)->List[Dict[str,Any]]:
+        """Accuracy per day/week/month from the daily_user_accuracy rollup, oldest first.
+
+        since/until are inclusive UTC dates; limit keeps only the most recent buckets.
+        Weeks are keyed by their Monday and months by their first day.
+        """
+        if bucket not in PROGRESS_BUCKETS:
+            raise ValueError(f"bucket must be one of {sorted(PROGRESS_BUCKETS)}")
+        self._sync(uid)
+        where, params = ["user_id=?"], [uid]
+        if since is not None:
+            where.append("day>=?"); params.append(str(since))
+        if until is not None:
+            where.append("day<=?"); params.append(str(until))
+        key = PROGRESS_BUCKETS[bucket]
+        sql = (f"SELECT {key} date, ROUND(100.0*SUM(correct_answers)/SUM(total_questions),1) accuracy "
+               f"FROM daily_user_accuracy WHERE {' AND '.join(where)} GROUP BY {key} ORDER BY {key} DESC")
+        if limit is not None:
+            sql += " LIMIT ?"; params.append(limit)
+        with self.pool.read() as conn:
+            cur=conn.cursor()
+            cur.execute(sql, params)
+            return [dict(r) for r in reversed(cur.fetchall())]
         
+    @cached_read
     def get_user_streak_data(self, uid: int) -> Dict[str, Any]:
         """
         Retrieves the user's daily streak count and last login date.
         """
-        with sqlite3.connect(self.db_path) as conn:
-            conn.row_factory = sqlite3.Row
+        with self.pool.read() as conn:
             cur = conn.cursor()
             
             # Fetch the last login date and streak count
@@ -155,37 +812,63 @@ class DatabaseManager:
                 WHERE id = ?
             """, (uid,))
             row = cur.fetchone()
-            
-            if not row:
-                return {
-                    "streak_count": 1,
-                    "last_login_date": date.today()
-                }
-
-            streak_count = row["streak_count"]
-            if not streak_count:  
-                streak_count = 1
-            last_login_str = row["last_login_date"]
-
-            if last_login_str:
-                try:
-                    last_login_date = datetime.strptime(last_login_str, "%Y-%m-%d").date()
-                except ValueError:
-                    last_login_date = date.today()  # fallback if malformed
-            else:
-                last_login_date = date.today()  # fallback if null
+        return self._streak_from_row(row)
 
+    @staticmethod
+    def _streak_from_row(row) -> Dict[str, Any]:
+        if not row:
             return {
-                "streak_count": streak_count,
-                "last_login_date": last_login_date
+                "streak_count": 1,
+                "last_login_date": date.today()
             }
 
+        streak_count = row["streak_count"]
+        if not streak_count:  
+            streak_count = 1
+        last_login_str = row["last_login_date"]
+
+        if last_login_str:
+            try:
+                last_login_date = datetime.strptime(last_login_str, "%Y-%m-%d").date()
+            except ValueError:
+                last_login_date = date.today()  # fallback if malformed
+        else:
+            last_login_date = date.today()  # fallback if null
+
+        return {
+            "streak_count": streak_count,
+            "last_login_date": last_login_date
+        }
+
+    @cached_read
+    def get_dashboard_snapshot(self, uid:int, progress_limit:Optional[int]=3) -> "DashboardSnapshot":
+        """Everything the navbar, dashboard and progress pages show for uid, read in one
+        transaction so the numbers are consistent with each other."""
+        self._sync(uid)
+        with self.pool.read():
+            # helpers called here join this read transaction
+            user = self.get_user(uid)
+            stats = self.get_user_stats(uid)
+            progress = self.get_user_progress_data(uid, limit=progress_limit)
+            subjects = self.get_subject_stats(uid)
+        streak = self._streak_from_row(user)
+        return DashboardSnapshot(
+            user=MappingProxyType(user),
+            total_questions=stats["total_questions"],
+            correct_answers=stats["correct_answers"],
+            current_level=stats["current_level"],
+            streak_count=streak["streak_count"],
+            last_login_date=streak["last_login_date"],
+            progress=tuple(ProgressPoint(**p) for p in progress),
+            subjects=tuple(SubjectStats(**s) for s in subjects),
+        )
+
     def update_user_login(self, uid: int):
         """
         Updates the user's login streak and last login date.
         """
         today = datetime.now().date()
-        with sqlite3.connect(self.db_path) as conn:
+        with self.pool.write() as conn:
             cur = conn.cursor()
             
             # Fetch the current streak and last login date
@@ -228,15 +911,30 @@ class DatabaseManager:
                     SET streak_count = 1, last_login_date = ?
                     WHERE id = ?
                 """, (today.strftime("%Y-%m-%d"), uid))
-            
-            conn.commit()
+        self.pool.bump_versions([uid])
 
     
     def ensure_user_topic_entry(self, uid: int, subject: str, topic: str, level: int = 1):
-        with sqlite3.connect(self.db_path) as conn:
+        with self.pool.write() as conn:
             cur = conn.cursor()
             cur.execute("""
                 INSERT OR IGNORE INTO user_progress (user_id, subject, topic, current_level, total_questions, correct_answers)
                 VALUES (?, ?, ?, ?, 0, 0)
             """, (uid, subject, topic, level))
-            conn.commit()
+            inserted = cur.rowcount > 0
+        if inserted:
+            self.pool.bump_versions([uid])
+
+
+if __name__ == "__main__":
+    # Maintenance entry point: python -m utils.database rebuild-aggregates [db_path]
+    if len(sys.argv) < 2 or sys.argv[1] != "rebuild-aggregates":
+        sys.exit("usage: python -m utils.database rebuild-aggregates [db_path]")
+    manager = DatabaseManager(*sys.argv[2:3])
+    report = manager.rebuild_aggregates()
+    print(f"Rebuilt aggregates for {report['users']} users / {report['user_subjects']} user-subjects")
+    if report["drifted_users"] or report["drifted_user_subjects"] or report["drifted_user_days"] or report["drifted_learners"]:
+        print(f"Corrected drift for users {report['drifted_users']}, user-subjects {report['drifted_user_subjects']},"
+              f" user-days {report['drifted_user_days']} and learner features {report['drifted_learners']}")
+    else:
+        print("Aggregates matched quiz_attempts")
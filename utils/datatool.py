@@ -0,0 +1,197 @@
+"""Streaming bulk export/import for the learning platform database.
+
+    python -m utils.datatool export quiz_attempts attempts.csv
+    python -m utils.datatool export competency attempts_features.csv
+    python -m utils.datatool import users users.jsonl --db data/learning_platform.db
+
+Rows move in fixed-size chunks, so memory stays constant regardless of table size. The
+`competency` export writes attempts in the utils/competency_v2_*.csv column layout and
+labels them on the same skill scale, so the file can be fed straight to SkillPredictor. Imports replace rows with an existing key;
+run them while the app is stopped, since running app processes keep their read caches.
+"""
+
+import argparse, csv, json, sys
+from contextlib import contextmanager
+from typing import IO, Iterator, List, Optional
+from utils.database import DatabaseManager
+from utils.features import skill_level
+from utils.migrations import restore_dropped_indexes
+
+TABLES = {
+    "users": ["id", "name", "learning_style", "created_at", "streak_count", "last_login_date"],
+    "questions": ["id", "subject", "topic", "level", "question", "options", "correct_answer", "explanation"],
+    "quiz_attempts": ["id", "user_id", "subject", "topic", "question_id", "question", "user_answer",
+                      "correct_answer", "is_correct", "difficulty_level", "time_spent_sec", "timestamp"],
+    "user_progress": ["id", "user_id", "subject", "topic", "current_level", "total_questions",
+                      "correct_answers", "last_updated"],
+}
+
+# Column holding the learner id, whose cached reads an import makes stale
+USER_COLUMN = {"users": "id", "quiz_attempts": "user_id", "user_progress": "user_id"}
+
+# Same columns, in the same order, as utils/competency_v2_train.csv
+COMPETENCY_COLUMNS = ["user_id", "question_id", "time_spent_sec", "question_difficulty",
+                      "mcq_correct", "past_correct_pct", "skill_level"]
+
+DEFAULT_CHUNK_SIZE = 5000
+DEFAULT_COMMIT_EVERY = 500000
+
+def _format_of(path: str, fmt: Optional[str]) -> str:
+    if fmt:
+        return fmt
+    return "jsonl" if path.endswith((".jsonl", ".ndjson")) else "csv"
+
+@contextmanager
+def _open(path: str, mode: str) -> Iterator[IO[str]]:
+    if path == "-":
+        yield sys.stdout if "w" in mode else sys.stdin
+        return
+    with open(path, mode, newline="", encoding="utf-8") as f:
+        yield f
+
+class _Writer:
+    def __init__(self, f: IO[str], fmt: str, columns: List[str]):
+        self.f, self.fmt, self.columns = f, fmt, columns
+        if fmt == "csv":
+            self.csv = csv.writer(f)
+            self.csv.writerow(columns)
+
+    def write_rows(self, rows):
+        if self.fmt == "csv":
+            self.csv.writerows(["" if v is None else v for v in row] for row in rows)
+        else:
+            self.f.writelines(json.dumps(dict(zip(self.columns, row)), ensure_ascii=False) + "\n" for row in rows)
+
+def _read_chunks(f: IO[str], fmt: str, columns: List[str], chunk_size: int) -> Iterator[List[tuple]]:
+    """Yields lists of row tuples ordered like `columns`; missing fields become NULL."""
+    if fmt == "csv":
+        records = ({k: (v if v != "" else None) for k, v in r.items()} for r in csv.DictReader(f))
+    else:
+        records = (json.loads(line) for line in f if line.strip())
+    chunk = []
+    for record in records:
+        chunk.append(tuple(record.get(c) for c in columns))
+        if len(chunk) >= chunk_size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+def _existing_columns(conn, table: str) -> List[str]:
+    present = {r[1] for r in conn.execute(f"PRAGMA table_info({table})")}
+    return [c for c in TABLES[table] if c in present]
+
+def export_table(db: DatabaseManager, table: str, path: str, fmt: Optional[str] = None,
+                 chunk_size: int = DEFAULT_CHUNK_SIZE) -> int:
+    """Streams a table (or the `competency` feature layout) to CSV/JSONL; returns rows written."""
+    fmt = _format_of(path, fmt)
+    db.flush()
+    written = 0
+    with db.pool.read() as conn, _open(path, "w") as f:
+        if table == "competency":
+            writer = _Writer(f, fmt, COMPETENCY_COLUMNS)
+            rows = _competency_rows(conn, chunk_size)
+        else:
+            columns = _existing_columns(conn, table)
+            writer = _Writer(f, fmt, columns)
+            cur = conn.execute(f"SELECT {', '.join(columns)} FROM {table} ORDER BY rowid")
+            rows = iter(lambda: cur.fetchmany(chunk_size), [])
+        for chunk in rows:
+            writer.write_rows([tuple(r) for r in chunk])
+            written += len(chunk)
+    return written
+
+def _competency_rows(conn, chunk_size: int) -> Iterator[List[tuple]]:
+    # Ordered per learner by time so past_correct_pct can be carried as a running value.
+    # skill_level is derived from past_correct_pct as in the competency CSVs (1 = strongest);
+    # the adaptive difficulty_level runs the other way and would invert the labels.
+    cur = conn.execute("""SELECT a.user_id, a.question_id, a.time_spent_sec, a.is_correct,
+            COALESCE(q.level, a.difficulty_level)
+        FROM quiz_attempts a LEFT JOIN questions q ON q.id = a.question_id
+        ORDER BY a.user_id, a.timestamp, a.id""")
+    user, seen, correct = None, 0, 0
+    while True:
+        chunk = cur.fetchmany(chunk_size)
+        if not chunk:
+            return
+        out = []
+        for uid, qid, spent, is_correct, qdiff in chunk:
+            if uid != user:
+                user, seen, correct = uid, 0, 0
+            past_pct = round(correct / seen, 3) if seen else 0.0
+            out.append((uid, qid, spent, qdiff, 1 if is_correct else 0, past_pct))
+            seen += 1
+            correct += 1 if is_correct else 0
+        levels = skill_level([row[5] for row in out]).tolist()
+        yield [row + (level,) for row, level in zip(out, levels)]
+
+def import_table(db: DatabaseManager, table: str, path: str, fmt: Optional[str] = None,
+                 chunk_size: int = DEFAULT_CHUNK_SIZE, commit_every: int = DEFAULT_COMMIT_EVERY) -> int:
+    """Streams CSV/JSONL rows into a table with indexes dropped for the duration of the load.
+    Commits every `commit_every` rows; returns rows imported.
+
+    The dropped indexes are recorded in dropped_indexes with the drop, so if the load is
+    killed, the next DatabaseManager to open the database recreates them. Imported learners'
+    cached reads are invalidated in this process only; other processes keep theirs."""
+    if table not in TABLES:
+        raise ValueError(f"cannot import into {table!r}; choose one of {sorted(TABLES)}")
+    fmt = _format_of(path, fmt)
+    db.flush()
+    with db.pool.write() as conn:
+        columns = _existing_columns(conn, table)
+        indexes = conn.execute("SELECT name, sql FROM sqlite_master WHERE type='index' AND tbl_name=? AND sql IS NOT NULL",
+                               (table,)).fetchall()
+        conn.executemany("INSERT OR REPLACE INTO dropped_indexes (name, sql) VALUES (?, ?)", indexes)
+        for name, _ in indexes:
+            conn.execute(f"DROP INDEX {name}")
+    sql = f"INSERT OR REPLACE INTO {table} ({', '.join(columns)}) VALUES ({', '.join('?' * len(columns))})"
+    user_col = columns.index(USER_COLUMN[table]) if USER_COLUMN.get(table) in columns else None
+    uids = set()
+    imported = 0
+    try:
+        with _open(path, "r") as f:
+            chunks = _read_chunks(f, fmt, columns, chunk_size)
+            done = False
+            while not done:
+                with db.pool.write() as conn:
+                    in_txn = 0
+                    for chunk in chunks:
+                        conn.executemany(sql, chunk)
+                        if user_col is not None:
+                            uids.update(int(row[user_col]) for row in chunk if row[user_col] is not None)
+                        in_txn += len(chunk)
+                        if in_txn >= commit_every:
+                            break
+                    else:
+                        done = True
+                    imported += in_txn
+    finally:
+        with db.pool.write() as conn:
+            restore_dropped_indexes(conn)
+        db.pool.bump_versions(uids)
+    if table == "quiz_attempts":
+        db.rebuild_aggregates()
+    return imported
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(prog="python -m utils.datatool", description=__doc__.split("\n\n")[0],
+                                     epilog="Run imports while the app is stopped: running app processes keep "
+                                            "serving their cached reads of the imported learners until restarted.")
+    parser.add_argument("command", choices=["export", "import"])
+    parser.add_argument("table", choices=sorted(TABLES) + ["competency"])
+    parser.add_argument("path", help="file to write/read, or - for stdout/stdin")
+    parser.add_argument("--format", choices=["csv", "jsonl"], help="default: from the file extension")
+    parser.add_argument("--db", default="data/learning_platform.db")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE)
+    parser.add_argument("--commit-every", type=int, default=DEFAULT_COMMIT_EVERY)
+    args = parser.parse_args(argv)
+
+    db = DatabaseManager(args.db, write_behind=False)
+    if args.command == "export":
+        n = export_table(db, args.table, args.path, args.format, args.chunk_size)
+    else:
+        n = import_table(db, args.table, args.path, args.format, args.chunk_size, args.commit_every)
+    print(f"{args.command}ed {n} {args.table} rows", file=sys.stderr)
+
+if __name__ == "__main__":
+    main()
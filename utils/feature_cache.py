@@ -0,0 +1,98 @@
+"""On-disk cache of preprocessed training data for the skill predictor.
+
+Everything SkillPredictor derives from a competency CSV before training is cached under a
+directory named after the CSV's content hash, so an unchanged file is parsed once:
+
+    <root>/v<FORMAT>/<sha256 of csv>/labels.json                      row count, top skill level
+    <root>/v<FORMAT>/<sha256 of csv>/pipeline-v<V>-l<levels>.npz       FeaturePipeline fitted on it
+    <root>/v<FORMAT>/<sha256 of csv>/matrix-<pipeline fingerprint>/    X.npy (float32), y.npy (int8)
+
+The matrices are reopened with np.load(mmap_mode="r"), so concurrent training, evaluation and
+hyperparameter-search processes read one copy through the OS page cache. Entries are
+written under a temporary name and renamed into place; a process losing a race to create
+the same entry discards its copy.
+"""
+
+import json, os, shutil, threading
+from typing import Tuple
+import numpy as np
+from utils.features import FeaturePipeline
+from utils.model_registry import file_fingerprint
+from utils.training_data import DEFAULT_CHUNK_ROWS, TrainingStream, read_chunks, scan_labels
+
+DEFAULT_CACHE_DIR = "models/feature_cache"
+
+# Bump when the CSV dtype schema or the file layout changes (2: pipelines keep running statistics)
+CACHE_FORMAT = 2
+
+def _tmp_name(path: str) -> str:
+    return f"{path}.tmp{os.getpid()}.{threading.get_ident()}"
+
+class FeatureCache:
+    """Cached scan_labels, fit_chunks and scaled matrices for competency CSVs under root."""
+    def __init__(self, root: str = DEFAULT_CACHE_DIR, chunksize: int = DEFAULT_CHUNK_ROWS):
+        self.root = os.path.join(root, f"v{CACHE_FORMAT}")
+        self.chunksize = chunksize
+
+    def source_dir(self, path: str) -> str:
+        directory = os.path.join(self.root, file_fingerprint(path))
+        os.makedirs(directory, exist_ok=True)
+        return directory
+
+    def labels(self, path: str) -> Tuple[int, int]:
+        """scan_labels(path), computed once per file content."""
+        cached = os.path.join(self.source_dir(path), "labels.json")
+        try:
+            with open(cached) as f:
+                saved = json.load(f)
+            return saved["rows"], saved["top"]
+        except FileNotFoundError:
+            pass
+        rows, top = scan_labels(path, self.chunksize)
+        tmp = _tmp_name(cached)
+        with open(tmp, "w") as f:
+            json.dump({"rows": rows, "top": top}, f)
+        os.replace(tmp, cached)
+        return rows, top
+
+    def pipeline(self, path: str, num_levels: int) -> FeaturePipeline:
+        """A FeaturePipeline(num_levels) fitted on path, fitted once per file content."""
+        cached = os.path.join(self.source_dir(path), f"pipeline-v{FeaturePipeline.VERSION}-l{num_levels}.npz")
+        if os.path.exists(cached):
+            return FeaturePipeline.load(cached)
+        pipeline = FeaturePipeline(num_levels).fit_chunks(read_chunks(path, self.chunksize))
+        tmp = _tmp_name(cached) + ".npz"  # np.savez appends .npz to names without it
+        pipeline.save(tmp)
+        os.replace(tmp, cached)
+        return pipeline
+
+    def matrices(self, path: str, pipeline: FeaturePipeline) -> Tuple[np.ndarray, np.ndarray]:
+        """Read-only memory maps of path scaled by pipeline (X) and its 0-based levels (y)."""
+        directory = os.path.join(self.source_dir(path), f"matrix-{pipeline.fingerprint()[:24]}")
+        if not os.path.isdir(directory):
+            self._write_matrices(path, pipeline, directory)
+        return (np.load(os.path.join(directory, "X.npy"), mmap_mode="r"),
+                np.load(os.path.join(directory, "y.npy"), mmap_mode="r"))
+
+    def _write_matrices(self, path: str, pipeline: FeaturePipeline, directory: str):
+        rows, _ = self.labels(path)
+        tmp = _tmp_name(directory)
+        os.makedirs(tmp)
+        try:
+            X = np.lib.format.open_memmap(os.path.join(tmp, "X.npy"), mode="w+", dtype=np.float32,
+                                          shape=(rows, pipeline.n_features))
+            y = np.lib.format.open_memmap(os.path.join(tmp, "y.npy"), mode="w+", dtype=np.int8, shape=(rows,))
+            pos = 0
+            for X_chunk, y_chunk in TrainingStream(path, pipeline, 0, rows, self.chunksize):
+                X[pos:pos + len(X_chunk)] = X_chunk
+                y[pos:pos + len(y_chunk)] = y_chunk
+                pos += len(X_chunk)
+            X.flush()
+            y.flush()
+            del X, y
+            os.rename(tmp, directory)
+        except OSError:
+            if not os.path.isdir(directory):
+                raise
+        finally:
+            shutil.rmtree(tmp, ignore_errors=True)
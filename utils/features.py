@@ -0,0 +1,162 @@
+"""Feature pipeline for the skill predictor.
+
+Turns competency rows (the utils/competency_v2_*.csv layout) into the scaled float32 matrix
+the network is trained on: the numeric columns followed by a thermometer encoding of the
+question difficulty, standardised with statistics fitted on the training set; a missing
+numeric value is imputed with the training mean (0 after scaling). The whole matrix is
+written into one preallocated array, and a fitted pipeline is immutable, so one instance
+can be shared by every thread that predicts with the model it was saved with.
+"""
+
+import hashlib
+import numpy as np
+
+NUMERIC_FEATURES = ["time_spent_sec", "mcq_correct", "past_correct_pct"]
+THERMOMETER_FEATURE = "question_difficulty"
+
+# Lowest past_correct_pct of skill levels 1, 2, ... in the competency CSVs; below the last
+# band is the lowest level (5). Rows exactly on a boundary (0.5) are split in the CSVs.
+SKILL_BANDS = (0.9, 0.75, 0.5, 0.25)
+
+def skill_level(past_correct_pct):
+    """The competency CSVs' skill_level (1 = strongest) for past_correct_pct values. Rows
+    built from quiz attempts are labelled with it, never with the adaptive difficulty."""
+    p = np.asarray(past_correct_pct, dtype=np.float64)
+    return 1 + (p[..., None] < np.asarray(SKILL_BANDS)).sum(axis=-1)
+
+def thermometer_encode(values, num_levels, out=None):
+    """Row i gets ones in columns 0..values[i] (0-based levels) and zeros after."""
+    values = np.asarray(values)
+    if out is None:
+        out = np.empty((len(values), num_levels), dtype=np.float32)
+    np.less_equal(np.arange(num_levels), values[:, None], out=out, casting="unsafe")
+    return out
+
+class FeaturePipeline:
+    """Encodes and scales competency rows; fit once, then read-only."""
+    # Bump when the encoding changes, so cached or saved features are not reused
+    VERSION = 1
+
+    def __init__(self, num_levels, mean=None, scale=None, count=None, var=None):
+        self.num_levels = int(num_levels)
+        self.mean = self._frozen(mean)
+        self.scale = self._frozen(scale)
+        # Non-missing row counts and raw variances per column behind mean/scale, so partial_fit
+        # can merge in new rows; None for pipelines saved before they were recorded
+        self.count = self._frozen(count, np.float64)
+        self.var = self._frozen(var, np.float64)
+
+    @staticmethod
+    def _frozen(values, dtype=np.float32):
+        if values is None:
+            return None
+        values = np.array(values, dtype=dtype)
+        values.setflags(write=False)
+        return values
+
+    @property
+    def n_features(self):
+        return len(NUMERIC_FEATURES) + self.num_levels
+
+    @property
+    def fitted(self):
+        return self.mean is not None
+
+    def schema(self):
+        return {"numeric": NUMERIC_FEATURES, "thermometer": THERMOMETER_FEATURE,
+                "num_levels": self.num_levels, "version": self.VERSION}
+
+    def encode(self, df, out=None):
+        """Unscaled feature matrix for df, written into `out` (allocated if not given)."""
+        n, k = len(df), len(NUMERIC_FEATURES)
+        if out is None:
+            out = np.empty((n, self.n_features), dtype=np.float32)
+        for i, col in enumerate(NUMERIC_FEATURES):
+            out[:, i] = df[col].to_numpy(dtype=np.float32, na_value=np.nan)
+        # difficulty is 1-based in the data, thermometer levels are 0-based
+        qdiff = df[THERMOMETER_FEATURE].to_numpy().astype(np.int64) - 1
+        thermometer_encode(qdiff, self.num_levels, out=out[:, k:])
+        return out
+
+    def fit(self, df):
+        """Returns a new pipeline with mean/scale fitted on df (same maths as StandardScaler)."""
+        return self.fit_chunks([df])
+
+    def fit_chunks(self, chunks):
+        """Like fit(), over an iterable of DataFrames (e.g. utils.training_data.read_chunks).
+
+        Only per-column counts, means and squared-deviation sums are kept, merged chunk by
+        chunk (Chan et al.'s pairwise update), so memory is bounded by the largest chunk.
+        """
+        d = self.n_features
+        count, mean, m2 = np.zeros(d), np.zeros(d), np.zeros(d)
+        for df in chunks:
+            self._merge_moments(count, mean, m2, self.encode(df))
+        return self._from_moments(count, mean, m2)
+
+    def partial_fit(self, df):
+        """Returns a new pipeline whose statistics also cover the rows of df, as if it had
+        been fitted on the original rows and df together."""
+        if self.count is None:
+            raise RuntimeError("FeaturePipeline.partial_fit needs a pipeline saved with its running statistics")
+        count = np.array(self.count)
+        mean = np.where(count > 0, self.mean, 0.0).astype(np.float64)
+        m2 = np.where(count > 0, self.var * count, 0.0)
+        self._merge_moments(count, mean, m2, self.encode(df))
+        return self._from_moments(count, mean, m2)
+
+    @staticmethod
+    def _merge_moments(count, mean, m2, X):
+        # column by column, so the float64 temporaries are one column rather than the whole matrix
+        for j in range(X.shape[1]):
+            col = X[:, j]
+            col = col[~np.isnan(col)]
+            n = len(col)
+            if not n:
+                continue
+            col_mean = col.mean(dtype=np.float64)
+            col_m2 = np.square(col - col_mean, dtype=np.float64).sum()
+            total = count[j] + n
+            delta = col_mean - mean[j]
+            mean[j] += delta * n / total
+            m2[j] += col_m2 + delta * delta * count[j] * n / total
+            count[j] = total
+
+    def _from_moments(self, count, mean, m2):
+        with np.errstate(invalid="ignore", divide="ignore"):
+            mean = np.where(count > 0, mean, np.nan)  # as nanmean of an all-missing column
+            var = m2 / count
+        std = np.sqrt(var)
+        std[std < 10 * np.finfo(np.float64).eps] = 1.0  # constant columns are left unscaled
+        return FeaturePipeline(self.num_levels, mean, std, count, var)
+
+    def transform(self, df, out=None):
+        """Scaled float32 feature matrix for df."""
+        if not self.fitted:
+            raise RuntimeError("FeaturePipeline.transform called before fit")
+        X = self.encode(df, out)
+        X -= self.mean
+        X /= self.scale
+        np.nan_to_num(X, copy=False, nan=0.0)
+        return X
+
+    def fingerprint(self):
+        """Hex digest of the encoding version and fitted statistics: equal fingerprints
+        transform every row identically."""
+        h = hashlib.sha256(f"{self.VERSION}:{self.num_levels}".encode())
+        if self.fitted:
+            h.update(self.mean.tobytes())
+            h.update(self.scale.tobytes())
+        return h.hexdigest()
+
+    def save(self, path):
+        stats = {} if self.count is None else {"count": self.count, "var": self.var}
+        np.savez(path, version=self.VERSION, num_levels=self.num_levels, mean=self.mean, scale=self.scale, **stats)
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path) as saved:
+            if int(saved["version"]) != cls.VERSION:
+                raise ValueError(f"feature pipeline {path} has version {int(saved['version'])}, expected {cls.VERSION}")
+            stats = {k: saved[k] for k in ("count", "var") if k in saved.files}
+            return cls(int(saved["num_levels"]), saved["mean"], saved["scale"], **stats)
@@ -0,0 +1,283 @@
+"""Versioned schema migrations for the learning platform database.
+
+Each migration runs exactly once per database and is recorded in schema_version.
+Migrations are append-only: never edit one that has shipped, add a new version instead.
+"""
+
+import sqlite3
+from typing import Callable, List, Optional, Tuple
+
+def _m001_base_tables(c: sqlite3.Cursor):
+    c.execute("""CREATE TABLE IF NOT EXISTS users (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        name TEXT,
+        learning_style TEXT,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    )""")
+    c.execute("""CREATE TABLE IF NOT EXISTS quiz_attempts (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        user_id INTEGER,
+        subject TEXT,
+        topic TEXT,
+        question TEXT,
+        user_answer TEXT,
+        correct_answer TEXT,
+        is_correct BOOLEAN,
+        difficulty_level INTEGER,
+        timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    )""")
+    c.execute("""CREATE TABLE IF NOT EXISTS user_progress (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        user_id INTEGER,
+        subject TEXT,
+        topic TEXT,
+        current_level INTEGER,
+        total_questions INTEGER,
+        correct_answers INTEGER,
+        last_updated TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        UNIQUE(user_id,subject,topic)
+    )""")
+    # Databases created before streaks were added are missing these columns
+    c.execute("PRAGMA table_info(users)")
+    columns = [row[1] for row in c.fetchall()]
+    if "streak_count" not in columns:
+        c.execute("ALTER TABLE users ADD COLUMN streak_count INTEGER DEFAULT 1")
+    if "last_login_date" not in columns:
+        c.execute("ALTER TABLE users ADD COLUMN last_login_date DATE")
+
+def _m002_attempt_indexes(c: sqlite3.Cursor):
+    # Every stats helper filters quiz_attempts on user_id; the trailing columns make the
+    # indexes covering so the aggregates never touch the table rows.
+    c.execute("CREATE INDEX IF NOT EXISTS idx_attempts_user_subject_topic ON quiz_attempts(user_id, subject, topic, is_correct)")
+    c.execute("CREATE INDEX IF NOT EXISTS idx_attempts_user_time ON quiz_attempts(user_id, timestamp, is_correct)")
+    c.execute("CREATE INDEX IF NOT EXISTS idx_attempts_user_level ON quiz_attempts(user_id, difficulty_level)")
+    c.execute("CREATE INDEX IF NOT EXISTS idx_users_created_at ON users(created_at)")
+
+def _m003_user_aggregates(c: sqlite3.Cursor):
+    # Running totals maintained by DatabaseManager._apply_answers in the same transaction
+    # as the attempt insert; DatabaseManager.rebuild_aggregates() recomputes them.
+    c.execute("""CREATE TABLE IF NOT EXISTS user_stats (
+        user_id INTEGER PRIMARY KEY,
+        total_questions INTEGER NOT NULL DEFAULT 0,
+        correct_answers INTEGER NOT NULL DEFAULT 0,
+        max_level INTEGER
+    )""")
+    c.execute("""CREATE TABLE IF NOT EXISTS user_subject_stats (
+        user_id INTEGER,
+        subject TEXT,
+        total_questions INTEGER NOT NULL DEFAULT 0,
+        correct_answers INTEGER NOT NULL DEFAULT 0,
+        PRIMARY KEY (user_id, subject)
+    )""")
+    c.execute("""INSERT OR REPLACE INTO user_stats (user_id, total_questions, correct_answers, max_level)
+        SELECT user_id, COUNT(*), SUM(CASE WHEN is_correct THEN 1 ELSE 0 END), MAX(difficulty_level)
+        FROM quiz_attempts GROUP BY user_id""")
+    c.execute("""INSERT OR REPLACE INTO user_subject_stats (user_id, subject, total_questions, correct_answers)
+        SELECT user_id, subject, COUNT(*), SUM(CASE WHEN is_correct THEN 1 ELSE 0 END)
+        FROM quiz_attempts GROUP BY user_id, subject""")
+
+def _m004_daily_rollup(c: sqlite3.Cursor):
+    # One row per learner per UTC day, so progress charts never scan quiz_attempts
+    c.execute("""CREATE TABLE IF NOT EXISTS daily_user_accuracy (
+        user_id INTEGER,
+        day TEXT,
+        total_questions INTEGER NOT NULL DEFAULT 0,
+        correct_answers INTEGER NOT NULL DEFAULT 0,
+        PRIMARY KEY (user_id, day)
+    ) WITHOUT ROWID""")
+    c.execute("""INSERT OR REPLACE INTO daily_user_accuracy (user_id, day, total_questions, correct_answers)
+        SELECT user_id, DATE(timestamp), COUNT(*), SUM(CASE WHEN is_correct THEN 1 ELSE 0 END)
+        FROM quiz_attempts WHERE user_id IS NOT NULL AND timestamp IS NOT NULL
+        GROUP BY user_id, DATE(timestamp)""")
+
+def _m005_user_name_index(c: sqlite3.Cursor):
+    # Case-insensitive prefix search and keyset pagination for the login screen
+    c.execute("CREATE INDEX IF NOT EXISTS idx_users_name ON users(name COLLATE NOCASE, id)")
+
+def _m006_question_catalog(c: sqlite3.Cursor):
+    # Attempts used to repeat the full question and correct answer text in every row;
+    # they now point at one catalog row per distinct question.
+    from utils.questions import question_content_id
+    c.execute("""CREATE TABLE IF NOT EXISTS questions (
+        id INTEGER PRIMARY KEY,
+        subject TEXT,
+        topic TEXT,
+        level INTEGER,
+        question TEXT,
+        options TEXT,
+        correct_answer TEXT,
+        explanation TEXT
+    )""")
+    c.execute("ALTER TABLE quiz_attempts ADD COLUMN question_id INTEGER")
+    # Legacy attempts only kept the question and answer text, so options, explanation
+    # and the bank level are unknown for them
+    c.connection.create_function("question_content_id", 4,
+        lambda subject, topic, question, correct: question_content_id(subject, topic, None, question, None, correct, None),
+        deterministic=True)
+    try:
+        c.execute("""INSERT OR IGNORE INTO questions (id, subject, topic, question, correct_answer)
+            SELECT DISTINCT question_content_id(subject, topic, question, correct_answer), subject, topic, question, correct_answer
+            FROM quiz_attempts WHERE question IS NOT NULL""")
+        c.execute("""UPDATE quiz_attempts
+            SET question_id = question_content_id(subject, topic, question, correct_answer), question = NULL, correct_answer = NULL
+            WHERE question IS NOT NULL""")
+    finally:
+        c.connection.create_function("question_content_id", 4, None)
+    c.execute("""CREATE VIEW IF NOT EXISTS quiz_attempt_details AS
+        SELECT a.id, a.user_id, a.subject, a.topic, a.question_id, q.question, a.user_answer, q.correct_answer,
+               a.is_correct, a.difficulty_level, a.timestamp
+        FROM quiz_attempts a LEFT JOIN questions q ON q.id = a.question_id""")
+
+def _m007_learner_features(c: sqlite3.Cursor):
+    # Inputs of the skill predictor, maintained per answer by DatabaseManager._apply_answers.
+    # learner_features holds running totals; learner_recent_attempts is a ring buffer of each
+    # learner's last 20 attempts (slot = seq % 20) in the competency feature layout.
+    c.execute("ALTER TABLE quiz_attempts ADD COLUMN time_spent_sec REAL")
+    c.execute("""CREATE TABLE IF NOT EXISTS learner_features (
+        user_id INTEGER PRIMARY KEY,
+        total_questions INTEGER NOT NULL DEFAULT 0,
+        correct_answers INTEGER NOT NULL DEFAULT 0,
+        timed_questions INTEGER NOT NULL DEFAULT 0,
+        time_spent_total REAL NOT NULL DEFAULT 0
+    )""")
+    c.execute("""CREATE TABLE IF NOT EXISTS learner_recent_attempts (
+        user_id INTEGER,
+        slot INTEGER,
+        seq INTEGER NOT NULL,
+        question_difficulty INTEGER,
+        mcq_correct INTEGER NOT NULL,
+        time_spent_sec REAL,
+        past_correct_pct REAL NOT NULL,
+        PRIMARY KEY (user_id, slot)
+    ) WITHOUT ROWID""")
+    c.execute("""INSERT OR REPLACE INTO learner_features (user_id, total_questions, correct_answers)
+        SELECT user_id, COUNT(*), SUM(CASE WHEN is_correct THEN 1 ELSE 0 END)
+        FROM quiz_attempts WHERE user_id IS NOT NULL GROUP BY user_id""")
+    c.execute("""INSERT OR REPLACE INTO learner_recent_attempts
+            (user_id, slot, seq, question_difficulty, mcq_correct, time_spent_sec, past_correct_pct)
+        SELECT user_id, seq % 20, seq, question_difficulty, mcq_correct, NULL,
+               CASE WHEN seq > 0 THEN 1.0 * prior_correct / seq ELSE 0.0 END
+        FROM (SELECT a.user_id, COALESCE(q.level, a.difficulty_level) question_difficulty,
+                     CASE WHEN a.is_correct THEN 1 ELSE 0 END mcq_correct,
+                     ROW_NUMBER() OVER w - 1 seq, COUNT(*) OVER (PARTITION BY a.user_id) n,
+                     COALESCE(SUM(CASE WHEN a.is_correct THEN 1 ELSE 0 END)
+                              OVER (w ROWS BETWEEN UNBOUNDED PRECEDING AND 1 PRECEDING), 0) prior_correct
+              FROM quiz_attempts a LEFT JOIN questions q ON q.id = a.question_id
+              WHERE a.user_id IS NOT NULL
+              WINDOW w AS (PARTITION BY a.user_id ORDER BY a.timestamp, a.id))
+        WHERE seq >= n - 20""")
+    c.execute("DROP VIEW IF EXISTS quiz_attempt_details")
+    c.execute("""CREATE VIEW quiz_attempt_details AS
+        SELECT a.id, a.user_id, a.subject, a.topic, a.question_id, q.question, a.user_answer, q.correct_answer,
+               a.is_correct, a.difficulty_level, a.time_spent_sec, a.timestamp
+        FROM quiz_attempts a LEFT JOIN questions q ON q.id = a.question_id""")
+
+def _m008_training_jobs(c: sqlite3.Cursor):
+    # Skill model training runs in worker processes (utils.training_jobs); this is their
+    # shared status board. At most one queued/running job per dataset.
+    c.execute("""CREATE TABLE IF NOT EXISTS training_jobs (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        dataset_key TEXT NOT NULL,
+        train_path TEXT,
+        test_path TEXT,
+        state TEXT NOT NULL DEFAULT 'queued' CHECK (state IN ('queued','running','succeeded','failed')),
+        owner_pid INTEGER,
+        epoch INTEGER NOT NULL DEFAULT 0,
+        epochs INTEGER,
+        progress TEXT,
+        metrics TEXT,
+        artifact_path TEXT,
+        error TEXT,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        started_at TIMESTAMP,
+        finished_at TIMESTAMP
+    )""")
+    c.execute("""CREATE UNIQUE INDEX IF NOT EXISTS idx_training_jobs_active ON training_jobs(dataset_key)
+        WHERE state IN ('queued','running')""")
+
+def _m009_skill_predictions(c: sqlite3.Cursor):
+    # Written by the batch scorer (utils.batch_scoring), one row per learner per model version;
+    # total_questions is the learner's count when scored, so later answers mark it outdated
+    c.execute("""CREATE TABLE IF NOT EXISTS skill_predictions (
+        user_id INTEGER,
+        model_version TEXT,
+        predicted_level INTEGER NOT NULL,
+        mean_level REAL NOT NULL,
+        total_questions INTEGER NOT NULL,
+        scored_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        PRIMARY KEY (model_version, user_id)
+    ) WITHOUT ROWID""")
+
+def _m010_drop_unused_attempt_indexes(c: sqlite3.Cursor):
+    # Dashboard and progress reads moved to user_stats and daily_user_accuracy (migrations 3
+    # and 4), so nothing reads through these any more, while every answer insert paid to
+    # maintain them. idx_attempts_user_subject_topic still serves get_topic_stats.
+    c.execute("DROP INDEX IF EXISTS idx_attempts_user_time")
+    c.execute("DROP INDEX IF EXISTS idx_attempts_user_level")
+
+def _m011_dropped_indexes(c: sqlite3.Cursor):
+    # Indexes a bulk import (utils.datatool) has dropped for the duration of its load, recorded
+    # in the same transaction as the drop; DatabaseManager recreates any an interrupted import
+    # left behind (restore_dropped_indexes)
+    c.execute("""CREATE TABLE IF NOT EXISTS dropped_indexes (
+        name TEXT PRIMARY KEY,
+        sql TEXT NOT NULL
+    )""")
+
+def _m012_skill_prediction_time_index(c: sqlite3.Cursor):
+    # get_skill_predictions defaults to the most recently scored model version; the index
+    # (which carries the primary key) answers that from its last entry instead of a sort
+    c.execute("CREATE INDEX IF NOT EXISTS idx_skill_predictions_scored_at ON skill_predictions(scored_at)")
+
+MIGRATIONS: List[Tuple[int, str, Callable[[sqlite3.Cursor], None]]] = [
+    (1, "base tables and streak columns", _m001_base_tables),
+    (2, "quiz_attempts covering indexes", _m002_attempt_indexes),
+    (3, "per-user and per-subject aggregate tables", _m003_user_aggregates),
+    (4, "daily accuracy rollup", _m004_daily_rollup),
+    (5, "users name index", _m005_user_name_index),
+    (6, "question catalog", _m006_question_catalog),
+    (7, "learner feature store", _m007_learner_features),
+    (8, "training jobs", _m008_training_jobs),
+    (9, "skill predictions", _m009_skill_predictions),
+    (10, "drop unused quiz_attempts indexes", _m010_drop_unused_attempt_indexes),
+    (11, "indexes dropped by a running import", _m011_dropped_indexes),
+    (12, "skill_predictions scored_at index", _m012_skill_prediction_time_index),
+]
+
+LATEST_VERSION = MIGRATIONS[-1][0]
+
+def current_version(conn: sqlite3.Connection) -> int:
+    row = conn.execute("SELECT name FROM sqlite_master WHERE type='table' AND name='schema_version'").fetchone()
+    if not row:
+        return 0
+    return conn.execute("SELECT COALESCE(MAX(version), 0) FROM schema_version").fetchone()[0]
+
+def restore_dropped_indexes(conn: sqlite3.Connection) -> List[str]:
+    """Recreates the indexes listed in dropped_indexes that are missing and clears the list;
+    conn must be inside a write transaction. Returns the names recreated."""
+    restored = []
+    for name, sql in conn.execute("SELECT name, sql FROM dropped_indexes ORDER BY name").fetchall():
+        if not conn.execute("SELECT 1 FROM sqlite_master WHERE type='index' AND name=?", (name,)).fetchone():
+            conn.execute(sql)
+            restored.append(name)
+    conn.execute("DELETE FROM dropped_indexes")
+    return restored
+
+def migrate(conn: sqlite3.Connection, target: Optional[int] = None) -> List[int]:
+    """Applies pending migrations (up to target, default all) on conn, which must already be
+    inside a write transaction. Returns the versions that were applied."""
+    c = conn.cursor()
+    c.execute("""CREATE TABLE IF NOT EXISTS schema_version (
+        version INTEGER PRIMARY KEY,
+        description TEXT,
+        applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    )""")
+    done = current_version(conn)
+    applied = []
+    for version, description, step in MIGRATIONS:
+        if version <= done or (target is not None and version > target):
+            continue
+        step(c)
+        c.execute("INSERT INTO schema_version (version, description) VALUES (?, ?)", (version, description))
+        applied.append(version)
+    return applied
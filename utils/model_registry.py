@@ -0,0 +1,224 @@
+"""On-disk registry of trained SkillPredictor artifacts.
+
+Each artifact is a directory under the registry holding the trained model in its backend's
+files (for the MLP, the Keras model and float32/float16/int8 NumPy exports of its weights,
+served without importing TensorFlow; see utils.backends), the fitted FeaturePipeline and a
+meta.json (num_classes, backend, feature schema, network hyperparameters, source data
+fingerprint, metrics). The registry's LATEST file names the artifact to serve and is
+swapped atomically. Version names are unique even for two trainings on the same data in
+the same second (tuning, online updates and job retries can all save one).
+
+    python -m utils.model_registry train      # train on the competency CSVs and publish
+
+The app never trains in-process: a missing or stale artifact queues a job with
+utils.training_jobs, whose worker process trains and then promotes the new artifact.
+"""
+
+import hashlib, json, os, threading, time, uuid
+from datetime import datetime
+from typing import Any, Dict, Optional, Tuple
+import numpy as np
+from config.settings import APP_CONFIG
+from utils.backends import get_backend
+from utils.features import FeaturePipeline
+
+DEFAULT_REGISTRY = "models/skill_predictor"
+DEFAULT_TRAIN = "utils/competency_v2_train.csv"
+DEFAULT_TEST = "utils/competency_v2_test.csv"
+
+# Bump when the artifact layout or feature encoding changes; older artifacts become stale
+ARTIFACT_FORMAT = 3
+
+_fingerprints: Dict[Tuple[str, float, int], str] = {}
+
+def file_fingerprint(path: str) -> str:
+    """SHA-256 of a file's content, memoised on (path, mtime, size)."""
+    st = os.stat(path)
+    key = (os.path.abspath(path), st.st_mtime, st.st_size)
+    if key not in _fingerprints:
+        h = hashlib.sha256()
+        with open(path, "rb") as f:
+            for block in iter(lambda: f.read(1 << 20), b""):
+                h.update(block)
+        _fingerprints[key] = h.hexdigest()
+    return _fingerprints[key]
+
+def _write_atomic(path: str, text: str):
+    tmp = f"{path}.tmp{os.getpid()}.{threading.get_ident()}"
+    with open(tmp, "w") as f:
+        f.write(text)
+    os.replace(tmp, path)
+
+def save_artifact(predictor, registry_dir: str = DEFAULT_REGISTRY, metrics: Optional[Dict[str, Any]] = None,
+                  publish: bool = True, extra_meta: Optional[Dict[str, Any]] = None) -> str:
+    """Writes a trained SkillPredictor as a new versioned artifact and (by default) makes it LATEST.
+    extra_meta adds top-level meta.json entries. Returns the artifact directory."""
+    sources = {name: file_fingerprint(path)
+               for name, path in (("train", predictor.train_data_name), ("test", predictor.test_data_name)) if path}
+    version = datetime.now().strftime("%Y%m%d-%H%M%S-") + hashlib.sha256(
+        json.dumps(sources, sort_keys=True).encode()).hexdigest()[:8] + "-" + uuid.uuid4().hex[:8]
+    path = os.path.join(registry_dir, version)
+    tmp = f"{path}.partial{os.getpid()}"
+    os.makedirs(tmp)
+    get_backend(predictor.backend).save(predictor.skill_predictor, tmp)
+    predictor.pipeline.save(os.path.join(tmp, "features.npz"))
+    meta = {
+        "format": ARTIFACT_FORMAT,
+        "version": version,
+        "created_at": datetime.now().isoformat(timespec="seconds"),
+        "num_classes": int(predictor.num_classes),
+        "backend": predictor.backend,
+        "features": predictor.pipeline.schema(),
+        "hyperparams": predictor.hyperparams,
+        "sources": sources,
+        "metrics": dict(metrics or {}, test_accuracy=predictor.test_accuracy),
+        **(extra_meta or {}),
+    }
+    with open(os.path.join(tmp, "meta.json"), "w") as f:
+        json.dump(meta, f, indent=2)
+    os.replace(tmp, path)
+    if publish:
+        publish_version(version, registry_dir)
+    return path
+
+def publish_version(version: str, registry_dir: str = DEFAULT_REGISTRY):
+    _write_atomic(os.path.join(registry_dir, "LATEST"), version)
+
+def latest_version(registry_dir: str = DEFAULT_REGISTRY) -> Optional[str]:
+    try:
+        with open(os.path.join(registry_dir, "LATEST")) as f:
+            return f.read().strip() or None
+    except FileNotFoundError:
+        return None
+
+def read_meta(path: str) -> Dict[str, Any]:
+    with open(os.path.join(path, "meta.json")) as f:
+        return json.load(f)
+
+def load_artifact(path: str, engine: str = "numpy"):
+    """Rebuilds a ready-to-predict SkillPredictor from an artifact directory.
+
+    engine="numpy" serves an MLP's exported weights with NumpyNetwork and never imports
+    TensorFlow, "numpy-float16" and "numpy-int8" serve its quantized copies; engine="keras"
+    loads the full Keras model (needed to keep training it). The hgb backend ignores engine.
+    """
+    from utils.skill_predictor import SkillPredictor
+
+    meta = read_meta(path)
+    predictor = SkillPredictor(train_data_name=None, test_data_name=None)
+    predictor.num_classes = meta["num_classes"]
+    predictor.test_accuracy = meta["metrics"].get("test_accuracy")
+    predictor.hyperparams = dict(predictor.hyperparams, **meta.get("hyperparams", {}))
+    if os.path.exists(os.path.join(path, "features.npz")):
+        predictor.pipeline = FeaturePipeline.load(os.path.join(path, "features.npz"))
+    else:
+        # artifacts from before the pipeline stored the fitted StandardScaler statistics
+        with np.load(os.path.join(path, "scaler.npz")) as saved:
+            predictor.pipeline = FeaturePipeline(predictor.num_classes, saved["mean"], saved["scale"])
+    predictor.backend = meta.get("backend", "mlp")  # artifacts from before backends were pluggable
+    predictor.skill_predictor = get_backend(predictor.backend).load(path, engine)
+    predictor.version = meta["version"]
+    return predictor
+
+def dataset_key(train_data_name: str = DEFAULT_TRAIN, test_data_name: str = DEFAULT_TEST,
+                backend: Optional[str] = None) -> str:
+    """Identifies what a training run would produce: the source data, the model backend
+    (default: the configured one) and the artifact format."""
+    payload = {"format": ARTIFACT_FORMAT, "train": file_fingerprint(train_data_name), "test": file_fingerprint(test_data_name),
+               "backend": backend or APP_CONFIG["training"]["backend"]}
+    return hashlib.sha256(json.dumps(payload, sort_keys=True).encode()).hexdigest()
+
+def is_stale(meta: Dict[str, Any], train_data_name: str = DEFAULT_TRAIN, test_data_name: str = DEFAULT_TEST) -> bool:
+    if meta.get("format") != ARTIFACT_FORMAT:
+        return True
+    current = {"train": file_fingerprint(train_data_name), "test": file_fingerprint(test_data_name)}
+    return meta.get("sources") != current
+
+def train_and_save(train_data_name: str = DEFAULT_TRAIN, test_data_name: str = DEFAULT_TEST,
+                   registry_dir: str = DEFAULT_REGISTRY, publish: bool = True, callbacks=None,
+                   hyperparams: Optional[Dict[str, Any]] = None, metrics: Optional[Dict[str, Any]] = None,
+                   backend: Optional[str] = None, last_attempt_id: Optional[int] = None) -> str:
+    """Training entry point: trains a fresh SkillPredictor and saves it (as LATEST if publish).
+
+    Without hyperparams, the LATEST artifact's are reused, so a retrain on new data keeps
+    the architecture chosen by utils.tuning. backend defaults to the configured one.
+    last_attempt_id (the newest quiz_attempts id when training started) is saved as the
+    artifact's utils.online_update checkpoint.
+    """
+    from utils.skill_predictor import SkillPredictor
+    if hyperparams is None:
+        version = latest_version(registry_dir)
+        if version is not None:
+            hyperparams = read_meta(os.path.join(registry_dir, version)).get("hyperparams")
+    predictor = SkillPredictor(train_data_name, test_data_name, hyperparams=hyperparams, backend=backend)
+    predictor.process_datasets_and_train(callbacks=callbacks)
+    online = {"online": {"last_attempt_id": last_attempt_id}} if last_attempt_id is not None else None
+    return save_artifact(predictor, registry_dir, metrics=metrics, publish=publish, extra_meta=online)
+
+# Process-wide serving state, shared by every Streamlit session
+_serving: Dict[str, Any] = {"version": None, "predictor": None, "checked_at": 0.0}
+_serving_lock = threading.Lock()
+_load_lock = threading.Lock()  # one artifact load at a time, outside _serving_lock
+
+def promote(path: str, registry_dir: str = DEFAULT_REGISTRY, engine: Optional[str] = None):
+    """Publishes an artifact as LATEST and swaps it into this process's serving slot.
+
+    The new model is loaded before taking the lock, so requests keep being served by the
+    old one until the swap and never wait on the load.
+    """
+    predictor = load_artifact(path, engine or APP_CONFIG["prediction"]["engine"])
+    version = os.path.basename(os.path.normpath(path))
+    with _serving_lock:
+        publish_version(version, registry_dir)
+        _serving.update(version=version, predictor=predictor, checked_at=time.monotonic())
+
+def _retrain_in_background(registry_dir: str):
+    # queued as a training job; duplicate requests for the same data share one job
+    from utils.training_jobs import get_training_runner
+    try:
+        get_training_runner(registry_dir=registry_dir).submit()
+    except Exception:
+        import logging
+        logging.getLogger(__name__).exception("Could not queue a skill model training job")
+
+def get_serving_predictor(registry_dir: str = DEFAULT_REGISTRY, engine: Optional[str] = None):
+    """Returns the predictor to serve, loading the LATEST artifact once per process with
+    engine (by default APP_CONFIG["prediction"]["engine"]).
+
+    Returns None when no artifact exists yet. A missing or stale artifact starts a
+    background retrain; a stale model keeps being served until the new one is published.
+    """
+    version = latest_version(registry_dir)
+    if version is None:
+        _retrain_in_background(registry_dir)
+        return None
+    with _serving_lock:
+        current = _serving["version"] == version
+        predictor = _serving["predictor"]
+    if not current:
+        # Loaded outside _serving_lock, as in promote(): one thread loads while the others
+        # keep serving the old model (they only wait when there is none yet)
+        if _load_lock.acquire(blocking=predictor is None):
+            try:
+                if _serving["version"] != version:
+                    loaded = load_artifact(os.path.join(registry_dir, version),
+                                           engine or APP_CONFIG["prediction"]["engine"])
+                    with _serving_lock:
+                        _serving.update(version=version, predictor=loaded, checked_at=0.0)
+            finally:
+                _load_lock.release()
+    with _serving_lock:
+        predictor = _serving["predictor"]
+        # the staleness check hashes the source CSVs, so do it at most once a minute
+        check = time.monotonic() - _serving["checked_at"] > 60
+        if check:
+            _serving["checked_at"] = time.monotonic()
+    if check and is_stale(read_meta(os.path.join(registry_dir, version))):
+        _retrain_in_background(registry_dir)
+    return predictor
+
+if __name__ == "__main__":
+    import sys
+    if len(sys.argv) < 2 or sys.argv[1] != "train":
+        sys.exit("usage: python -m utils.model_registry train [train_csv test_csv [registry_dir]]")
+    print("Published", train_and_save(*sys.argv[2:5]))
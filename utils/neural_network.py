@@ -12,29 +12,46 @@ import numpy as np
 
 # Do not use this class directly! Use the class DifficultyPredictor
 class FFNeuralNetwork:
-    def __init__(self, input_dim, num_classes):
-        # Building and compiling the model
-        self.model = Sequential([
-            Dense(64, activation='relu', input_shape=(input_dim,)),
-            BatchNormalization(),
-            Dropout(0.2),
-            Dense(32, activation='relu'),
-            Dense(num_classes, activation='softmax')
-            ])
+    def __init__(self, input_dim, num_classes, units=(64, 32), dropout=0.2, learning_rate=1e-3, patience=5):
+        # Building and compiling the model: the first hidden layer is batch-normalised and
+        # followed by dropout, the rest are plain ReLU layers (utils.tuning searches these settings)
+        layers = [Dense(units[0], activation='relu', input_shape=(input_dim,)),
+                  BatchNormalization(),
+                  Dropout(dropout)]
+        layers += [Dense(n, activation='relu') for n in units[1:]]
+        self.model = Sequential(layers + [Dense(num_classes, activation='softmax')])
+        self.patience = patience
         
-        self.model.compile(optimizer=Adam(),
+        self.model.compile(optimizer=Adam(learning_rate=learning_rate),
                 loss=SparseCategoricalCrossentropy(),
                 metrics=[SparseCategoricalAccuracy()]
                 )
 
     # Train the model
-    def train(self, x_train, y_train, epochs):
+    def train(self, x_train, y_train, epochs, callbacks=None):
         self.model.fit(
             x_train, y_train, epochs=epochs, 
             validation_split=0.1,
-            callbacks=[EarlyStopping(patience=5, restore_best_weights=True)]
+            callbacks=[EarlyStopping(patience=self.patience, restore_best_weights=True)] + list(callbacks or [])
         )
 
+    # Train from tf.data datasets of (features, labels) batches, e.g. utils.training_data streams
+    def train_stream(self, train_ds, val_ds, epochs, callbacks=None):
+        self.model.fit(
+            train_ds, epochs=epochs,
+            validation_data=val_ds,
+            callbacks=[EarlyStopping(patience=self.patience, restore_best_weights=True)] + list(callbacks or [])
+        )
+
+    # Continue training a trained model on new data with a fresh optimiser at a lower
+    # learning rate (e.g. utils.online_update's warm-started updates)
+    def fine_tune(self, x_train, y_train, epochs, learning_rate, callbacks=None):
+        self.model.compile(optimizer=Adam(learning_rate=learning_rate),
+                loss=SparseCategoricalCrossentropy(),
+                metrics=[SparseCategoricalAccuracy()]
+                )
+        self.train(x_train, y_train, epochs, callbacks=callbacks)
+
     # Evaluate the model
     def evaluate(self, x_test, y_test):
         test_loss, test_acc = self.model.evaluate(x_test, y_test)
@@ -42,10 +59,22 @@ class FFNeuralNetwork:
         
     # Make Predictions
     def predict(self, x_val):
-        prediction = self.model.predict(x_val)
+        prediction = self.model.predict(x_val, verbose=0)
         
         return prediction
 
+    # Save / load the trained model (Keras .keras format)
+    def save(self, path):
+        self.model.save(path)
+
+    @classmethod
+    def load(cls, path, patience=5):
+        # patience is not part of the Keras model; pass the one it was trained with
+        network = cls.__new__(cls)
+        network.model = tf.keras.models.load_model(path)
+        network.patience = patience
+        return network
+
 
 
 
@@ -0,0 +1,110 @@
+"""TensorFlow-free forward pass for the trained FFNeuralNetwork.
+
+Serving only needs Dense -> ReLU -> BatchNorm -> Dense -> ReLU -> Dense -> softmax, which is
+three matrix products. Dropout is the identity at inference and the BatchNorm (an affine
+map using its moving statistics) is folded into the weights of the Dense layer after it.
+
+quantize() gives a compact copy for serving: float16 weights, or int8 weights with one
+float32 scale per output unit. Products are still computed in float32; int8 weights are
+dequantized on the fly by scaling each layer's output columns, since
+h @ (q * s) == (h @ q) * s for a per-column scale s.
+"""
+
+import numpy as np
+
+class NumpyNetwork:
+    """Drop-in replacement for FFNeuralNetwork.predict backed by plain NumPy arrays."""
+    def __init__(self, layers, scales=None):
+        # layers: list of (weights, bias, activation) with activation in {"relu", "softmax", None};
+        # weights are float32, float16, or int8 with a per-output-unit entry in scales
+        self.scales = [None if s is None else np.asarray(s, dtype=np.float32)
+                       for s in (scales if scales is not None else [None] * len(layers))]
+        self.layers = [(np.ascontiguousarray(w, dtype=w.dtype if s is not None or w.dtype == np.float16 else np.float32),
+                        np.asarray(b, dtype=np.float32), act)
+                       for (w, b, act), s in zip(layers, self.scales)]
+
+    @property
+    def precision(self) -> str:
+        """Storage type of the weights: "float32", "float16" or "int8"."""
+        return str(self.layers[0][0].dtype)
+
+    def quantize(self, precision: str) -> "NumpyNetwork":
+        """A copy with weights stored as "float16", or as symmetric "int8" per output unit
+        (the largest |w| feeding each unit maps to 127). Biases stay float32."""
+        layers, scales = [], []
+        for (w, b, act), s in zip(self.layers, self.scales):
+            w = w.astype(np.float32) if s is None else w * s  # back to float32 first
+            if precision == "float16":
+                layers.append((w.astype(np.float16), b, act))
+                scales.append(None)
+            elif precision == "int8":
+                scale = np.abs(w).max(axis=0) / 127
+                scale[scale == 0] = 1.0
+                layers.append((np.clip(np.rint(w / scale), -127, 127).astype(np.int8), b, act))
+                scales.append(scale)
+            elif precision == "float32":
+                layers.append((w, b, act))
+                scales.append(None)
+            else:
+                raise ValueError(f"unknown weight precision {precision!r}")
+        return NumpyNetwork(layers, scales)
+
+    @classmethod
+    def from_keras(cls, model):
+        """Exports a trained Keras Sequential(Dense, BatchNorm, Dropout, Dense, ..., Dense) model."""
+        layers, pending_affine = [], None
+        for layer in model.layers:
+            kind = type(layer).__name__
+            if kind == "Dense":
+                w, b = (v.astype(np.float64) for v in layer.get_weights())
+                if pending_affine is not None:
+                    # Dense(a*h + c) = h @ (a[:, None] * W) + (c @ W + b)
+                    scale, shift = pending_affine
+                    w, b = scale[:, None] * w, shift @ w + b
+                    pending_affine = None
+                act = layer.get_config()["activation"]
+                layers.append((w, b, None if act == "linear" else act))
+            elif kind == "BatchNormalization":
+                gamma, beta, mean, var = (v.astype(np.float64) for v in layer.get_weights())
+                scale = gamma / np.sqrt(var + layer.epsilon)
+                pending_affine = (scale, beta - scale * mean)
+            elif kind in ("Dropout", "Flatten", "InputLayer"):
+                continue
+            else:
+                raise ValueError(f"cannot export layer type {kind}")
+        if pending_affine is not None:
+            raise ValueError("BatchNormalization must be followed by a Dense layer")
+        return cls(layers)
+
+    def predict(self, x_val):
+        h = np.asarray(x_val, dtype=np.float32)
+        for (w, b, act), scale in zip(self.layers, self.scales):
+            h = h @ w  # float16 and int8 weights are widened to float32 for the product
+            if scale is not None:
+                h *= scale
+            h += b
+            if act == "relu":
+                np.maximum(h, 0, out=h)
+            elif act == "softmax":
+                h -= h.max(axis=1, keepdims=True)
+                np.exp(h, out=h)
+                h /= h.sum(axis=1, keepdims=True)
+            elif act is not None:
+                raise ValueError(f"unsupported activation {act}")
+        return h
+
+    def save(self, path):
+        arrays = {}
+        for i, ((w, b, act), scale) in enumerate(zip(self.layers, self.scales)):
+            arrays[f"w{i}"], arrays[f"b{i}"] = w, b
+            arrays[f"act{i}"] = np.array(act or "")
+            if scale is not None:
+                arrays[f"s{i}"] = scale
+        np.savez(path, **arrays)
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path) as saved:
+            n = sum(1 for k in saved.files if k.startswith("w"))
+            return cls([(saved[f"w{i}"], saved[f"b{i}"], str(saved[f"act{i}"]) or None) for i in range(n)],
+                       [saved[f"s{i}"] if f"s{i}" in saved.files else None for i in range(n)])
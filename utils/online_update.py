@@ -0,0 +1,172 @@
+"""Incremental updates of the served skill model from new quiz attempts.
+
+Instead of retraining from the competency CSVs, an update warm-starts from the LATEST
+artifact and fine-tunes it on the attempts recorded after that artifact's checkpoint
+(meta.json "online": {"last_attempt_id": ...}), mixed with a replay sample of the original
+training set so the model does not forget it. The FeaturePipeline's running statistics
+absorb the new rows. The candidate is published only if it is no worse on the competency
+test set (within --tolerance) and at least as accurate on a held-out slice of the new
+attempts. Only attempts after the checkpoint are read, so an update costs in proportion to
+the new data rather than the whole history. Run it periodically, e.g. from cron:
+
+    python -m utils.online_update [--min-rows 200] [--replay 1.0] [--dry-run]
+
+quiz_attempts holds no skill label, so each attempt is labelled the way the competency CSVs
+are: skill_level is a band of the learner's past_correct_pct (utils.features.skill_level),
+level 1 for the strongest learners. Labelling with the adaptive engine's next difficulty
+instead would teach the model a different scale from the one it was trained on.
+
+A full retrain records the attempts that existed when it started as its checkpoint
+(model_registry.train_and_save(last_attempt_id=...)), so the first update after it starts
+from there instead of replaying the whole attempt history onto the new model.
+"""
+
+import argparse, os
+from typing import Any, Dict, Iterator, Optional, Tuple
+import numpy as np
+import pandas as pd
+from utils import model_registry
+from utils.database import DatabaseManager
+from utils.feature_cache import DEFAULT_CACHE_DIR, FeatureCache
+from utils.features import FeaturePipeline, skill_level
+from utils.training_data import DEFAULT_CHUNK_ROWS, LABEL
+
+# Competency-layout rows for the attempts in (after_id, last_id]. past_correct_pct continues
+# each learner's totals from learner_features backwards through the new attempts, so older
+# history is never scanned (same definition as DatabaseManager._apply_answers).
+NEW_ATTEMPTS_SQL = """
+WITH new AS (
+    SELECT a.id, a.user_id, a.subject, a.topic, a.timestamp, a.time_spent_sec, a.difficulty_level,
+           COALESCE(q.level, a.difficulty_level) question_difficulty,
+           CASE WHEN a.is_correct THEN 1 ELSE 0 END mcq_correct
+    FROM quiz_attempts a LEFT JOIN questions q ON q.id = a.question_id
+    WHERE a.id > ? AND a.id <= ? AND a.user_id IS NOT NULL AND a.difficulty_level IS NOT NULL
+), ranked AS (
+    SELECT new.*,
+           ROW_NUMBER() OVER w - 1 k,
+           COUNT(*) OVER (PARTITION BY user_id) n_new,
+           SUM(mcq_correct) OVER (PARTITION BY user_id) new_correct,
+           COALESCE(SUM(mcq_correct) OVER (w ROWS BETWEEN UNBOUNDED PRECEDING AND 1 PRECEDING), 0) correct_before
+    FROM new
+    WINDOW w AS (PARTITION BY user_id ORDER BY timestamp, id)
+)
+SELECT r.id, r.time_spent_sec, r.question_difficulty, r.mcq_correct,
+       CASE WHEN COALESCE(f.total_questions, r.n_new) - r.n_new + r.k > 0
+            THEN 1.0 * (COALESCE(f.correct_answers, r.new_correct) - r.new_correct + r.correct_before)
+                     / (COALESCE(f.total_questions, r.n_new) - r.n_new + r.k)
+            ELSE 0.0 END past_correct_pct
+FROM ranked r LEFT JOIN learner_features f ON f.user_id = r.user_id
+ORDER BY r.id
+"""
+
+def new_attempts(db: DatabaseManager, after_id: int) -> Tuple[pd.DataFrame, int]:
+    """Labelled competency rows for the attempts after after_id, and the id they run up to."""
+    db.flush()
+    with db.pool.read() as conn:
+        last_id = conn.execute("SELECT COALESCE(MAX(id), 0) FROM quiz_attempts").fetchone()[0]
+        df = pd.read_sql_query(NEW_ATTEMPTS_SQL, conn, params=(after_id, last_id))
+    df[LABEL] = skill_level(df["past_correct_pct"])
+    return df, last_id
+
+def _rescale(X: np.ndarray, source: FeaturePipeline, target: FeaturePipeline) -> np.ndarray:
+    """Rows scaled by source, re-expressed in target's scaling."""
+    X = np.asarray(X, dtype=np.float32) * source.scale + source.mean
+    X -= target.mean
+    X /= target.scale
+    return np.nan_to_num(X, copy=False, nan=0.0)
+
+def _rescaled_chunks(X: np.ndarray, y: np.ndarray, source: FeaturePipeline, target: FeaturePipeline,
+                     chunksize: int = DEFAULT_CHUNK_ROWS) -> Iterator[Tuple[np.ndarray, np.ndarray]]:
+    for lo in range(0, len(X), chunksize):
+        yield _rescale(X[lo:lo + chunksize], source, target), np.asarray(y[lo:lo + chunksize])
+
+def _accuracy(network, chunks) -> float:
+    correct = total = 0
+    for X, y in chunks:
+        correct += int((network.predict(X).argmax(axis=1) == y).sum())
+        total += len(y)
+    return correct / max(total, 1)
+
+def update(db: DatabaseManager, registry_dir: str = model_registry.DEFAULT_REGISTRY,
+           train_path: str = model_registry.DEFAULT_TRAIN, test_path: str = model_registry.DEFAULT_TEST,
+           min_rows: int = 200, replay_ratio: float = 1.0, holdout: float = 0.1, epochs: int = 10,
+           lr_scale: float = 0.1, tolerance: float = 0.005, publish: bool = True,
+           cache_dir: str = DEFAULT_CACHE_DIR, seed: int = 0) -> Dict[str, Any]:
+    """Runs one incremental update; returns what it did ("status": skipped, rejected or accepted)."""
+    version = model_registry.latest_version(registry_dir)
+    if version is None:
+        raise RuntimeError("no published skill model to update; train one first")
+    base_path = os.path.join(registry_dir, version)
+    meta = model_registry.read_meta(base_path)
+    if model_registry.is_stale(meta, train_path, test_path):
+        raise RuntimeError(f"skill model {version} is stale; it needs a full retrain, not an update")
+    if meta.get("backend", "mlp") != "mlp":
+        raise RuntimeError(f"skill model {version} uses the {meta['backend']} backend; only mlp models can be fine-tuned")
+    online = meta.get("online", {})
+    df, last_id = new_attempts(db, online.get("last_attempt_id", 0))
+    result: Dict[str, Any] = {"base_version": version, "new_rows": len(df), "last_attempt_id": last_id}
+    if len(df) < min_rows:
+        return dict(result, status="skipped")
+
+    base = model_registry.load_artifact(base_path, engine="keras")
+    k = base.num_classes
+    df[LABEL] = df[LABEL].clip(1, k)
+    rng = np.random.default_rng(seed)
+    is_heldout = rng.random(len(df)) < holdout
+    fresh, heldout = df[~is_heldout], df[is_heldout]
+
+    # Replay and test rows come from the feature cache, scaled by the pipeline fitted on the
+    # CSV, and are re-expressed in whichever pipeline is being evaluated
+    cache = FeatureCache(cache_dir)
+    csv_pipeline = cache.pipeline(train_path, k)
+    X_train, y_train = cache.matrices(train_path, csv_pipeline)
+    X_test, y_test = cache.matrices(test_path, csv_pipeline)
+
+    base_test = _accuracy(base.skill_predictor, _rescaled_chunks(X_test, y_test, csv_pipeline, base.pipeline))
+    base_new = float((base.predict(heldout) == heldout[LABEL].to_numpy()).mean()) if len(heldout) else None
+
+    # the scaler's running statistics absorb the new rows (artifacts saved before they were
+    # recorded keep their scaling)
+    pipeline = base.pipeline.partial_fit(fresh) if base.pipeline.count is not None else base.pipeline
+    n_replay = min(int(len(fresh) * replay_ratio), len(X_train))
+    replay = np.sort(rng.choice(len(X_train), n_replay, replace=False))
+    X = np.concatenate([pipeline.transform(fresh), _rescale(X_train[replay], csv_pipeline, pipeline)])
+    y = np.concatenate([fresh[LABEL].to_numpy(dtype=np.int8) - 1, y_train[replay]])
+    order = rng.permutation(len(X))  # fit() validates on the last 10%, so mix new and replay rows
+
+    network = base.skill_predictor
+    network.fine_tune(X[order], y[order], epochs, base.hyperparams["learning_rate"] * lr_scale)
+    base.pipeline = pipeline
+    cand_test = _accuracy(network, _rescaled_chunks(X_test, y_test, csv_pipeline, pipeline))
+    cand_new = float((base.predict(heldout) == heldout[LABEL].to_numpy()).mean()) if len(heldout) else None
+
+    accepted = cand_test >= base_test - tolerance and (base_new is None or cand_new >= base_new)
+    result.update(replay_rows=n_replay, heldout_rows=len(heldout), test_accuracy_before=base_test,
+                  test_accuracy_after=cand_test, new_accuracy_before=base_new, new_accuracy_after=cand_new,
+                  status="accepted" if accepted else "rejected")
+    if accepted and publish:
+        base.train_data_name, base.test_data_name = train_path, test_path
+        base.test_accuracy = cand_test
+        metrics = {key: result[key] for key in ("new_rows", "replay_rows", "new_accuracy_before", "new_accuracy_after")}
+        result["path"] = model_registry.save_artifact(base, registry_dir, metrics=metrics, extra_meta={"online": {
+            "last_attempt_id": last_id, "base_version": version, "updates": online.get("updates", 0) + 1}})
+    return result
+
+def main(argv: Optional[list] = None):
+    parser = argparse.ArgumentParser(prog="python -m utils.online_update", description=__doc__.split("\n\n")[0])
+    parser.add_argument("--db", default="data/learning_platform.db")
+    parser.add_argument("--registry", default=model_registry.DEFAULT_REGISTRY)
+    parser.add_argument("--min-rows", type=int, default=200, help="skip the update below this many new attempts")
+    parser.add_argument("--replay", type=float, default=1.0, help="replayed training rows per new attempt")
+    parser.add_argument("--epochs", type=int, default=10)
+    parser.add_argument("--tolerance", type=float, default=0.005, help="test accuracy an update may give up")
+    parser.add_argument("--dry-run", action="store_true", help="evaluate the update without publishing it")
+    args = parser.parse_args(argv)
+
+    result = update(DatabaseManager(args.db, write_behind=False), args.registry, min_rows=args.min_rows,
+                    replay_ratio=args.replay, epochs=args.epochs, tolerance=args.tolerance, publish=not args.dry_run)
+    for key, value in result.items():
+        print(f"{key}: {value}")
+
+if __name__ == "__main__":
+    main()
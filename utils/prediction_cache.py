@@ -0,0 +1,124 @@
+"""Process-wide memo of skill predictions in front of SkillPredictor.predict and
+get_prediction_summary.
+
+Re-rendering a learner's results, or coming back to the quiz page, would otherwise repeat the
+whole prediction although their attempts have not changed. Entries are keyed by the served
+model version and a fingerprint of the learner's feature rows, so changed rows or a newly
+served model simply miss. They are also dropped eagerly: a learner's entries when their data
+is written (ConnectionManager.bump_versions, which record_quiz_answer triggers after its
+commit), and every entry of the previous model the first time a lookup names a new version.
+"""
+
+import hashlib, json, threading, time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Iterable, Optional, Set, Tuple
+import pandas as pd
+from config.settings import APP_CONFIG
+
+_Key = Tuple[Hashable, str]  # (model version, feature fingerprint)
+
+def fingerprint(df: pd.DataFrame) -> str:
+    """SHA-256 of a frame's column names and row values (its index is ignored)."""
+    h = hashlib.sha256(json.dumps([str(c) for c in df.columns]).encode())
+    h.update(pd.util.hash_pandas_object(df, index=False).to_numpy().tobytes())
+    return h.hexdigest()
+
+class PredictionCache:
+    """Thread-safe LRU of computed predictions, bounded by entry count and a TTL.
+
+    Values are shared between callers, so treat them as read-only.
+    """
+    def __init__(self, max_entries: int = 4096, ttl_seconds: float = 900.0, clock: Callable[[], float] = time.monotonic):
+        self.max_entries = max_entries
+        self.ttl = ttl_seconds
+        self.clock = clock
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+        self._model_version: Optional[Hashable] = None
+        self._entries: "OrderedDict[_Key, Tuple[Any, float, Set[int]]]" = OrderedDict()  # value, expiry, users
+        self._by_user: Dict[int, Set[_Key]] = {}
+        self._lock = threading.Lock()
+
+    def get_or_compute(self, uid: int, df: pd.DataFrame, model_version: Hashable, compute: Callable[[], Any]) -> Any:
+        """compute()'s result for this learner's feature rows under model_version, from the
+        cache when it holds a live entry. Concurrent misses may both compute."""
+        key = (model_version, fingerprint(df))
+        with self._lock:
+            if model_version != self._model_version:
+                self._drop_all()  # a new model is being served; the old one's entries are dead
+                self._model_version = model_version
+            entry = self._entries.get(key)
+            if entry is not None and entry[1] <= self.clock():
+                self._remove(key)
+                self.expirations += 1
+                entry = None
+            if entry is not None:
+                self._entries.move_to_end(key)
+                entry[2].add(uid)
+                self._by_user.setdefault(uid, set()).add(key)
+                self.hits += 1
+                return entry[0]
+            self.misses += 1
+        value = compute()
+        with self._lock:
+            if model_version == self._model_version:  # not superseded while computing
+                if key in self._entries:
+                    self._remove(key)
+                self._entries[key] = (value, self.clock() + self.ttl, {uid})
+                self._by_user.setdefault(uid, set()).add(key)
+                while len(self._entries) > self.max_entries:
+                    self._remove(next(iter(self._entries)))
+                    self.evictions += 1
+        return value
+
+    def invalidate_users(self, uids: Iterable[int]):
+        """Drops every entry looked up for these learners; registered with
+        ConnectionManager.version_listeners by get_prediction_cache."""
+        with self._lock:
+            for uid in uids:
+                for key in list(self._by_user.get(uid, ())):
+                    if key in self._entries:
+                        self._remove(key)
+                        self.invalidations += 1
+
+    def clear(self):
+        with self._lock:
+            self._drop_all()
+
+    def stats(self) -> Dict[str, float]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {"hits": self.hits, "misses": self.misses, "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+                    "evictions": self.evictions, "expirations": self.expirations,
+                    "invalidations": self.invalidations, "entries": len(self._entries)}
+
+    def _remove(self, key: _Key):
+        _, _, uids = self._entries.pop(key)
+        for uid in uids:
+            keys = self._by_user.get(uid)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._by_user[uid]
+
+    def _drop_all(self):
+        self.invalidations += len(self._entries)
+        self._entries.clear()
+        self._by_user.clear()
+
+_cache: Optional[PredictionCache] = None
+_cache_lock = threading.Lock()
+
+def get_prediction_cache(pool) -> PredictionCache:
+    """Returns the process-wide cache, invalidated by writes through pool (a ConnectionManager)."""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            cfg = APP_CONFIG["prediction"]
+            _cache = PredictionCache(max_entries=cfg["cache_max_entries"], ttl_seconds=cfg["cache_ttl_seconds"])
+        if _cache.invalidate_users not in pool.version_listeners:
+            pool.version_listeners.append(_cache.invalidate_users)
+        return _cache
@@ -0,0 +1,165 @@
+"""Process-wide micro-batching in front of SkillPredictor.predict.
+
+Every Streamlit session that finishes a quiz asks for a prediction on a handful of rows.
+With the Keras engine the model's cost is dominated by the fixed overhead of each forward
+pass, so requests are queued and a single background thread serves them together. A
+request that finds the queue empty is served at once; when others are already waiting, the
+batch closes when it holds max_batch_rows rows or when its oldest request has waited
+max_wait_ms. Each caller gets a Future resolved with the predictions for its own rows.
+
+The NumPy engines cost far less per call than the hand-off to the worker thread, so
+predict_levels() calls them directly and only queues engines listed in
+APP_CONFIG["prediction"]["batch_engines"] (benchmarks/prediction_service.py compares both).
+"""
+
+import atexit, logging, queue, threading, time
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, List, Optional, Tuple
+import numpy as np
+from config.settings import APP_CONFIG
+
+logger = logging.getLogger(__name__)
+
+_Request = Tuple[Any, Future]  # (DataFrame of competency rows, future)
+
+class PredictionService:
+    """Groups concurrent predict() calls into one batched forward pass per window.
+
+    `source` returns the predictor to use (called once per batch, so a newly published
+    model is picked up between batches); when it returns None the batch resolves to None.
+    When the queue is full, submit() blocks, pushing back on the callers.
+    """
+    def __init__(self, source:Callable[[], Any], max_batch_rows:int=4096, max_wait_ms:int=5, max_queue:int=1000):
+        self.source = source
+        self.max_batch_rows = max_batch_rows
+        self.max_wait = max_wait_ms/1000
+        self.requests = 0
+        self.served = 0
+        self.batches = 0
+        self.rows = 0
+        self.largest_batch = 0
+        self.max_queue_depth = 0
+        self._queue: "queue.Queue[Optional[_Request]]" = queue.Queue(maxsize=max_queue)
+        self._lock = threading.Lock()
+        self._thread = threading.Thread(target=self._run, name="prediction-service", daemon=True)
+        self._thread.start()
+
+    def submit(self, df) -> Future:
+        """Queues df for prediction; the Future resolves to an array of levels 1..num_classes."""
+        future: Future = Future()
+        if len(df) == 0:
+            future.set_result(np.empty(0, dtype=np.int64))
+            return future
+        self._queue.put((df, future))
+        depth = self._queue.qsize()
+        with self._lock:
+            self.requests += 1
+            self.max_queue_depth = max(self.max_queue_depth, depth)
+        return future
+
+    def predict(self, df, timeout:Optional[float]=None):
+        return self.submit(df).result(timeout)
+
+    def close(self):
+        """Serves everything still queued and stops the worker thread."""
+        if self._thread.is_alive():
+            self._queue.put(None)
+            self._thread.join()
+
+    def stats(self) -> Dict[str, float]:
+        with self._lock:
+            return {"queue_depth":self._queue.qsize(), "max_queue_depth":self.max_queue_depth,
+                    "requests":self.requests, "served":self.served, "batches":self.batches, "rows":self.rows,
+                    "largest_batch":self.largest_batch,
+                    "mean_batch_requests":round(self.served/self.batches, 2) if self.batches else 0.0,
+                    "mean_batch_rows":round(self.rows/self.batches, 2) if self.batches else 0.0}
+
+    def _run(self):
+        carry: Optional[_Request] = None
+        while True:
+            item = carry if carry is not None else self._queue.get()
+            carry = None
+            if item is None:
+                return
+            batch, rows = [item], len(item[0])
+            deadline = time.monotonic() + self.max_wait
+            stop = False
+            # nobody else is waiting: serve now instead of holding the request for max_wait
+            while rows < self.max_batch_rows and not (len(batch) == 1 and self._queue.empty()):
+                remaining = deadline - time.monotonic()
+                try:
+                    item = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if item is None:
+                    stop = True
+                    break
+                if rows + len(item[0]) > self.max_batch_rows:
+                    carry = item  # starts the next batch
+                    break
+                batch.append(item)
+                rows += len(item[0])
+            self._serve(batch, rows)
+            if stop:
+                return
+
+    def _serve(self, batch:List[_Request], rows:int):
+        live = [(df, future) for df, future in batch if future.set_running_or_notify_cancel()]
+        try:
+            predictor = self.source() if live else None
+            if predictor is None:
+                for _, future in live:
+                    future.set_result(None)
+            else:
+                X = np.empty((sum(len(df) for df, _ in live), predictor.pipeline.n_features), dtype=np.float32)
+                offsets = np.cumsum([0] + [len(df) for df, _ in live])
+                encoded = []
+                for (df, future), start, end in zip(live, offsets, offsets[1:]):
+                    try:
+                        predictor.pipeline.transform(df, out=X[start:end])
+                        encoded.append((future, start, end))
+                    except Exception as e:
+                        future.set_exception(e)  # a malformed frame only fails its own caller
+                if len(encoded) < len(live):
+                    # leave out the unfilled rows of frames that failed to encode
+                    X = np.concatenate([X[start:end] for _, start, end in encoded])
+                    offsets = np.cumsum([0] + [end - start for _, start, end in encoded])
+                    encoded = [(future, start, end) for (future, _, _), start, end in zip(encoded, offsets, offsets[1:])]
+                if encoded:
+                    levels = predictor.skill_predictor.predict(X).argmax(axis=1) + 1
+                    for future, start, end in encoded:
+                        future.set_result(levels[start:end])
+        except Exception as e:
+            # fail this batch's callers rather than the worker, which keeps serving
+            logger.exception("Failed to serve a batch of %d skill predictions", len(live))
+            for _, future in live:
+                if not future.done():
+                    future.set_exception(e)
+        with self._lock:
+            self.batches += 1
+            self.served += len(batch)
+            self.rows += rows
+            self.largest_batch = max(self.largest_batch, len(batch))
+
+_service: Optional[PredictionService] = None
+_service_lock = threading.Lock()
+
+def get_prediction_service() -> PredictionService:
+    """Returns the process-wide service over the model registry's LATEST artifact."""
+    global _service
+    with _service_lock:
+        if _service is None:
+            from utils.model_registry import get_serving_predictor
+            cfg = APP_CONFIG["prediction"]
+            _service = PredictionService(get_serving_predictor, max_batch_rows=cfg["max_batch_rows"],
+                                         max_wait_ms=cfg["max_wait_ms"], max_queue=cfg["max_queue"])
+            atexit.register(_service.close)
+        return _service
+
+def predict_levels(predictor, df, timeout:Optional[float]=None):
+    """Skill levels for df from the served predictor: through the shared batching service when
+    the serving engine is in APP_CONFIG["prediction"]["batch_engines"], else on this thread."""
+    cfg = APP_CONFIG["prediction"]
+    if cfg["engine"] in cfg["batch_engines"]:
+        return get_prediction_service().predict(df, timeout)
+    return predictor.predict(df)
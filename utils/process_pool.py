@@ -0,0 +1,21 @@
+"""Shared set-up for the spawned process pools of utils.tuning and utils.batch_scoring."""
+
+import os
+from contextlib import contextmanager
+
+@contextmanager
+def thread_limits(threads: int):
+    """Caps the BLAS/TensorFlow threads of process pools started inside the block: spawned
+    workers inherit the environment at start-up, before NumPy or TensorFlow load."""
+    names = ("OMP_NUM_THREADS", "OPENBLAS_NUM_THREADS", "MKL_NUM_THREADS",
+             "TF_NUM_INTRAOP_THREADS", "TF_NUM_INTEROP_THREADS", "TF_CPP_MIN_LOG_LEVEL")
+    saved = {name: os.environ.get(name) for name in names}
+    os.environ.update({name: str(threads) for name in names[:4]}, TF_NUM_INTEROP_THREADS="1", TF_CPP_MIN_LOG_LEVEL="2")
+    try:
+        yield
+    finally:
+        for name, value in saved.items():
+            if value is None:
+                os.environ.pop(name, None)
+            else:
+                os.environ[name] = value
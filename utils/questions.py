@@ -0,0 +1,45 @@
+"""Question catalog helpers.
+
+Questions are stored once in the `questions` table under an id derived from their content,
+so recording an attempt never needs a lookup round trip to find (or allocate) the id.
+"""
+
+import hashlib, json
+from typing import List, NamedTuple, Optional
+
+def question_content_id(subject: Optional[str], topic: Optional[str], level: Optional[int],
+                        question: Optional[str], options: Optional[List[str]],
+                        correct_answer: Optional[str], explanation: Optional[str]) -> int:
+    """Signed 64-bit id from a SHA-256 of the question's content (fits SQLite INTEGER)."""
+    payload = json.dumps([subject, topic, level, question, options, correct_answer, explanation],
+                         ensure_ascii=False, separators=(",", ":"))
+    digest = hashlib.sha256(payload.encode("utf-8")).digest()
+    return int.from_bytes(digest[:8], "big", signed=True)
+
+class CatalogEntry(NamedTuple):
+    id: int
+    subject: Optional[str]
+    topic: Optional[str]
+    level: Optional[int]
+    question: Optional[str]
+    options: Optional[str]          # JSON-encoded list
+    correct_answer: Optional[str]
+    explanation: Optional[str]
+
+def catalog_entry(subject, topic, level, question, options=None, correct_answer=None, explanation=None) -> CatalogEntry:
+    qid = question_content_id(subject, topic, level, question, options, correct_answer, explanation)
+    return CatalogEntry(qid, subject, topic, level, question,
+                        json.dumps(options, ensure_ascii=False) if options is not None else None,
+                        correct_answer, explanation)
+
+class AnswerRow(NamedTuple):
+    """One recorded answer as it travels from record_quiz_answer to the database."""
+    uid: int
+    subject: str
+    topic: str
+    user_answer: str
+    is_correct: bool
+    level: int
+    timestamp: str
+    question: CatalogEntry
+    time_spent_sec: Optional[float] = None
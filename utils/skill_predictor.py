@@ -1,85 +1,104 @@
+import math
+from typing import Optional
 import pandas as pd
 import numpy as np
-from sklearn.preprocessing import StandardScaler 
-from sklearn.metrics import classification_report, confusion_matrix
-from utils.neural_network import FFNeuralNetwork
+from utils.features import FeaturePipeline, thermometer_encode
+from utils.training_data import (DEFAULT_CHUNK_ROWS, MatrixStream, TrainingStream, classification_summary,
+                                 read_chunks, scan_labels)
+from utils.feature_cache import DEFAULT_CACHE_DIR, FeatureCache
+from utils.backends import get_backend
+from config.settings import APP_CONFIG
+# TensorFlow (via utils.neural_network) is only imported when training, so serving a
+# registry artifact with the NumPy engine never loads it
+
+# thermometer_encode moved to utils.features; it is re-exported for code that imported it
+# from here when it was defined in this module
+__all__ = ["DEFAULT_HYPERPARAMS", "SkillPredictor", "get_prediction_summary", "sample_main", "thermometer_encode"]
+
+# Network settings used unless a SkillPredictor is given others (see utils.tuning);
+# JSON-friendly, since they are stored in the model registry's meta.json
+DEFAULT_HYPERPARAMS = {"units": [64, 32], "dropout": 0.2, "learning_rate": 1e-3, "patience": 5}
 
 """Since the resulting matrices are huge, use this to get the full representation instead of seeing a ...
     np.set_printoptions(threshold=np.inf)
 """
 
-def thermometer_encode(values, num_levels):
-    thermometer = np.zeros((len(values), num_levels), dtype=np.float32)
-    for i, v in enumerate(values):
-        thermometer[i, :v+1] = 1.0  
-    return thermometer
-
-# Scaler object to scale input features for faster training
-scaler = StandardScaler()
-
 class SkillPredictor:
     """Note: SkillPredictor is meant to be process and trained ONCE: as a result if a new dataset is used, make a new object.
         However, predict() can be called multiple times.
     """
-    def __init__(self, train_data_name="utils/competency_v2_train.csv", test_data_name="utils/competency_v2_test.csv"):
-        """ Creates a SkillPredictor object 
-            1. Initialises the train and test data set (make sure to get the location right!)
-            2. Processes them into input feature vectors of R^d, where d is the number of features
+    def __init__(self, train_data_name="utils/competency_v2_train.csv", test_data_name="utils/competency_v2_test.csv",
+                 chunksize=DEFAULT_CHUNK_ROWS, cache_dir=DEFAULT_CACHE_DIR, hyperparams=None, backend=None):
+        """ Creates a SkillPredictor object
+            1. Records the train and test data set locations (make sure to get the location right!)
+            2. The datasets are streamed from disk in chunks of `chunksize` rows when training,
+               so they are never loaded whole (see utils/training_data.py)
+            3. Their preprocessed matrices are cached under `cache_dir` (None disables the cache)
+            4. `hyperparams` overrides entries of DEFAULT_HYPERPARAMS for the network
+            5. `backend` names the kind of model to train (see utils/backends.py); defaults to
+               APP_CONFIG["training"]["backend"]
         """
-        # Initialises training and testing datasets
-        self.train_df = pd.read_csv(train_data_name)
-        self.test_df = pd.read_csv(test_data_name)
+        # Training and testing datasets
+        self.train_data_name = train_data_name
+        self.test_data_name = test_data_name
+        self.chunksize = chunksize
+        self.cache_dir = cache_dir
+        self.hyperparams = dict(DEFAULT_HYPERPARAMS, **(hyperparams or {}))
+        self.backend = get_backend(backend or APP_CONFIG["training"]["backend"]).name
         self.skill_predictor = None # Uninitialised
         self.num_classes = 0 # Default
+        # Encodes and scales input features; fitted on the training set and saved with the model
+        self.pipeline = None
+        self.test_accuracy = None
+        self.version = None # Artifact version when loaded from the model registry
         
-    def process_datasets_and_train(self):
-        # Shift labels by -1 for training with thermometer encoding:
+    def process_datasets_and_train(self, callbacks=None):
+        """Fits the feature pipeline and trains the network; callbacks are extra Keras callbacks
+        (e.g. progress reporting) passed to fit()."""
+        # Labels are shifted by -1 for training with thermometer encoding (done by the streams):
         # Why: Question diffculty and skill are between 1 and x, but to be used in the nn they are required to be between 0 and x-1
-        y_train = self.train_df['skill_level'].values.astype(int) - 1
-        y_test = self.test_df['skill_level'].values.astype(int) - 1
-        self.num_classes = max(y_train.max(), y_test.max()) + 1
-
-        train_qdiff = self.train_df['question_difficulty'].values.astype(int) - 1
-        test_qdiff = self.test_df['question_difficulty'].values.astype(int) - 1
-        # This must match num_classes
-        num_qdiff_levels = self.num_classes
-        
-        # Perofrming thermometer encoding
-        train_qdiff_thermo = thermometer_encode(train_qdiff, num_qdiff_levels)
-        test_qdiff_thermo = thermometer_encode(test_qdiff, num_qdiff_levels)
-        
-        # Other features that do not require hermometer encoding
-        feature_cols_no_qdiff = [
-            'time_spent_sec',
-            'mcq_correct',
-            'past_correct_pct'
-        ]
-
-        # Building feature matrices
-        X_train = np.concatenate([
-            self.train_df[feature_cols_no_qdiff].values.astype(np.float32),
-            train_qdiff_thermo
-        ], axis=1)
-
-        X_test = np.concatenate([
-            self.test_df[feature_cols_no_qdiff].values.astype(np.float32),
-            test_qdiff_thermo
-        ], axis=1)
-
-        # Scale features
-        X_train_scaled = scaler.fit_transform(X_train)
-        X_test_scaled = scaler.transform(X_test)
-
-        input_dim = X_train.shape[1]
+
+        # With a feature cache, CSVs that were already prepared are not parsed again: their
+        # label scan, fitted pipeline and scaled matrices are reused from .npy memory maps
+        cache = FeatureCache(self.cache_dir, self.chunksize) if self.cache_dir else None
+        train_rows, train_top = cache.labels(self.train_data_name) if cache else scan_labels(self.train_data_name, self.chunksize)
+        test_rows, test_top = cache.labels(self.test_data_name) if cache else scan_labels(self.test_data_name, self.chunksize)
+        self.num_classes = int(max(train_top, test_top))
+
+        # Question difficulty levels must match num_classes
+        if cache:
+            self.pipeline = cache.pipeline(self.train_data_name, self.num_classes)
+        else:
+            self.pipeline = FeaturePipeline(num_levels=self.num_classes).fit_chunks(
+                read_chunks(self.train_data_name, self.chunksize))
+
+        # fit(validation_split=0.1) held out the last 10% of the training rows; keep that split
+        split = math.ceil(train_rows * 0.9)
+        if cache:
+            X_train, y_train = cache.matrices(self.train_data_name, self.pipeline)
+            train = MatrixStream(X_train, y_train, 0, split, self.chunksize, shuffle=True)
+            validation = MatrixStream(X_train, y_train, split, train_rows, self.chunksize)
+            test = MatrixStream(*cache.matrices(self.test_data_name, self.pipeline), chunksize=self.chunksize)
+        else:
+            train = TrainingStream(self.train_data_name, self.pipeline, 0, split, self.chunksize, shuffle=True)
+            validation = TrainingStream(self.train_data_name, self.pipeline, split, train_rows, self.chunksize)
+            test = TrainingStream(self.test_data_name, self.pipeline, 0, test_rows, self.chunksize)
+
+        input_dim = self.pipeline.n_features
 
         # Train and return self.skill_predictor
-        self.skill_predictor = FFNeuralNetwork(input_dim=input_dim, num_classes=self.num_classes)
-        self.skill_predictor.train(X_train_scaled, y_train, epochs=50)
-        
-        # Return training statistics
-        y_pred = self.skill_predictor.predict(X_test_scaled).argmax(axis=1)
-        print(classification_report(y_test + 1, y_pred + 1))  # shift back to 1–5
-        print(confusion_matrix(y_test + 1, y_pred + 1))
+        self.skill_predictor = get_backend(self.backend).train(input_dim, self.num_classes, train, validation,
+                                                               callbacks=callbacks, hyperparams=self.hyperparams)
+
+        # Return training statistics, accumulated chunk by chunk
+        confusion = np.zeros((self.num_classes, self.num_classes), dtype=np.int64)
+        for X_test_scaled, y_test in test:
+            y_pred = self.skill_predictor.predict(X_test_scaled).argmax(axis=1)
+            confusion += np.bincount(y_test.astype(np.int64) * self.num_classes + y_pred,
+                                     minlength=self.num_classes ** 2).reshape(confusion.shape)
+        self.test_accuracy = float(np.trace(confusion) / max(confusion.sum(), 1))
+        print(classification_summary(confusion))  # levels shown 1–5
+        print(confusion)
         
         return self.skill_predictor
 
@@ -91,26 +110,7 @@ class SkillPredictor:
         Predict skill levels from a raw DataFrame (with columns like the training data).
         Returns predicted skill levels in the range between 1 to num_classes.
         """
-        # Extract and thermometer encode question difficulty
-        num_qdiff_levels = self.num_classes
-        qdiff = raw_df['question_difficulty'].values.astype(int) - 1
-        qdiff_thermo = thermometer_encode(qdiff, num_qdiff_levels)
-
-        # Other features (excluding question difficulty)
-        feature_cols_no_qdiff = [
-            'time_spent_sec',
-            'mcq_correct',
-            'past_correct_pct'
-        ]
-        
-        # creating input feature vector 
-        X = np.concatenate([
-            raw_df[feature_cols_no_qdiff].values.astype(np.float32),
-            qdiff_thermo
-        ], axis=1)
-
-        # Scale features
-        X_scaled = scaler.transform(X)
+        X_scaled = self.pipeline.transform(raw_df)
 
         # Predict and shift output back to 1–num_classes
         predictions = self.skill_predictor.predict(X_scaled)
@@ -134,7 +134,9 @@ def sample_main():
     
 ## sample_main()
 
-def get_prediction_summary(predicted_levels: np.ndarray, confidence: int = 97) -> str:
+def get_prediction_summary(predicted_levels: np.ndarray, confidence: Optional[float] = None) -> str:
+    """confidence is the model's measured accuracy in percent (e.g. the served artifact's
+    test accuracy); without it the summary says the accuracy is unknown."""
 
     predicted_level = int(np.round(np.mean(predicted_levels)))  
 
@@ -146,13 +148,18 @@ def get_prediction_summary(predicted_levels: np.ndarray, confidence: int = 97) -
         5: "Level 5 means you're operating at an advanced level—excellent work!"
     }
 
+    if confidence is None:
+        accuracy = "The AI model's accuracy on held-out data has not been measured yet."
+    else:
+        accuracy = f"Based on how the AI model performed on similar data, it was able to correctly predict the skill level **{confidence:.0f}%** of the time."
+
     return f"""
 🔍 **Your Predicted Skill Level Summary:**
 
 ✅ **Predicted Skill Level:** Level {predicted_level}
 
 📈 **How confident are we?**
-Based on how the AI model performed on similar data, it was able to correctly predict the skill level **{confidence}%** of the time.
+{accuracy}
 
 🧠 **What does Level {predicted_level} mean?**
 {explanation.get(predicted_level, "No explanation available.")}
@@ -0,0 +1,162 @@
+"""Out-of-core training data for the skill predictor.
+
+Competency CSVs are read in fixed-size chunks with an explicit compact dtype schema, so
+neither the raw rows nor the scaled feature matrix of a whole dataset is ever held in
+memory: the label range is found in a first pass over the skill_level column, the
+FeaturePipeline is fitted from running statistics in a second, and every training epoch
+streams scaled chunks from disk into a tf.data pipeline. Peak memory is set by the chunk
+size, not the dataset size (see benchmarks/training_data.py). utils.feature_cache keeps
+the scaled matrices of unchanged CSVs as .npy files, streamed with MatrixStream.
+"""
+
+import csv, math
+from collections import deque
+from itertools import islice
+from typing import Iterator, Optional, Sequence, Tuple
+import numpy as np
+import pandas as pd
+from utils.features import NUMERIC_FEATURES, THERMOMETER_FEATURE
+
+LABEL = "skill_level"
+
+# Levels fit in int8; numeric features are float32 like the matrix they end up in, so a
+# missing value reads as NaN and is imputed by the pipeline
+COMPETENCY_DTYPES = {
+    "user_id": "int32",
+    "question_id": "int32",
+    "time_spent_sec": "float32",
+    "question_difficulty": "int8",
+    "mcq_correct": "float32",
+    "past_correct_pct": "float32",
+    "skill_level": "int8",
+}
+TRAINING_COLUMNS = NUMERIC_FEATURES + [THERMOMETER_FEATURE, LABEL]
+
+DEFAULT_CHUNK_ROWS = 65536
+# Keras' default, which fit() used when it was given whole arrays
+BATCH_SIZE = 32
+# Batches mixed across chunk boundaries by tf.data's shuffle buffer
+SHUFFLE_BATCHES = 64
+
+def read_chunks(path: str, chunksize: int = DEFAULT_CHUNK_ROWS, columns: Sequence[str] = TRAINING_COLUMNS,
+                start: int = 0, stop: Optional[int] = None) -> Iterator[pd.DataFrame]:
+    """Yields data rows start..stop (0-based, header excluded) of a competency CSV in chunks."""
+    if stop is not None and stop <= start:
+        return
+    with open(path, newline="") as f:
+        names = next(csv.reader([next(f)]))
+        # skip to the first row without tokenizing what comes before it (competency rows are
+        # unquoted, one per line); pandas' skiprows would build a set of every skipped index
+        deque(islice(f, start), maxlen=0)
+        reader = pd.read_csv(f, header=None, names=names, usecols=list(columns),
+                             dtype={c: COMPETENCY_DTYPES[c] for c in columns}, chunksize=chunksize,
+                             nrows=None if stop is None else stop - start)
+        with reader:
+            yield from reader
+
+def scan_labels(path: str, chunksize: int = DEFAULT_CHUNK_ROWS) -> Tuple[int, int]:
+    """Returns (rows, highest skill level) of a competency CSV, reading only the label column."""
+    rows, top = 0, 0
+    for df in read_chunks(path, chunksize, columns=[LABEL]):
+        if len(df):
+            rows += len(df)
+            top = max(top, int(df[LABEL].max()))
+    return rows, top
+
+class _ChunkStream:
+    """Scaled (X, y) chunks of a training set, produced afresh on every pass.
+
+    y holds 0-based skill levels. With shuffle=True the rows of each chunk are permuted
+    with a fresh permutation every pass. Subclasses implement _chunks().
+    """
+    n_features: int
+    chunksize: int
+    shuffle: bool
+
+    def __len__(self):
+        raise NotImplementedError
+
+    def _chunks(self) -> Iterator[Tuple[np.ndarray, np.ndarray]]:
+        raise NotImplementedError
+
+    def __iter__(self) -> Iterator[Tuple[np.ndarray, np.ndarray]]:
+        for X, y in self._chunks():
+            if self.shuffle:
+                order = self._rng.permutation(len(X))
+                X, y = X[order], y[order]
+            yield X, y
+
+    def num_batches(self, batch_size: int = BATCH_SIZE) -> int:
+        # batches never straddle chunks, so every chunk may end with a short one
+        full, rest = divmod(len(self), self.chunksize)
+        return full * math.ceil(self.chunksize / batch_size) + math.ceil(rest / batch_size)
+
+    def dataset(self, batch_size: int = BATCH_SIZE):
+        """A tf.data.Dataset of (features, labels) batches streamed from this range."""
+        import tensorflow as tf
+        spec = (tf.TensorSpec((None, self.n_features), tf.float32), tf.TensorSpec((None,), tf.int8))
+        ds = tf.data.Dataset.from_generator(lambda: iter(self), output_signature=spec)
+        ds = ds.flat_map(lambda X, y: tf.data.Dataset.from_tensor_slices((X, y)).batch(batch_size))
+        if self.shuffle:
+            ds = ds.shuffle(SHUFFLE_BATCHES)
+        # a known length gives Keras its progress bar and epoch boundaries up front
+        ds = ds.apply(tf.data.experimental.assert_cardinality(self.num_batches(batch_size)))
+        return ds.prefetch(tf.data.AUTOTUNE)
+
+class TrainingStream(_ChunkStream):
+    """Chunks of a row range of a competency CSV, parsed and scaled on every pass."""
+    def __init__(self, path: str, pipeline, start: int = 0, stop: Optional[int] = None,
+                 chunksize: int = DEFAULT_CHUNK_ROWS, shuffle: bool = False, seed: int = 0):
+        self.path = path
+        self.pipeline = pipeline
+        self.n_features = pipeline.n_features
+        self.start = start
+        self.stop = stop if stop is not None else start + scan_labels(path, chunksize)[0]
+        self.chunksize = chunksize
+        self.shuffle = shuffle
+        self._rng = np.random.default_rng(seed)
+
+    def __len__(self):
+        return max(self.stop - self.start, 0)
+
+    def _chunks(self):
+        for df in read_chunks(self.path, self.chunksize, start=self.start, stop=self.stop):
+            yield self.pipeline.transform(df), df[LABEL].to_numpy(dtype=np.int8) - 1
+
+class MatrixStream(_ChunkStream):
+    """Chunks of a row range of already scaled X/y arrays, typically memory-mapped .npy files
+    from utils.feature_cache. Shuffling also visits the chunks in a random order."""
+    def __init__(self, X: np.ndarray, y: np.ndarray, start: int = 0, stop: Optional[int] = None,
+                 chunksize: int = DEFAULT_CHUNK_ROWS, shuffle: bool = False, seed: int = 0):
+        self.X, self.y = X, y
+        self.n_features = X.shape[1]
+        self.start = start
+        self.stop = len(X) if stop is None else stop
+        self.chunksize = chunksize
+        self.shuffle = shuffle
+        self._rng = np.random.default_rng(seed)
+
+    def __len__(self):
+        return max(self.stop - self.start, 0)
+
+    def _chunks(self):
+        starts = np.arange(self.start, self.stop, self.chunksize)
+        if self.shuffle:
+            self._rng.shuffle(starts)
+        for lo in starts:
+            hi = min(lo + self.chunksize, self.stop)
+            # views of the mapping: the pages are read through the shared OS page cache
+            yield self.X[lo:hi], self.y[lo:hi]
+
+def classification_summary(confusion: np.ndarray) -> str:
+    """Per-level precision/recall/F1 table from a confusion matrix (rows = true 1-based levels)."""
+    lines = [f"{'level':>6} {'precision':>10} {'recall':>8} {'f1':>8} {'support':>9}"]
+    with np.errstate(invalid="ignore", divide="ignore"):
+        tp = np.diag(confusion).astype(np.float64)
+        precision = np.nan_to_num(tp / confusion.sum(axis=0))
+        recall = np.nan_to_num(tp / confusion.sum(axis=1))
+        f1 = np.nan_to_num(2 * precision * recall / (precision + recall))
+    for level, (p, r, f, n) in enumerate(zip(precision, recall, f1, confusion.sum(axis=1)), start=1):
+        lines.append(f"{level:>6} {p:10.2f} {r:8.2f} {f:8.2f} {n:9d}")
+    lines.append(f"{'accuracy':>6} {np.trace(confusion) / max(confusion.sum(), 1):>26.2f} {confusion.sum():9d}")
+    return "\n".join(lines)
@@ -0,0 +1,222 @@
+"""Background training of the skill model.
+
+Jobs are rows in the training_jobs table and run in a separate worker process, so a
+Streamlit server never trains on its own threads. The worker records its progress after
+every epoch; when it finishes, the submitting process promotes the new artifact, which
+publishes it as LATEST and hot-swaps the served model. Submitting while a job for the
+same dataset is queued or running returns that job instead of starting another, and after
+a job fails, resubmissions for the same dataset return the failed job until a backoff
+(doubling with each consecutive failure) has passed, so a failure that repeats does not
+start a new training run every time a quiz finishes.
+
+    python -m utils.training_jobs submit [train_csv test_csv]   # queue a job and wait for it
+    python -m utils.training_jobs status [job_id]
+"""
+
+import atexit, functools, json, logging, multiprocessing, os, threading, time
+from concurrent.futures import Future, ProcessPoolExecutor
+from typing import Any, Dict, List, Optional, Tuple
+from config.settings import APP_CONFIG
+from utils import model_registry
+from utils.database import DatabaseManager
+
+logger = logging.getLogger(__name__)
+
+ACTIVE_STATES = ("queued", "running")
+
+def _pid_alive(pid: Optional[int]) -> bool:
+    if not pid:
+        return False
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+def _progress_callback(db: DatabaseManager, job_id: int):
+    # Keras callback recording the epoch count and per-epoch metrics on the job row
+    import tensorflow as tf
+
+    class Progress(tf.keras.callbacks.Callback):
+        def on_train_begin(self, logs=None):
+            with db.pool.write() as conn:
+                conn.execute("UPDATE training_jobs SET epochs=? WHERE id=?", (self.params.get("epochs"), job_id))
+
+        def on_epoch_end(self, epoch, logs=None):
+            progress = {k: round(float(v), 4) for k, v in (logs or {}).items()}
+            with db.pool.write() as conn:
+                conn.execute("UPDATE training_jobs SET epoch=?, progress=? WHERE id=?",
+                             (epoch + 1, json.dumps(progress), job_id))
+    return Progress()
+
+def _run_job(db_path: str, job_id: int, train_path: str, test_path: str, registry_dir: str,
+             backend: str) -> Tuple[str, Dict[str, Any]]:
+    """Worker process entry point: trains, saves an unpublished artifact and reports progress
+    (per epoch for the mlp backend; the scikit-learn backends never import TensorFlow)."""
+    db = DatabaseManager(db_path, write_behind=False)
+    callbacks = [_progress_callback(db, job_id)] if backend == "mlp" else None
+
+    with db.pool.write() as conn:
+        conn.execute("UPDATE training_jobs SET state='running', owner_pid=?, started_at=CURRENT_TIMESTAMP WHERE id=?",
+                     (os.getpid(), job_id))
+        # online updates of the new model start after the attempts that exist now
+        last_attempt_id = conn.execute("SELECT COALESCE(MAX(id), 0) FROM quiz_attempts").fetchone()[0]
+    start = time.perf_counter()
+    path = model_registry.train_and_save(train_path, test_path, registry_dir, publish=False, callbacks=callbacks,
+                                         backend=backend, last_attempt_id=last_attempt_id)
+    metrics = dict(model_registry.read_meta(path)["metrics"], train_seconds=round(time.perf_counter() - start, 1))
+    return path, metrics
+
+class TrainingJobRunner:
+    """Queues training jobs onto a process pool (spawned, so the parent never imports TensorFlow)."""
+    def __init__(self, db: DatabaseManager, registry_dir: str = model_registry.DEFAULT_REGISTRY,
+                 max_workers: int = 1, engine: Optional[str] = None,
+                 retry_backoff_s: float = 300, max_retry_backoff_s: float = 6 * 3600):
+        self.db = db
+        self.registry_dir = registry_dir
+        self.engine = engine
+        self.retry_backoff_s = retry_backoff_s
+        self.max_retry_backoff_s = max_retry_backoff_s
+        self._executor = ProcessPoolExecutor(max_workers, mp_context=multiprocessing.get_context("spawn"))
+        self._futures: Dict[int, Future] = {}
+        self._lock = threading.Lock()
+        self._fail_orphans()
+
+    def _fail_orphans(self):
+        # jobs whose submitting process died (server restart) will never be finished by anyone
+        with self.db.pool.write() as conn:
+            rows = conn.execute("SELECT id, owner_pid FROM training_jobs WHERE state IN ('queued','running')").fetchall()
+            orphans = [(job_id,) for job_id, pid in rows if not _pid_alive(pid)]
+            conn.executemany("""UPDATE training_jobs SET state='failed', error='interrupted', finished_at=CURRENT_TIMESTAMP
+                WHERE id=?""", orphans)
+
+    def submit(self, train_path: str = model_registry.DEFAULT_TRAIN, test_path: str = model_registry.DEFAULT_TEST,
+               force: bool = False) -> int:
+        """Queues a training job for the dataset and returns its id, or the id of the job
+        already queued or running for the same dataset, or of its last failed job while the
+        retry backoff lasts (force skips the backoff)."""
+        backend = APP_CONFIG["training"]["backend"]
+        key = model_registry.dataset_key(train_path, test_path, backend)
+        with self.db.pool.write() as conn:
+            row = conn.execute("SELECT id FROM training_jobs WHERE dataset_key=? AND state IN ('queued','running')",
+                               (key,)).fetchone()
+            if row:
+                return row[0]
+            # failures since the last success; jobs cut short by a server restart don't count
+            failed_id, failures, age_s = conn.execute("""SELECT MAX(id), COUNT(*),
+                    strftime('%s','now') - strftime('%s', MAX(finished_at))
+                FROM training_jobs WHERE dataset_key=? AND state='failed' AND COALESCE(error,'') != 'interrupted'
+                  AND id > COALESCE((SELECT MAX(id) FROM training_jobs WHERE dataset_key=? AND state='succeeded'), 0)""",
+                (key, key)).fetchone()
+            if failures and not force:
+                backoff = min(self.retry_backoff_s * 2 ** (failures - 1), self.max_retry_backoff_s)
+                if age_s is None or age_s < backoff:
+                    return failed_id
+            # owner_pid is the submitting process until the worker takes the job
+            job_id = conn.execute("INSERT INTO training_jobs (dataset_key, train_path, test_path, owner_pid) VALUES (?,?,?,?)",
+                                  (key, train_path, test_path, os.getpid())).lastrowid
+        with self._lock:
+            future = self._executor.submit(_run_job, self.db.db_path, job_id, train_path, test_path, self.registry_dir,
+                                           backend)
+            self._futures[job_id] = future
+        future.add_done_callback(functools.partial(self._finished, job_id))
+        return job_id
+
+    def _finished(self, job_id: int, future: Future):
+        try:
+            path, metrics = future.result()
+            model_registry.promote(path, self.registry_dir, self.engine)
+        except BaseException as e:
+            logger.exception("Skill model training job %d failed", job_id)
+            with self.db.pool.write() as conn:
+                conn.execute("""UPDATE training_jobs SET state='failed', error=?, finished_at=CURRENT_TIMESTAMP
+                    WHERE id=?""", (f"{type(e).__name__}: {e}", job_id))
+        else:
+            with self.db.pool.write() as conn:
+                conn.execute("""UPDATE training_jobs SET state='succeeded', metrics=?, artifact_path=?, finished_at=CURRENT_TIMESTAMP
+                    WHERE id=?""", (json.dumps(metrics), path, job_id))
+        finally:
+            with self._lock:
+                self._futures.pop(job_id, None)
+
+    def wait(self, job_id: int, timeout: Optional[float] = None) -> Dict[str, Any]:
+        """Blocks until a job submitted by this runner has finished; returns its status."""
+        with self._lock:
+            future = self._futures.get(job_id)
+        if future is not None:
+            try:
+                future.result(timeout)
+            except Exception:
+                pass  # recorded on the job row
+            deadline = time.monotonic() + 5  # the done callback writes the final state
+            while self.status(job_id)["state"] in ACTIVE_STATES and time.monotonic() < deadline:
+                time.sleep(0.05)
+        return self.status(job_id)
+
+    def status(self, job_id: int) -> Optional[Dict[str, Any]]:
+        return get_job(self.db, job_id)
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+def _job_dict(row) -> Dict[str, Any]:
+    job = dict(row)
+    for field in ("progress", "metrics"):
+        job[field] = json.loads(job[field]) if job[field] else None
+    return job
+
+def get_job(db: DatabaseManager, job_id: int) -> Optional[Dict[str, Any]]:
+    with db.pool.read() as conn:
+        row = conn.execute("SELECT * FROM training_jobs WHERE id=?", (job_id,)).fetchone()
+    return _job_dict(row) if row else None
+
+def list_jobs(db: DatabaseManager, limit: int = 20) -> List[Dict[str, Any]]:
+    with db.pool.read() as conn:
+        rows = conn.execute("SELECT * FROM training_jobs ORDER BY id DESC LIMIT ?", (limit,)).fetchall()
+    return [_job_dict(r) for r in rows]
+
+_runners: Dict[Tuple[str, str], TrainingJobRunner] = {}
+_runners_lock = threading.Lock()
+
+def get_training_runner(db_path: str = "data/learning_platform.db",
+                        registry_dir: str = model_registry.DEFAULT_REGISTRY) -> TrainingJobRunner:
+    """Returns the process-wide runner for a database and registry, starting it on first use."""
+    key = (os.path.abspath(db_path), os.path.abspath(registry_dir))
+    with _runners_lock:
+        if key not in _runners:
+            cfg = APP_CONFIG["training"]
+            runner = TrainingJobRunner(DatabaseManager(db_path), registry_dir, max_workers=cfg["max_workers"],
+                                       retry_backoff_s=cfg["retry_backoff_s"],
+                                       max_retry_backoff_s=cfg["max_retry_backoff_s"])
+            atexit.register(runner.shutdown)
+            _runners[key] = runner
+        return _runners[key]
+
+def _print_job(job: Dict[str, Any]):
+    line = f"#{job['id']} {job['state']:<9} epoch {job['epoch']}/{job['epochs'] or '?'}"
+    if job["metrics"]:
+        line += f"  {job['metrics']}"
+    if job["error"]:
+        line += f"  {job['error']}"
+    if job["artifact_path"]:
+        line += f"  -> {job['artifact_path']}"
+    print(line)
+
+if __name__ == "__main__":
+    import sys
+    args = sys.argv[1:]
+    if args[:1] == ["submit"]:
+        runner = get_training_runner()
+        job_id = runner.submit(*args[1:3], force=True)  # an explicit request skips the retry backoff
+        print(f"Training job #{job_id} queued")
+        _print_job(runner.wait(job_id))
+    elif args[:1] == ["status"]:
+        db = DatabaseManager()
+        jobs = [get_job(db, int(args[1]))] if len(args) > 1 else list_jobs(db)
+        for job in jobs:
+            if job:
+                _print_job(job)
+    else:
+        sys.exit("usage: python -m utils.training_jobs submit [train_csv test_csv] | status [job_id]")
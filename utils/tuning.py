@@ -0,0 +1,167 @@
+"""Hyperparameter search with k-fold cross-validation for the skill model.
+
+Samples network configurations (width, depth, dropout, learning rate) and cross-validates
+each on the training CSV across a spawned process pool. Every worker trains with a fixed
+number of TensorFlow/BLAS threads, so several folds run side by side without
+oversubscribing the machine, and reads the scaled matrices from utils.feature_cache through
+shared memory maps. Each configuration is scored on mean fold accuracy, single-row
+latency of its NumPy serving engine, and serving weight size. The most compact
+configuration on the Pareto front within --tolerance of the best accuracy is retrained on
+the full training set and written to the model registry, with its cross-validated
+accuracy and the search results (tuning.json) stored alongside.
+
+    python -m utils.tuning [--trials 12] [--folds 5] [--workers 4] [--threads 1]
+"""
+
+import argparse, itertools, json, multiprocessing, os, time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, List, Optional
+import numpy as np
+from utils import model_registry
+from utils.feature_cache import DEFAULT_CACHE_DIR, FeatureCache
+from utils.process_pool import thread_limits
+from utils.skill_predictor import DEFAULT_HYPERPARAMS
+
+SEARCH_SPACE = {
+    "width": [32, 64, 128],
+    "depth": [1, 2, 3],
+    "dropout": [0.0, 0.2, 0.4],
+    "learning_rate": [3e-4, 1e-3, 3e-3],
+}
+# Rows timed one at a time to measure serving latency
+LATENCY_SAMPLES = 200
+
+def hyperparams_for(width: int, depth: int, dropout: float, learning_rate: float) -> Dict[str, Any]:
+    """Network settings for a search point; hidden layers halve in width (64, 2 -> 64, 32)."""
+    return {"units": [max(width >> i, 8) for i in range(depth)], "dropout": dropout,
+            "learning_rate": learning_rate, "patience": DEFAULT_HYPERPARAMS["patience"]}
+
+def sample_configs(trials: int, seed: int = 0) -> List[Dict[str, Any]]:
+    """The current default configuration followed by trials - 1 distinct random grid points."""
+    grid = [hyperparams_for(*point) for point in itertools.product(*SEARCH_SPACE.values())]
+    grid = [config for config in grid if config != DEFAULT_HYPERPARAMS]
+    picks = np.random.default_rng(seed).permutation(len(grid))[:max(trials - 1, 0)]
+    return [dict(DEFAULT_HYPERPARAMS)] + [grid[i] for i in picks]
+
+def fold_rows(n: int, fold: int, folds: int, seed: int = 0) -> np.ndarray:
+    """Sorted row indices of one fold of a seeded random k-fold split of n rows."""
+    return np.sort(np.random.default_rng(seed).permutation(n)[fold::folds])
+
+def _init_worker(threads: int):
+    import tensorflow as tf
+    tf.config.threading.set_intra_op_parallelism_threads(threads)
+    tf.config.threading.set_inter_op_parallelism_threads(1)
+
+def _evaluate_fold(x_path: str, y_path: str, num_classes: int, hyperparams: Dict[str, Any],
+                   fold: int, folds: int, seed: int, epochs: int) -> Dict[str, Any]:
+    """Worker: trains on every fold but one, scores the held-out fold and times the export."""
+    from utils.neural_network import FFNeuralNetwork
+    from utils.numpy_inference import NumpyNetwork
+    X, y = np.load(x_path, mmap_mode="r"), np.load(y_path, mmap_mode="r")
+    held_out = fold_rows(len(X), fold, folds, seed)
+    train = np.setdiff1d(np.arange(len(X)), held_out, assume_unique=True)
+
+    network = FFNeuralNetwork(X.shape[1], num_classes, **hyperparams)
+    start = time.perf_counter()
+    network.train(X[train], y[train], epochs=epochs)
+    train_seconds = time.perf_counter() - start
+    accuracy = float((network.predict(X[held_out]).argmax(axis=1) == y[held_out]).mean())
+
+    served = NumpyNetwork.from_keras(network.model)
+    rows = np.asarray(X[held_out[:LATENCY_SAMPLES]])
+    timings = []
+    for row in rows:
+        start = time.perf_counter()
+        served.predict(row[None, :])
+        timings.append(time.perf_counter() - start)
+    return {"fold": fold, "accuracy": accuracy, "train_seconds": train_seconds,
+            "latency_ms": float(np.median(timings) * 1000),
+            "size_bytes": sum(w.nbytes + b.nbytes for w, b, _ in served.layers)}
+
+def pareto_front(results: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Results not dominated on (higher accuracy, lower latency, smaller size)."""
+    def dominates(a, b):
+        no_worse = (a["accuracy"] >= b["accuracy"] and a["latency_ms"] <= b["latency_ms"]
+                    and a["size_bytes"] <= b["size_bytes"])
+        better = (a["accuracy"] > b["accuracy"] or a["latency_ms"] < b["latency_ms"]
+                  or a["size_bytes"] < b["size_bytes"])
+        return no_worse and better
+    return [r for r in results if not any(dominates(other, r) for other in results)]
+
+def choose(results: List[Dict[str, Any]], tolerance: float) -> Dict[str, Any]:
+    """The smallest, then fastest, Pareto-optimal result within tolerance of the best accuracy."""
+    front = pareto_front(results)
+    best = max(r["accuracy"] for r in front)
+    return min((r for r in front if r["accuracy"] >= best - tolerance),
+               key=lambda r: (r["size_bytes"], r["latency_ms"], -r["accuracy"]))
+
+def search(configs: List[Dict[str, Any]], train_path: str = model_registry.DEFAULT_TRAIN,
+           test_path: str = model_registry.DEFAULT_TEST, folds: int = 5, workers: Optional[int] = None,
+           threads: int = 1, epochs: int = 50, seed: int = 0, cache_dir: str = DEFAULT_CACHE_DIR) -> List[Dict[str, Any]]:
+    """Cross-validates every configuration; returns one result per configuration, in order."""
+    cache = FeatureCache(cache_dir)
+    _, train_top = cache.labels(train_path)
+    _, test_top = cache.labels(test_path)
+    num_classes = max(train_top, test_top)  # as SkillPredictor.process_datasets_and_train
+    X, y = cache.matrices(train_path, cache.pipeline(train_path, num_classes))
+    workers = workers or max((os.cpu_count() or 1) // threads, 1)
+
+    with thread_limits(threads), ProcessPoolExecutor(workers, mp_context=multiprocessing.get_context("spawn"),
+                                                      initializer=_init_worker, initargs=(threads,)) as pool:
+        futures = [[pool.submit(_evaluate_fold, X.filename, y.filename, num_classes, config, fold, folds, seed, epochs)
+                    for fold in range(folds)] for config in configs]
+        results = []
+        for config, fold_futures in zip(configs, futures):
+            scores = [f.result() for f in fold_futures]
+            accuracies = [s["accuracy"] for s in scores]
+            results.append({
+                "hyperparams": config,
+                "accuracy": float(np.mean(accuracies)),
+                "accuracy_std": float(np.std(accuracies)),
+                "latency_ms": float(np.median([s["latency_ms"] for s in scores])),
+                "size_bytes": scores[0]["size_bytes"],
+                "train_seconds": float(np.sum([s["train_seconds"] for s in scores])),
+            })
+            _print_result(results[-1])
+    return results
+
+def _print_result(result: Dict[str, Any]):
+    h = result["hyperparams"]
+    print(f"units={'x'.join(map(str, h['units'])):<12} dropout={h['dropout']:<4} lr={h['learning_rate']:<7g}"
+          f" acc={result['accuracy']:.4f}±{result['accuracy_std']:.4f} p50={result['latency_ms']:.3f}ms"
+          f" size={result['size_bytes'] / 1024:.1f}KB", flush=True)
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(prog="python -m utils.tuning", description=__doc__.split("\n\n")[0])
+    parser.add_argument("--train", default=model_registry.DEFAULT_TRAIN)
+    parser.add_argument("--test", default=model_registry.DEFAULT_TEST)
+    parser.add_argument("--registry", default=model_registry.DEFAULT_REGISTRY)
+    parser.add_argument("--trials", type=int, default=12, help="configurations to try, including the current default")
+    parser.add_argument("--folds", type=int, default=5)
+    parser.add_argument("--workers", type=int, help="default: CPU count / threads")
+    parser.add_argument("--threads", type=int, default=1, help="TensorFlow/BLAS threads per worker")
+    parser.add_argument("--epochs", type=int, default=50)
+    parser.add_argument("--tolerance", type=float, default=0.005,
+                        help="accuracy a smaller or faster model may give up against the most accurate one")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--no-publish", action="store_true", help="save the chosen model without making it LATEST")
+    args = parser.parse_args(argv)
+
+    results = search(sample_configs(args.trials, args.seed), args.train, args.test, args.folds,
+                     args.workers, args.threads, args.epochs, args.seed)
+    chosen = choose(results, args.tolerance)
+    front = pareto_front(results)
+    print("chosen:")
+    _print_result(chosen)
+
+    metrics = {"cv_accuracy": chosen["accuracy"], "cv_accuracy_std": chosen["accuracy_std"], "cv_folds": args.folds,
+               "latency_ms": chosen["latency_ms"], "size_bytes": chosen["size_bytes"]}
+    path = model_registry.train_and_save(args.train, args.test, args.registry, publish=not args.no_publish,
+                                         hyperparams=chosen["hyperparams"], metrics=metrics, backend="mlp")
+    with open(os.path.join(path, "tuning.json"), "w") as f:
+        json.dump({"folds": args.folds, "seed": args.seed, "tolerance": args.tolerance,
+                   "results": [dict(r, pareto=r in front, chosen=r is chosen) for r in results]}, f, indent=2)
+    print(("Saved" if args.no_publish else "Published"), path)
+
+if __name__ == "__main__":
+    main()